@@ -2,8 +2,11 @@ from crewai import Agent
 import json
 import os
 from datetime import datetime
-from config.settings import JSON_SUBDIR, LLM_SUBDIR, DATE_FORMAT, MEDIA_SUBDIR
-from utils import parse_llm_json, save_json, log_debug
+from config.settings import JSON_SUBDIR, LLM_SUBDIR, DATE_FORMAT, MEDIA_SUBDIR, DEDUPE_THRESHOLD, DEDUPE_MAX_ROUNDS, LEAD_MAGNET_MODE, RESEARCH_DIGEST_TOKEN_BUDGET
+from tools.dedupe import find_near_duplicates
+from tools.research_digest import build_research_digest, estimate_tokens, with_digest
+from tools.run_manifest import record_stage
+from utils import atomic_output, parse_llm_json, save_json, log_debug
 
 def create_content_curator_agent(llm):
     """Create a content curator agent to craft journaling guides."""
@@ -19,6 +22,158 @@ def create_content_curator_agent(llm):
         allow_delegation=False
     )
 
+def _regenerate_duplicate_days(self, days: list, author_style: str, research_digest: str, output_dir: str,
+                               file_prefix: str, reference_days: list = None, reference_name: str = "journal"):
+    """Regenerate only the days whose pre_writeup or prompt nearly repeats another day."""
+    for attempt in range(DEDUPE_MAX_ROUNDS):
+        flagged = find_near_duplicates(days, threshold=DEDUPE_THRESHOLD, reference_days=reference_days, reference_name=reference_name)
+        if not flagged:
+            return days
+        day_nums = sorted({f["day"] for f in flagged})
+        for f in flagged:
+            log_debug(f"{file_prefix} day {f['day']} {f['field']} repeats {f['duplicate_of']['source']} day {f['duplicate_of']['day']} (similarity {f['similarity']})")
+        kept_prompts = [d.get("prompt", "") for d in days if d.get("day") not in day_nums]
+        kept_prompts += [d.get("prompt", "") for d in reference_days or []]
+        regen_prompt = with_digest(research_digest, (
+            f"Rewrite the journal entries for days {day_nums} as a JSON list, each with 'day', 'pre_writeup', and 'prompt' keys, like [{{\"day\": {day_nums[0]}, \"pre_writeup\": \"...\", \"prompt\": \"...\"}}, ...]. "
+            "Each 'pre_writeup' is 180–220 words and each 'prompt' is a reflective question. "
+            f"Every entry must take a clearly different angle from these existing prompts: {kept_prompts}. "
+            f"Use the research digest in a '{author_style}' style. "
+            "Output as a valid JSON list with no extra text."
+        ))
+        try:
+            rewritten = parse_llm_json(self.llm, regen_prompt, output_dir, f"{file_prefix}_dedupe_{attempt + 1}.txt", flatten=False)
+        except Exception as e:
+            log_debug(f"Failed to regenerate duplicate {file_prefix} days {day_nums}: {e}")
+            return days
+        by_day = {entry.get("day"): entry for entry in rewritten if isinstance(entry, dict)} if isinstance(rewritten, list) else {}
+        for day in days:
+            entry = by_day.get(day["day"])
+            if day["day"] in day_nums and entry:
+                # Keep the image placeholders so image requirements stay valid
+                day["pre_writeup"] = entry.get("pre_writeup", day["pre_writeup"])
+                day["prompt"] = entry.get("prompt", day["prompt"])
+        log_debug(f"Regenerated {file_prefix} days {day_nums} (round {attempt + 1})")
+    return days
+
+def _generate_lead_magnet(self, research_digest: str, journal_data: dict, theme: str, author_style: str, output_dir: str):
+    """Generate the 6-day lead magnet from the research with its own set of LLM calls."""
+    lead_magnet_data = {}
+
+    # Cover
+    lead_cover_prompt = (
+        "Generate content for the lead magnet cover as a JSON object with 'title' and 'image' keys directly, like {\"title\": \"...\", \"image\": \"...\"}. "
+        f"Include a 'title' (e.g., 'Start {theme}: A Short Guide') and an 'image' placeholder in a '{author_style}' style. "
+        "Ensure the output is a valid JSON object with no extra text or nesting."
+    )
+    lead_magnet_data["cover"] = parse_llm_json(self.llm, lead_cover_prompt, output_dir, "lead_cover.txt", expected_keys=["title", "image"], flatten=False)
+
+    # Intro Spread
+    lead_intro_prompt = with_digest(research_digest, (
+        "Generate content for the lead magnet intro spread as a JSON object with 'left' and 'right' keys directly, like {\"left\": {\"quote\": \"...\"}, \"right\": {\"image\": \"...\", \"title\": \"...\", \"writeup\": \"...\"}}. "
+        f"Include 'left' with a 'quote' (180–220 words) and 'right' with an 'image' placeholder, a 'title', and a 'writeup' (180–220 words, teaser-focused) in a '{author_style}' style. "
+        "Use techniques 1–2 of the research digest. "
+        "Ensure the output is a valid JSON object with no extra text or nesting."
+    ))
+    lead_magnet_data["intro_spread"] = parse_llm_json(self.llm, lead_intro_prompt, output_dir, "lead_intro.txt", expected_keys=["left", "right"], flatten=False)
+
+    # Commitment Page
+    lead_commit_prompt = with_digest(research_digest, (
+        "Generate content for the lead magnet commitment page as a JSON object with 'text' and 'writeup' keys directly, like {\"text\": \"...\", \"writeup\": \"...\"}. "
+        f"Include a 'text' (commitment statement with '[Name]') and a 'writeup' (180–220 words, teaser-focused) in a '{author_style}' style. "
+        "Use technique 3 of the research digest. "
+        "Ensure the output is a valid JSON object with no extra text or nesting."
+    ))
+    lead_magnet_data["commitment_page"] = parse_llm_json(self.llm, lead_commit_prompt, output_dir, "lead_commitment.txt", expected_keys=["text", "writeup"], flatten=False)
+
+    # Days (Batched)
+    lead_days_prompt = with_digest(research_digest, (
+        "Generate 6 daily entries as a JSON list, each with 'day', 'image_full_page', 'image_bottom', 'pre_writeup', 'prompt', and 'lines' keys, like [{\"day\": 1, \"image_full_page\": \"...\", ...}, ...]. "
+        "For each day: 'day' (integer 1–6), 'image_full_page' (placeholder), 'image_bottom' (placeholder), 'pre_writeup' (180–220 words, action-oriented for days 1–5, reflective for day 6), 'prompt' (reflective question), 'lines' (25). "
+        f"Use techniques 1–6 of the research digest in a '{author_style}' style. "
+        "Ensure variety and no repetition. Output as a valid JSON list with no extra text."
+    ))
+    lead_magnet_data["days"] = parse_llm_json(self.llm, lead_days_prompt, output_dir, "lead_days.txt", flatten=False)
+    lead_magnet_data["days"] = _regenerate_duplicate_days(
+        self, lead_magnet_data["days"], author_style, research_digest, output_dir, "lead_days",
+        reference_days=journal_data["days"], reference_name="journal"
+    )
+
+    # Certificate
+    lead_cert_prompt = with_digest(research_digest, (
+        "Generate content for the lead magnet certificate as a JSON object with 'summary', 'text', 'fields', and 'image' keys directly, like {\"summary\": \"...\", \"text\": \"...\", \"fields\": [...], \"image\": \"...\"}. "
+        f"Include a 'summary' (180–220 words), 'text' (with '[Name]'), 'fields' (list like ['Name', 'Date']), and an 'image' placeholder in a '{author_style}' style. "
+        "Use technique 7 of the research digest. "
+        "Ensure the output is a valid JSON object with no extra text or nesting."
+    ))
+    lead_magnet_data["certificate"] = parse_llm_json(self.llm, lead_cert_prompt, output_dir, "lead_certificate.txt", expected_keys=["summary", "text", "fields", "image"], flatten=False)
+    return lead_magnet_data
+
+def _pick_representative_days(days: list, count: int = 6):
+    """Pick count days spread evenly across the journey, always keeping the first and last day."""
+    if len(days) <= count:
+        return list(days)
+    step = (len(days) - 1) / (count - 1)
+    return [days[round(i * step)] for i in range(count)]
+
+def _derive_lead_magnet(self, journal_data: dict, theme: str, author_style: str, output_dir: str):
+    """Build the 6-day lead magnet as a teaser of the finished journal with a single rewrite call.
+
+    Representative journal days are condensed and renumbered 1–6, and the cover,
+    intro, commitment and certificate are reused with teaser wording. If the
+    rewrite fails the journal text is reused as-is, so the lead magnet is always built.
+    """
+    picked = _pick_representative_days(journal_data.get("days", []))
+    intro = journal_data.get("intro_spread", {})
+    commitment = journal_data.get("commitment_page", {})
+    certificate = journal_data.get("certificate", {})
+    source_days = [{"day": i, "pre_writeup": day.get("pre_writeup", ""), "prompt": day.get("prompt", "")} for i, day in enumerate(picked, 1)]
+
+    rewrite_prompt = (
+        "Turn these sections of a 30-day journal into a 6-day teaser as a JSON object with 'title', 'intro_writeup', 'commitment_writeup', 'certificate_summary', and 'days' keys directly, "
+        "like {\"title\": \"...\", \"intro_writeup\": \"...\", \"commitment_writeup\": \"...\", \"certificate_summary\": \"...\", \"days\": [{\"day\": 1, \"pre_writeup\": \"...\", \"prompt\": \"...\"}, ...]}. "
+        f"'title' is a short guide title (e.g., 'Start {theme}: A Short Guide') based on '{journal_data.get('cover', {}).get('title', theme)}'. "
+        f"'intro_writeup' (120–160 words, teaser-focused) rewrites: {intro.get('right', {}).get('writeup', '')} "
+        f"'commitment_writeup' (120–160 words, teaser-focused) rewrites: {commitment.get('writeup', '')} "
+        f"'certificate_summary' (120–160 words) celebrates finishing the first six days and invites the reader into the full 30-day journal. "
+        f"'days' condenses each of these entries to a 120–160 word 'pre_writeup' (action-oriented for days 1–5, reflective for day 6) and keeps its 'prompt': {json.dumps(source_days, ensure_ascii=False)} "
+        f"Keep the '{author_style}' style. Ensure the output is a valid JSON object with no extra text or nesting."
+    )
+    try:
+        rewritten = parse_llm_json(self.llm, rewrite_prompt, output_dir, "lead_derived.txt",
+                                   expected_keys=["title", "intro_writeup", "commitment_writeup", "certificate_summary", "days"], flatten=False)
+    except Exception as e:
+        log_debug(f"Lead magnet rewrite failed, reusing journal text unchanged: {e}")
+        rewritten = {}
+    if not isinstance(rewritten, dict):
+        rewritten = {}
+    condensed = {entry.get("day"): entry for entry in rewritten.get("days", []) if isinstance(entry, dict)}
+
+    days = []
+    for day_num, day in enumerate(picked, 1):
+        entry = condensed.get(day_num, {})
+        days.append({
+            **day,
+            "day": day_num,
+            "image_full_page": f"Day {day_num} Full Page Image",
+            "image_bottom": f"Day {day_num} Bottom Image",
+            "pre_writeup": entry.get("pre_writeup") or day.get("pre_writeup", ""),
+            "prompt": entry.get("prompt") or day.get("prompt", ""),
+        })
+
+    lead_magnet_data = {
+        "cover": {**journal_data.get("cover", {}), "title": rewritten.get("title") or f"Start {theme}: A Short Guide"},
+        "intro_spread": {
+            "left": dict(intro.get("left", {})),
+            "right": {**intro.get("right", {}), "writeup": rewritten.get("intro_writeup") or intro.get("right", {}).get("writeup", "")},
+        },
+        "commitment_page": {**commitment, "writeup": rewritten.get("commitment_writeup") or commitment.get("writeup", "")},
+        "days": days,
+        "certificate": {**certificate, "summary": rewritten.get("certificate_summary") or certificate.get("summary", "")},
+    }
+    log_debug(f"Derived lead magnet from journal days {[day.get('day') for day in picked]}")
+    return lead_magnet_data
+
 def curate_content(self, research_summary: list, theme: str, title: str, author_style: str, run_dir: str):
     """Curate content for 30-day journal and 6-day lead magnet, generating an image requirements list."""
     today = datetime.now().strftime(DATE_FORMAT)
@@ -32,6 +187,13 @@ def curate_content(self, research_summary: list, theme: str, title: str, author_
     image_requirements_path = os.path.join(json_dir, f"image_requirements_{title}_{theme}.json")
     theme_part = theme.split(" for ")[1] if " for " in theme else theme
 
+    # Research digest: compress the insights once and share it as the prefix of every research-backed prompt
+    research_digest = build_research_digest(research_summary, RESEARCH_DIGEST_TOKEN_BUDGET)
+    digest_path = os.path.join(output_dir, "research_digest.txt")
+    with atomic_output(digest_path, encoding="utf-8") as f:
+        f.write(research_digest)
+    log_debug(f"Research digest ~{estimate_tokens(research_digest)} tokens (raw research ~{estimate_tokens(str(research_summary))})")
+
     # 30-day Journal
     journal_data = {}
     image_requirements = []
@@ -51,12 +213,12 @@ def curate_content(self, research_summary: list, theme: str, title: str, author_
     })
 
     # Intro Spread
-    intro_prompt = (
+    intro_prompt = with_digest(research_digest, (
         "Generate content for the intro spread as a JSON object with 'left' and 'right' keys directly, like {\"left\": {\"quote\": \"...\"}, \"right\": {\"image\": \"...\", \"title\": \"...\", \"writeup\": \"...\"}}. "
         f"Include 'left' with a 'quote' (180–220 words) and 'right' with an 'image' placeholder (e.g., 'Intro Image'), a 'title', and a 'writeup' (180–220 words, motivational) in a '{author_style}' style. "
-        f"Use {str(research_summary[:2])} for inspiration. "
+        "Use techniques 1–2 of the research digest for inspiration. "
         "Ensure the output is a valid JSON object with no extra text or nesting."
-    )
+    ))
     journal_data["intro_spread"] = parse_llm_json(self.llm, intro_prompt, output_dir, "journal_intro.txt", expected_keys=["left", "right"], flatten=False)
     image_requirements.append({
         "image_id": "intro_30dayjournal",
@@ -66,23 +228,24 @@ def curate_content(self, research_summary: list, theme: str, title: str, author_
     })
 
     # Commitment Page
-    commitment_prompt = (
+    commitment_prompt = with_digest(research_digest, (
         "Generate content for the commitment page as a JSON object with 'text' and 'writeup' keys directly, like {\"text\": \"...\", \"writeup\": \"...\"}. "
         f"Include a 'text' (commitment statement with '[Name]') and a 'writeup' (180–220 words, dedication-focused) in a '{author_style}' style. "
-        f"Use {str(research_summary[2:4])}. "
+        "Use techniques 3–4 of the research digest. "
         "Ensure the output is a valid JSON object with no extra text or nesting."
-    )
+    ))
     journal_data["commitment_page"] = parse_llm_json(self.llm, commitment_prompt, output_dir, "journal_commitment.txt", expected_keys=["text", "writeup"], flatten=False)
 
     # Days (Batched)
-    days_prompt = (
+    days_prompt = with_digest(research_digest, (
         "Generate 30 daily entries as a JSON list, each with 'day', 'image_full_page', 'image_bottom', 'pre_writeup', 'prompt', and 'lines' keys, like [{\"day\": 1, \"image_full_page\": \"...\", ...}, ...]. "
         "For each day: 'day' (integer 1–30), 'image_full_page' (placeholder, e.g., 'Day X Full Page Image'), 'image_bottom' (placeholder, e.g., 'Day X Bottom Image'), "
         "'pre_writeup' (180–220 words, action-oriented for weekdays [Mon–Fri], reflective for weekends [Sat–Sun]), 'prompt' (reflective question), 'lines' (25). "
-        f"Use {str(research_summary)} in a '{author_style}' style. "
+        f"Use the research digest in a '{author_style}' style. "
         "Ensure variety and no repetition. Output as a valid JSON list with no extra text."
-    )
+    ))
     journal_data["days"] = parse_llm_json(self.llm, days_prompt, output_dir, "journal_days.txt", flatten=False)
+    journal_data["days"] = _regenerate_duplicate_days(self, journal_data["days"], author_style, research_digest, output_dir, "journal_days")
     for day in journal_data["days"]:
         day_num = day["day"]
         image_requirements.append({
@@ -99,12 +262,12 @@ def curate_content(self, research_summary: list, theme: str, title: str, author_
         })
 
     # Certificate
-    cert_prompt = (
+    cert_prompt = with_digest(research_digest, (
         "Generate content for the certificate as a JSON object with 'summary', 'text', 'fields', and 'image' keys directly, like {\"summary\": \"...\", \"text\": \"...\", \"fields\": [...], \"image\": \"...\"}. "
         f"Include a 'summary' (180–220 words), 'text' (with '[Name]' and '[benefit]'), 'fields' (list like ['Name', 'Date']), and an 'image' placeholder in a '{author_style}' style. "
-        f"Use {str(research_summary[-2:])}. "
+        "Use the last two techniques of the research digest. "
         "Ensure the output is a valid JSON object with no extra text or nesting."
-    )
+    ))
     journal_data["certificate"] = parse_llm_json(self.llm, cert_prompt, output_dir, "journal_certificate.txt", expected_keys=["summary", "text", "fields", "image"], flatten=False)
     image_requirements.append({
         "image_id": "certificate_30dayjournal",
@@ -117,54 +280,22 @@ def curate_content(self, research_summary: list, theme: str, title: str, author_
     log_debug(f"30-day journal saved to {journal_json_path}")
 
     # 6-day Lead Magnet
-    lead_magnet_data = {}
-
-    # Cover
-    lead_cover_prompt = (
-        "Generate content for the lead magnet cover as a JSON object with 'title' and 'image' keys directly, like {\"title\": \"...\", \"image\": \"...\"}. "
-        f"Include a 'title' (e.g., 'Start {theme}: A Short Guide') and an 'image' placeholder in a '{author_style}' style. "
-        "Ensure the output is a valid JSON object with no extra text or nesting."
-    )
-    lead_magnet_data["cover"] = parse_llm_json(self.llm, lead_cover_prompt, output_dir, "lead_cover.txt", expected_keys=["title", "image"], flatten=False)
+    if LEAD_MAGNET_MODE == "derive":
+        lead_magnet_data = _derive_lead_magnet(self, journal_data, theme, author_style, output_dir)
+    else:
+        lead_magnet_data = _generate_lead_magnet(self, research_digest, journal_data, theme, author_style, output_dir)
     image_requirements.append({
         "image_id": "cover_leadmagnet",
         "placement": "lead_magnet_cover",
         "prompt": f"Cover image for a 6-day {theme} lead magnet in {author_style} style",
         "path": f"{MEDIA_SUBDIR}/cover_leadmagnet.png"
     })
-
-    # Intro Spread
-    lead_intro_prompt = (
-        "Generate content for the lead magnet intro spread as a JSON object with 'left' and 'right' keys directly, like {\"left\": {\"quote\": \"...\"}, \"right\": {\"image\": \"...\", \"title\": \"...\", \"writeup\": \"...\"}}. "
-        f"Include 'left' with a 'quote' (180–220 words) and 'right' with an 'image' placeholder, a 'title', and a 'writeup' (180–220 words, teaser-focused) in a '{author_style}' style. "
-        f"Use {str(research_summary[:2])}. "
-        "Ensure the output is a valid JSON object with no extra text or nesting."
-    )
-    lead_magnet_data["intro_spread"] = parse_llm_json(self.llm, lead_intro_prompt, output_dir, "lead_intro.txt", expected_keys=["left", "right"], flatten=False)
     image_requirements.append({
         "image_id": "intro_leadmagnet",
         "placement": "lead_magnet_intro_spread_right",
         "prompt": f"Intro image for a 6-day {theme} lead magnet in {author_style} style",
         "path": f"{MEDIA_SUBDIR}/intro_leadmagnet.png"
     })
-
-    # Commitment Page
-    lead_commit_prompt = (
-        "Generate content for the lead magnet commitment page as a JSON object with 'text' and 'writeup' keys directly, like {\"text\": \"...\", \"writeup\": \"...\"}. "
-        f"Include a 'text' (commitment statement with '[Name]') and a 'writeup' (180–220 words, teaser-focused) in a '{author_style}' style. "
-        f"Use {str(research_summary[2:3])}. "
-        "Ensure the output is a valid JSON object with no extra text or nesting."
-    )
-    lead_magnet_data["commitment_page"] = parse_llm_json(self.llm, lead_commit_prompt, output_dir, "lead_commitment.txt", expected_keys=["text", "writeup"], flatten=False)
-
-    # Days (Batched)
-    lead_days_prompt = (
-        "Generate 6 daily entries as a JSON list, each with 'day', 'image_full_page', 'image_bottom', 'pre_writeup', 'prompt', and 'lines' keys, like [{\"day\": 1, \"image_full_page\": \"...\", ...}, ...]. "
-        "For each day: 'day' (integer 1–6), 'image_full_page' (placeholder), 'image_bottom' (placeholder), 'pre_writeup' (180–220 words, action-oriented for days 1–5, reflective for day 6), 'prompt' (reflective question), 'lines' (25). "
-        f"Use {str(research_summary[:6])} in a '{author_style}' style. "
-        "Ensure variety and no repetition. Output as a valid JSON list with no extra text."
-    )
-    lead_magnet_data["days"] = parse_llm_json(self.llm, lead_days_prompt, output_dir, "lead_days.txt", flatten=False)
     for day in lead_magnet_data["days"]:
         day_num = day["day"]
         image_requirements.append({
@@ -179,15 +310,6 @@ def curate_content(self, research_summary: list, theme: str, title: str, author_
             "prompt": f"Bottom image for Day {day_num} of a 6-day {theme} lead magnet in {author_style} style",
             "path": f"{MEDIA_SUBDIR}/day{day_num}_bottom_leadmagnet.png"
         })
-
-    # Certificate
-    lead_cert_prompt = (
-        "Generate content for the lead magnet certificate as a JSON object with 'summary', 'text', 'fields', and 'image' keys directly, like {\"summary\": \"...\", \"text\": \"...\", \"fields\": [...], \"image\": \"...\"}. "
-        f"Include a 'summary' (180–220 words), 'text' (with '[Name]'), 'fields' (list like ['Name', 'Date']), and an 'image' placeholder in a '{author_style}' style. "
-        f"Use {str(research_summary[6:7])}. "
-        "Ensure the output is a valid JSON object with no extra text or nesting."
-    )
-    lead_magnet_data["certificate"] = parse_llm_json(self.llm, lead_cert_prompt, output_dir, "lead_certificate.txt", expected_keys=["summary", "text", "fields", "image"], flatten=False)
     image_requirements.append({
         "image_id": "certificate_leadmagnet",
         "placement": "lead_magnet_certificate",
@@ -201,5 +323,7 @@ def curate_content(self, research_summary: list, theme: str, title: str, author_
     # Save image requirements
     save_json(image_requirements, image_requirements_path)
     log_debug(f"Image requirements saved to {image_requirements_path}")
+    record_stage(run_dir, "curation", artifacts={"journal": journal_json_path, "lead_magnet": lead_magnet_json_path,
+                                                 "image_requirements": image_requirements_path})
 
     return {"journal": journal_json_path, "lead_magnet": lead_magnet_json_path, "image_requirements": image_requirements_path}
\ No newline at end of file
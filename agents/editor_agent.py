@@ -1,10 +1,11 @@
 from crewai import Agent
-from tools.tools import SentimentAnalysisTool
+from tools.tools import SentimentAnalysisTool, analyze_sentiment_batch
 import json
 import os
 from datetime import datetime
 from config.settings import DATE_FORMAT
-from utils import save_json, log_debug
+from tools.run_manifest import record_stage
+from utils import append_text, save_json, log_debug
 
 def create_editor_agent(llm):
     """Create an editor agent to polish journaling content."""
@@ -50,8 +51,9 @@ def edit_content(self, journal_file: str, lead_magnet_file: str, author_style: s
     journal_data["commitment_page"]["text"] = f"{journal_data['commitment_page']['text']} - Refined to inspire your journey{tone_modifier}."
     journal_data["certificate"]["text"] = f"{journal_data['certificate']['text']} - Polished to celebrate your growth{tone_modifier}."
     
-    for day_entry in journal_data["days"]:
-        sentiment = self.tools[0]._run(day_entry["pre_writeup"])
+    # Score every day in one pass with the shared analyzer
+    day_sentiments = analyze_sentiment_batch([day_entry["pre_writeup"] for day_entry in journal_data["days"]])
+    for day_entry, sentiment in zip(journal_data["days"], day_sentiments):
         if sentiment.get("compound", 0) < 0.3:
             day_entry["pre_writeup"] = f"{day_entry['pre_writeup']} - Rewritten{tone_modifier}: You’ve got this!"
         else:
@@ -60,8 +62,7 @@ def edit_content(self, journal_file: str, lead_magnet_file: str, author_style: s
     
     try:
         save_json(journal_data, journal_edited_path)
-        with open(log_path, "a") as log:
-            log.write(f"Journal edited: {journal_edited_path}\n")
+        append_text(log_path, f"Journal edited: {journal_edited_path}\n")
         log_debug(f"Journal edited and saved to {journal_edited_path}")
     except Exception as e:
         log_debug(f"Failed to save edited journal to {journal_edited_path}: {e}")
@@ -79,8 +80,8 @@ def edit_content(self, journal_file: str, lead_magnet_file: str, author_style: s
     lead_magnet_data["commitment_page"]["text"] = f"{lead_magnet_data['commitment_page']['text']} - Refined to encourage exploration{tone_modifier}."
     lead_magnet_data["certificate"]["text"] = f"{lead_magnet_data['certificate']['text']} - Enhanced to mark your beginning{tone_modifier}."
     
-    for day_entry in lead_magnet_data["days"]:
-        sentiment = self.tools[0]._run(day_entry["pre_writeup"])
+    day_sentiments = analyze_sentiment_batch([day_entry["pre_writeup"] for day_entry in lead_magnet_data["days"]])
+    for day_entry, sentiment in zip(lead_magnet_data["days"], day_sentiments):
         if sentiment.get("compound", 0) < 0.3:
             day_entry["pre_writeup"] = f"{day_entry['pre_writeup']} - Rewritten{tone_modifier}: Take this step!"
         else:
@@ -89,11 +90,12 @@ def edit_content(self, journal_file: str, lead_magnet_file: str, author_style: s
     
     try:
         save_json(lead_magnet_data, lead_magnet_edited_path)
-        with open(log_path, "a") as log:
-            log.write(f"Lead magnet edited: {lead_magnet_edited_path}\n")
+        append_text(log_path, f"Lead magnet edited: {lead_magnet_edited_path}\n")
         log_debug(f"Lead magnet edited and saved to {lead_magnet_edited_path}")
     except Exception as e:
         log_debug(f"Failed to save edited lead magnet to {lead_magnet_edited_path}: {e}")
         raise
 
+    record_stage(os.path.dirname(output_folder), "editing",
+                 artifacts={"journal": journal_edited_path, "lead_magnet": lead_magnet_edited_path})
     return {"journal": journal_edited_path, "lead_magnet": lead_magnet_edited_path}
\ No newline at end of file
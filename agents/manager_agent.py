@@ -11,6 +11,8 @@ from agents.content_curator_agent import curate_content
 from agents.editor_agent import edit_content
 from agents.media_agent import generate_media
 from agents.pdf_builder_agent import generate_pdf
+from tools.llm_hedge import get_llm_hedger
+from tools.run_manifest import record_stage
 from utils import save_json, log_debug
 
 def create_manager_agent(llm):
@@ -124,10 +126,14 @@ def coordinate_phases(manager_agent, onboarding_agent, discovery_agent, research
     prefs_path = os.path.join(run_dir, JSON_SUBDIR, f"onboarding_prefs_{selected_title}_{theme}.json")
     os.makedirs(os.path.dirname(prefs_path), exist_ok=True)
     save_json(prefs, prefs_path)
+    record_stage(run_dir, "onboarding", artifacts={"config": prefs_path}, title=selected_title, theme=theme,
+                 author_style=author_style, title_style=title_style, research_depth=research_depth,
+                 user_id=prefs.get("user_id"))
     
     # Save discovery ideas
     idea_path = os.path.join(run_dir, JSON_SUBDIR, f"discovery_idea_{selected_title}_{theme}.json")
     save_json({"theme": theme, "ideas": ideas}, idea_path)
+    record_stage(run_dir, "discovery", artifacts={"discovery": idea_path})
     
     # Step 4: Research
     log_debug("Step 4: Research")
@@ -135,6 +141,7 @@ def coordinate_phases(manager_agent, onboarding_agent, discovery_agent, research
     research_summary = research_content(research_agent, theme=theme, depth=research_depth, run_dir=run_dir)
     research_data_path = os.path.join(run_dir, JSON_SUBDIR, f"research_data_{selected_title}_{theme}.json")
     save_json({"theme": theme, "research": research_summary}, research_data_path)
+    record_stage(run_dir, "research", artifacts={"research": research_data_path})
     
     # Step 5: Content Curation
     log_debug("Step 5: Content Curation")
@@ -149,6 +156,12 @@ def coordinate_phases(manager_agent, onboarding_agent, discovery_agent, research
     # Interactive Pause
     log_debug("JSON generation complete, prompting user for next step")
     print("\nJSON generation complete!")
+    hedger = get_llm_hedger()
+    if hedger:
+        report = hedger.report()
+        log_debug(f"LLM hedging report: {report}")
+        if report["hedges_sent"]:
+            print(f"Hedged {report['hedges_sent']} slow LLM calls ({report['hedge_wins']} won by the duplicate, ~{report['extra_input_tokens']} extra input tokens).")
     while True:
         continue_choice = input("Continue with PDF generation now? (1) Yes, (2) No: ").strip()
         if continue_choice in ['1', '2']:
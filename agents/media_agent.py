@@ -2,8 +2,14 @@ from crewai import Agent
 import json
 import os
 from crewai import LLM
-from config.settings import MEDIA_LLM_API_KEY, MEDIA_SUBDIR, JSON_SUBDIR, ENABLE_MEDIA_LLM
-from utils import save_json, log_debug
+from config.settings import (
+    MEDIA_LLM_API_KEY, MEDIA_SUBDIR, JSON_SUBDIR, ENABLE_MEDIA_LLM, MEDIA_CONCURRENCY, MEDIA_RATE_LIMITS,
+    MEDIA_STORE_DIR, MEDIA_STORE_QUOTA_MB
+)
+from tools.media_engine import MediaEngine
+from tools.media_store import MediaStore
+from tools.run_manifest import record_stage
+from utils import atomic_output, save_json, log_debug
 
 def create_media_agent(llm):
     """Create a media agent to generate images from JSON placeholders."""
@@ -19,12 +25,19 @@ def create_media_agent(llm):
         allow_delegation=False
     )
 
+# Parameters that change the generated image; part of the shared media store key
+MEDIA_GENERATION_PARAMS = {"model": "media_model_name", "temperature": 0.7}
+
 def _generate_placeholder(image_id, output_path):
     """Generate a placeholder image file."""
-    with open(output_path, "w") as f:
+    with atomic_output(output_path) as f:
         f.write(f"Placeholder image for {image_id}")
     log_debug(f"Generated placeholder for {image_id} at {output_path}")
 
+def _record_media(run_dir, media_dir):
+    media_files = [os.path.join(media_dir, f) for f in sorted(os.listdir(media_dir)) if not f.startswith(".")]
+    record_stage(run_dir, "media", artifacts={"media": media_files})
+
 def generate_media(self, run_dir: str, skip_generation: bool = False):
     """Generate images for placeholders listed in image_requirements JSON."""
     json_dir = os.path.join(run_dir, JSON_SUBDIR)
@@ -58,15 +71,16 @@ def generate_media(self, run_dir: str, skip_generation: bool = False):
             image_id = req["image_id"]
             output_path = os.path.join(media_dir, f"{image_id}.png")
             _generate_placeholder(image_id, output_path)
+        _record_media(run_dir, media_dir)
         return
     
     # Initialize separate media LLM if enabled
     try:
         media_llm = LLM(
-            model="media_model_name",  # Replace with actual model when implemented
+            model=MEDIA_GENERATION_PARAMS["model"],  # Replace with actual model when implemented
             api_key=MEDIA_LLM_API_KEY,
             base_url="https://media.api.example.com/v1",  # Replace with actual URL
-            temperature=0.7
+            temperature=MEDIA_GENERATION_PARAMS["temperature"]
         )
         log_debug("Initialized separate media LLM for image generation.")
     except Exception as e:
@@ -76,26 +90,29 @@ def generate_media(self, run_dir: str, skip_generation: bool = False):
             image_id = req["image_id"]
             output_path = os.path.join(media_dir, f"{image_id}.png")
             _generate_placeholder(image_id, output_path)
+        _record_media(run_dir, media_dir)
         return
     
-    # Generate images with media LLM
-    for req in image_requirements:
-        image_id = req["image_id"]
-        prompt = req["prompt"]
-        output_path = os.path.join(media_dir, f"{image_id}.png")
-        
-        try:
-            # Uncomment and adjust when real media LLM is implemented
-            # image_response = media_llm.call(prompt)
-            # with open(output_path, "wb") as f:
-            #     f.write(image_response)
-            with open(output_path, "w") as f:  # Placeholder until real implementation
-                f.write(f"Simulated image for {image_id} via media LLM")
-            log_debug(f"Generated image for {image_id} at {output_path}")
-        except Exception as e:
-            log_debug(f"Failed to generate image for {image_id}: {e}")
-            print(f"Warning: Failed to generate image {image_id}, using placeholder.")
-            _generate_placeholder(image_id, output_path)
+    def _generate_image(req, output_path):
+        # Uncomment and adjust when real media LLM is implemented
+        # image_response = media_llm.call(req["prompt"])
+        # with open(output_path, "wb") as f:
+        #     f.write(image_response)
+        with atomic_output(output_path) as f:  # Placeholder until real implementation
+            f.write(f"Simulated image for {req['image_id']} via media LLM")
+        log_debug(f"Generated image for {req['image_id']} at {output_path}")
+
+    # Generate images with media LLM, skipping ones already generated from the same prompt
+    # and reusing images other projects generated with the same prompt and parameters
+    store = MediaStore(MEDIA_STORE_DIR, MEDIA_STORE_QUOTA_MB * 1024 * 1024)
+    engine = MediaEngine(media_dir, _generate_image, concurrency=MEDIA_CONCURRENCY, rate_limits=MEDIA_RATE_LIMITS,
+                         store=store, generation_params=MEDIA_GENERATION_PARAMS)
+    results = engine.run(image_requirements)
+    for image_id in results["failed"]:
+        print(f"Warning: Failed to generate image {image_id}, using placeholder.")
+        _generate_placeholder(image_id, os.path.join(media_dir, f"{image_id}.png"))
     
+    _record_media(run_dir, media_dir)
     log_debug(f"Media generation completed for run: {run_dir}")
-    print("Media generation completed.")
\ No newline at end of file
+    print(f"Media generation completed ({len(results['generated'])} generated, "
+          f"{len(results['reused'])} reused from store, {len(results['skipped'])} unchanged).")
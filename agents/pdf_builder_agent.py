@@ -3,15 +3,58 @@ from crewai.tools import BaseTool
 import json
 import os
 from fpdf import FPDF
-from config.settings import JSON_SUBDIR, PDF_SUBDIR, MEDIA_SUBDIR
-from utils import log_debug
+from config.settings import JSON_SUBDIR, PDF_SUBDIR, MEDIA_SUBDIR, PDF_CACHE_SUBDIR, BLOB_STORE_ENABLED, BLOB_STORE_DIR
+from tools.blob_store import BlobStore
+from tools.epub_writer import write_journal_epub
+from tools.pdf_page_cache import PageCache, assemble_pdf
+from tools.run_manifest import record_stage
+from utils import atomic_path, log_debug
+
+# Bump when the page layout changes so cached page groups are re-rendered
+PDF_TEMPLATE_VERSION = 1
 
 class PDFCreatorTool(BaseTool):
     name: str = "create_pdf"
     description: str = "Generate professionally formatted PDF documents from course content"
 
-    def _run(self, content: dict, output_path: str, use_media: bool = False, media_dir: str = None, epub_kdp: bool = False):
-        """Generate a PDF with specified layout for journaling content."""
+    def _run(self, content: dict, output_path: str, use_media: bool = False, media_dir: str = None, epub_kdp: bool = False, cache_dir: str = None):
+        """Generate a PDF with specified layout for journaling content.
+
+        With cache_dir set, each page group is cached by a hash of its inputs and only
+        changed groups are rendered before the document is reassembled.
+        """
+        sections = self._sections(content, use_media, media_dir, epub_kdp)
+        if not cache_dir:
+            pdf, bold_available = self._new_document()
+            for _, _, _, render in sections:
+                render(pdf, bold_available)
+            with atomic_path(output_path) as tmp_path:
+                pdf.output(tmp_path)
+            log_debug(f"PDF generated at {output_path}")
+            return output_path
+
+        cache = PageCache(cache_dir, PDF_TEMPLATE_VERSION)
+        section_paths = []
+        keys = []
+        rendered = 0
+        for name, inputs, image_paths, render in sections:
+            key = cache.key(name, inputs, image_paths)
+            keys.append(key)
+            section_path = cache.get(key)
+            if not section_path:
+                pdf, bold_available = self._new_document()
+                render(pdf, bold_available)
+                section_path = cache.path_for(key)
+                pdf.output(section_path)
+                rendered += 1
+            section_paths.append(section_path)
+        assemble_pdf(section_paths, output_path)
+        cache.prune(keys)
+        log_debug(f"PDF generated at {output_path} ({rendered}/{len(sections)} page groups re-rendered)")
+        return output_path
+
+    def _new_document(self):
+        """Create an FPDF document with the DejaVu fonts registered."""
         pdf = FPDF()
         pdf.set_auto_page_break(auto=True, margin=15)
         
@@ -36,7 +79,40 @@ class PDFCreatorTool(BaseTool):
         
         # Set default font
         pdf.set_font("DejaVu", size=12)
-        
+        return pdf, bold_available
+
+    def _sections(self, content: dict, use_media: bool, media_dir: str, epub_kdp: bool):
+        """List the document's page groups as (name, inputs, image_paths, render) tuples."""
+        sections = [(
+            "front",
+            {k: content.get(k) for k in ("intro_spread", "commitment_page")},
+            [],
+            lambda pdf, bold: self._render_front(pdf, bold, content)
+        )]
+
+        # Day Pages
+        if "days" in content and not epub_kdp:
+            for day in content["days"]:
+                image_path = os.path.join(media_dir, f"{day['image_full_page']}.png") if use_media and media_dir else None
+                bottom_image_path = os.path.join(media_dir, f"{day['image_bottom']}.png") if use_media and media_dir else None
+                sections.append((
+                    f"day_{day['day']}",
+                    day,
+                    [image_path, bottom_image_path],
+                    lambda pdf, bold, day=day, image_path=image_path, bottom_image_path=bottom_image_path:
+                        self._render_day(pdf, bold, day, image_path, bottom_image_path)
+                ))
+
+        if "certificate" in content:
+            sections.append((
+                "certificate",
+                content["certificate"],
+                [],
+                lambda pdf, bold: self._render_certificate(pdf, bold, content["certificate"])
+            ))
+        return sections
+
+    def _render_front(self, pdf, bold_available, content):
         # Page 1: Blank
         pdf.add_page()
 
@@ -69,67 +145,58 @@ class PDFCreatorTool(BaseTool):
             pdf.set_y(-30)  # Near bottom
             pdf.cell(0, 10, "Signature: ______________________________", ln=True, align="C")
 
-        # Day Pages
-        if "days" in content and not epub_kdp:
-            for day in content["days"]:
-                # First page: Day, Image, Pre-writeup, Bottom Image
-                pdf.add_page()
-                pdf.set_font("DejaVu", "B" if bold_available else "", 14)
-                pdf.cell(0, 10, f"Day {day['day']}", ln=True, align="C")
-                pdf.set_font("DejaVu", size=12)
-                
-                # Image placeholder (top center)
-                image_path = os.path.join(media_dir, f"{day['image_full_page']}.png") if use_media and media_dir else None
-                if use_media and media_dir and os.path.exists(image_path) and image_path.endswith('.png'):
-                    pdf.image(image_path, x=(pdf.w - 100) / 2, y=20, w=100)
-                    pdf.ln(110)  # Move below image
-                else:
-                    pdf.ln(10)
-                    pdf.cell(0, 10, f"[Image: {day['image_full_page']}]", ln=True, align="C")
-                    pdf.ln(10)
-                
-                # Pre-writeup
-                pdf.multi_cell(0, 10, day["pre_writeup"], align="C")
-                
-                # Bottom image (branding)
-                bottom_image_path = os.path.join(media_dir, f"{day['image_bottom']}.png") if use_media and media_dir else None
-                pdf.set_y(-30)
-                # Note: Fixed typo 'custom_image_path' to 'bottom_image_path'
-                if use_media and media_dir and os.path.exists(bottom_image_path) and bottom_image_path.endswith('.png'):
-                    pdf.image(bottom_image_path, x=(pdf.w - 100) / 2, w=100)
-                else:
-                    pdf.cell(0, 10, f"[Image: {day['image_bottom']}]", ln=True, align="C")
-
-                # Second page: Prompt and Lines
-                pdf.add_page()
-                pdf.set_font("DejaVu", "B" if bold_available else "", 14)
-                pdf.cell(0, 10, "Prompt", ln=True, align="C")
-                pdf.set_font("DejaVu", size=12)
-                pdf.ln(10)
-                pdf.multi_cell(0, 10, day["prompt"], align="C")
-                pdf.ln(10)
-                y_start = pdf.get_y()
-                while y_start < pdf.h - 20:  # Full page minus margins
-                    pdf.line(10, y_start, pdf.w - 10, y_start)  # Full-width thin line
-                    y_start += 5
-                pdf.set_line_width(0.1)  # Very thin lines
+    def _render_day(self, pdf, bold_available, day, image_path, bottom_image_path):
+        # First page: Day, Image, Pre-writeup, Bottom Image
+        pdf.add_page()
+        pdf.set_font("DejaVu", "B" if bold_available else "", 14)
+        pdf.cell(0, 10, f"Day {day['day']}", ln=True, align="C")
+        pdf.set_font("DejaVu", size=12)
+        
+        # Image placeholder (top center)
+        if image_path and os.path.exists(image_path) and image_path.endswith('.png'):
+            pdf.image(image_path, x=(pdf.w - 100) / 2, y=20, w=100)
+            pdf.ln(110)  # Move below image
+        else:
+            pdf.ln(10)
+            pdf.cell(0, 10, f"[Image: {day['image_full_page']}]", ln=True, align="C")
+            pdf.ln(10)
+        
+        # Pre-writeup
+        pdf.multi_cell(0, 10, day["pre_writeup"], align="C")
+        
+        # Bottom image (branding)
+        pdf.set_y(-30)
+        if bottom_image_path and os.path.exists(bottom_image_path) and bottom_image_path.endswith('.png'):
+            pdf.image(bottom_image_path, x=(pdf.w - 100) / 2, w=100)
+        else:
+            pdf.cell(0, 10, f"[Image: {day['image_bottom']}]", ln=True, align="C")
+
+        # Second page: Prompt and Lines
+        pdf.add_page()
+        pdf.set_font("DejaVu", "B" if bold_available else "", 14)
+        pdf.cell(0, 10, "Prompt", ln=True, align="C")
+        pdf.set_font("DejaVu", size=12)
+        pdf.ln(10)
+        pdf.multi_cell(0, 10, day["prompt"], align="C")
+        pdf.ln(10)
+        pdf.set_line_width(0.1)  # Very thin lines
+        y_start = pdf.get_y()
+        while y_start < pdf.h - 20:  # Full page minus margins
+            pdf.line(10, y_start, pdf.w - 10, y_start)  # Full-width thin line
+            y_start += 5
 
+    def _render_certificate(self, pdf, bold_available, certificate):
         # Certificate Page
-        if "certificate" in content:
-            pdf.add_page()
-            pdf.set_font("DejaVu", "B" if bold_available else "", 14)
-            pdf.cell(0, 10, "Congratulations", ln=True, align="C")
-            pdf.set_font("DejaVu", size=12)
-            pdf.ln(50)
-            if "summary" in content["certificate"]:
-                pdf.multi_cell(0, 10, content["certificate"]["summary"], align="C")
-            if "text" in content["certificate"]:
-                pdf.ln(10)
-                pdf.multi_cell(0, 10, content["certificate"]["text"], align="C")
-
-        pdf.output(output_path)
-        log_debug(f"PDF generated at {output_path}")
-        return output_path
+        pdf.add_page()
+        pdf.set_font("DejaVu", "B" if bold_available else "", 14)
+        pdf.cell(0, 10, "Congratulations", ln=True, align="C")
+        pdf.set_font("DejaVu", size=12)
+        pdf.ln(50)
+        if "summary" in certificate:
+            pdf.multi_cell(0, 10, certificate["summary"], align="C")
+        if "text" in certificate:
+            pdf.ln(10)
+            pdf.multi_cell(0, 10, certificate["text"], align="C")
 
 def create_pdf_builder_agent(llm):
     """Create a PDF builder agent to generate PDFs from JSON content."""
@@ -147,8 +214,20 @@ def create_pdf_builder_agent(llm):
         allow_delegation=False
     )
 
+def _generate_epub(content: dict, source_file: str, pdf_dir: str, run_dir: str):
+    """Stream the full journal, day pages included, into an EPUB next to the KDP PDF."""
+    epub_path = os.path.join(pdf_dir, f"{os.path.basename(source_file).replace('.json', '')}.epub")
+    epub_media_dir = os.path.join(run_dir, MEDIA_SUBDIR)
+    write_journal_epub(content, epub_path, epub_media_dir if os.path.isdir(epub_media_dir) else None)
+    log_debug(f"Generated EPUB: {epub_path}")
+    return epub_path
+
+def _pdf_cache_dir(run_dir, pdf_path):
+    """Per-document cache of rendered page groups, hidden inside the run directory."""
+    return os.path.join(run_dir, PDF_CACHE_SUBDIR, os.path.splitext(os.path.basename(pdf_path))[0])
+
 def generate_pdf(self, run_dir: str, use_media: bool = False, epub_kdp: bool = False):
-    """Generate PDFs from JSON files in the run directory."""
+    """Generate PDFs from JSON files in the run directory, plus EPUBs when epub_kdp is set."""
     json_dir = os.path.join(run_dir, JSON_SUBDIR)
     pdf_dir = os.path.join(run_dir, PDF_SUBDIR)
     media_dir = os.path.join(run_dir, MEDIA_SUBDIR) if use_media else None
@@ -184,9 +263,11 @@ def generate_pdf(self, run_dir: str, use_media: bool = False, epub_kdp: bool = F
                 journal_data = json.load(f)
             suffix = "_epub_kdp" if epub_kdp else ""
             journal_pdf = os.path.join(pdf_dir, f"{os.path.basename(journal_file).replace('.json', '')}{suffix}.pdf")
-            self.tools[0]._run(journal_data, journal_pdf, use_media, media_dir, epub_kdp)
+            self.tools[0]._run(journal_data, journal_pdf, use_media, media_dir, epub_kdp, _pdf_cache_dir(run_dir, journal_pdf))
             pdf_result["journal_pdf"] = journal_pdf
             log_debug(f"Generated journal PDF: {journal_pdf}")
+            if epub_kdp:
+                pdf_result["journal_epub"] = _generate_epub(journal_data, journal_file, pdf_dir, run_dir)
         except Exception as e:
             log_debug(f"Failed to generate journal PDF: {e}")
             print(f"Error generating journal PDF: {e}")
@@ -197,11 +278,20 @@ def generate_pdf(self, run_dir: str, use_media: bool = False, epub_kdp: bool = F
                 lead_magnet_data = json.load(f)
             suffix = "_epub_kdp" if epub_kdp else ""
             lead_magnet_pdf = os.path.join(pdf_dir, f"{os.path.basename(lead_magnet_file).replace('.json', '')}{suffix}.pdf")
-            self.tools[0]._run(lead_magnet_data, lead_magnet_pdf, use_media, media_dir, epub_kdp)
+            self.tools[0]._run(lead_magnet_data, lead_magnet_pdf, use_media, media_dir, epub_kdp, _pdf_cache_dir(run_dir, lead_magnet_pdf))
             pdf_result["lead_magnet_pdf"] = lead_magnet_pdf
             log_debug(f"Generated lead magnet PDF: {lead_magnet_pdf}")
+            if epub_kdp:
+                pdf_result["lead_magnet_epub"] = _generate_epub(lead_magnet_data, lead_magnet_file, pdf_dir, run_dir)
         except Exception as e:
             log_debug(f"Failed to generate lead magnet PDF: {e}")
             print(f"Error generating lead magnet PDF: {e}")
     
+    record_stage(run_dir, "pdf", status="completed" if pdf_result else "failed", artifacts={
+        "pdf": [path for key, path in pdf_result.items() if key.endswith("_pdf")],
+        "epub": [path for key, path in pdf_result.items() if key.endswith("_epub")],
+    })
+    # The run is finished; share its artifacts' bytes with every other run
+    if pdf_result and BLOB_STORE_ENABLED:
+        BlobStore(BLOB_STORE_DIR).ingest_run(run_dir)
     return pdf_result
\ No newline at end of file
@@ -2,7 +2,11 @@ from crewai import Agent
 from tools.tools import BlogSummarySearchTool
 import os
 from datetime import datetime
-from config.settings import VALID_RESEARCH_DEPTHS, LLM_SUBDIR, DATE_FORMAT
+from config.settings import (
+    VALID_RESEARCH_DEPTHS, LLM_SUBDIR, DATE_FORMAT, RESEARCH_STORE_DIRS, RESEARCH_REUSE_MODE,
+    RESEARCH_REUSE_THRESHOLD, RESEARCH_TOPUP_THRESHOLD, RESEARCH_TOPUP_MAX_SHARE
+)
+from tools.research_store import ResearchStore, merge_insights
 from utils import parse_llm_json, log_debug
 
 def create_research_agent(llm):
@@ -18,43 +22,93 @@ def create_research_agent(llm):
         allow_delegation=False
     )
 
-def research_content(self, theme: str, depth: str, run_dir: str):
-    """Gather research content based on theme and user-specified depth."""
+def _normalize_research(research_data):
+    """Coerce the LLM's research response into a list of insight dicts."""
+    # Ensure research_data is a list
+    if isinstance(research_data, dict):
+        # If it's a dict, try to convert to list
+        if 'insights' in research_data:
+            research_data = research_data['insights']
+        else:
+            # If no insights key, try to extract values
+            research_data = list(research_data.values())
+    if isinstance(research_data, list):
+        return research_data
+    log_debug(f"Unexpected research data format: {type(research_data)}. Expected list.")
+    return []
+
+def _find_reusable_research(theme: str, run_dir: str):
+    """Return (best_score, insights) from earlier runs whose theme is a near match."""
+    store = ResearchStore(RESEARCH_STORE_DIRS)
+    matches = [m for m in store.search(theme, exclude_run_dir=run_dir) if m["score"] >= RESEARCH_TOPUP_THRESHOLD]
+    if not matches:
+        return 0.0, []
+    for match in matches:
+        log_debug(f"Research store match {match['score']} for '{theme}': {match['theme']} ({match['run_dir']})")
+    return matches[0]["score"], merge_insights(*[match["insights"] for match in matches])
+
+def research_content(self, theme: str, depth: str, run_dir: str, reuse_mode: str = None):
+    """Gather research content based on theme and user-specified depth.
+
+    reuse_mode "auto" (default from settings) checks the local research store first:
+    a near-identical theme with enough insights is reused outright, a similar theme
+    contributes at most RESEARCH_TOPUP_MAX_SHARE of the insights and the rest are
+    fetched fresh. "off" always asks the LLM.
+    """
     timestamp = datetime.now().strftime(DATE_FORMAT)
     output_dir = os.path.join(run_dir, LLM_SUBDIR)
     os.makedirs(output_dir, exist_ok=True)
     research_file = os.path.join(output_dir, f"research_output_{timestamp}.txt")
+    max_insights = VALID_RESEARCH_DEPTHS.get(depth, VALID_RESEARCH_DEPTHS["deep"])
+    reuse_mode = reuse_mode or RESEARCH_REUSE_MODE
+
+    reused = []
+    if reuse_mode != "off":
+        try:
+            best_score, reused = _find_reusable_research(theme, run_dir)
+        except Exception as e:
+            log_debug(f"Research store lookup failed, researching from scratch: {e}")
+            best_score, reused = 0.0, []
+        if best_score >= RESEARCH_REUSE_THRESHOLD and len(reused) >= max_insights:
+            log_debug(f"Reusing {max_insights} stored insights for '{theme}' (match {best_score})")
+            print(f"Reusing research from a previous run with a matching theme (similarity {best_score:.2f}).")
+            return reused[:max_insights]
+        if best_score < RESEARCH_REUSE_THRESHOLD:
+            # Another theme's research only seeds this one; most of it is researched fresh
+            reused = reused[:int(max_insights * RESEARCH_TOPUP_MAX_SHARE)]
 
     theme_part = theme.split(" for ")[1] if " for " in theme else theme
-    research_prompt = (
-        "Generate 25 unique journaling insights for '" + theme + "' based on blogs, books, and studies. "
-        "Each insight should have a 'technique' (e.g., '" + theme_part + " Insight 1') and a 'description' (50–100 words). "
-        "Ensure variety: include historical context, psychological benefits, and actionable tips. "
-        "Output as a JSON list of dictionaries."
-    )
+    if reused:
+        missing = max_insights - len(reused)
+        known = "; ".join(str(insight.get("technique", "")) for insight in reused)
+        research_prompt = (
+            "Generate " + str(missing) + " unique journaling insights for '" + theme + "' based on blogs, books, and studies. "
+            "Each insight should have a 'technique' (e.g., '" + theme_part + " Insight " + str(len(reused) + 1) + "') and a 'description' (50–100 words). "
+            "Do not repeat these existing techniques: " + known + ". "
+            "Ensure variety: include historical context, psychological benefits, and actionable tips. "
+            "Output as a JSON list of dictionaries."
+        )
+        log_debug(f"Topping up {len(reused)} stored insights with {missing} new ones for theme '{theme}'")
+        print(f"Reusing {len(reused)} insights from previous research, fetching {missing} more.")
+    else:
+        research_prompt = (
+            "Generate 25 unique journaling insights for '" + theme + "' based on blogs, books, and studies. "
+            "Each insight should have a 'technique' (e.g., '" + theme_part + " Insight 1') and a 'description' (50–100 words). "
+            "Ensure variety: include historical context, psychological benefits, and actionable tips. "
+            "Output as a JSON list of dictionaries."
+        )
     log_debug(f"Sending research prompt for theme '{theme}' with depth '{depth}'")
     try:
-        research_data = parse_llm_json(self.llm, research_prompt, output_dir, f"research_output_{timestamp}.txt", flatten=False)
-        max_insights = VALID_RESEARCH_DEPTHS.get(depth, VALID_RESEARCH_DEPTHS["deep"])
-
-        # Ensure research_data is a list
-        if isinstance(research_data, dict):
-            # If it's a dict, try to convert to list
-            if 'insights' in research_data:
-                research_data = research_data['insights']
-            else:
-                # If no insights key, try to extract values
-                research_data = list(research_data.values())
-
-        # Slice the list to max_insights
-        if isinstance(research_data, list):
-            result = research_data[:max_insights] if max_insights < len(research_data) else research_data
-        else:
-            log_debug(f"Unexpected research data format: {type(research_data)}. Expected list.")
-            result = []
+        research_data = _normalize_research(
+            parse_llm_json(self.llm, research_prompt, output_dir, f"research_output_{timestamp}.txt", flatten=False)
+        )
+        research_data = merge_insights(reused, research_data) if reused else research_data
+
+        # Slice the merged list to max_insights
+        result = research_data[:max_insights]
 
         log_debug(f"Research completed with {len(result)} insights")
         return result
     except Exception as e:
         log_debug(f"Failed to parse research response: {e} - Saved to {research_file}")
-        return []
\ No newline at end of file
+        return reused
@@ -13,6 +13,8 @@ DEBUG = True
 
 # Media Generation Toggle
 ENABLE_MEDIA_LLM = False  # Set to True to enable real media LLM calls, False for dry run with placeholders
+MEDIA_CONCURRENCY = 4  # Maximum image generation calls in flight at once
+MEDIA_RATE_LIMITS = {"media_llm": 2.0}  # Requests per second allowed per image provider
 
 # Base Output Configuration
 OUTPUT_DIR = "Projects_Derived"
@@ -20,6 +22,11 @@ LLM_SUBDIR = "LLM_output"
 JSON_SUBDIR = "Json_output"
 MEDIA_SUBDIR = "media"
 PDF_SUBDIR = "PDF_output"
+PDF_CACHE_SUBDIR = ".pdf_cache"
+MEDIA_STORE_DIR = os.getenv("MEDIA_STORE_DIR", os.path.join(OUTPUT_DIR, ".media_store"))  # Images shared across projects
+MEDIA_STORE_QUOTA_MB = int(os.getenv("MEDIA_STORE_QUOTA_MB", "2048"))  # Least recently used images are evicted above this
+BLOB_STORE_ENABLED = os.getenv("BLOB_STORE_ENABLED", "true").lower() == "true"  # Deduplicate a run's artifacts once it completes
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", os.path.join(OUTPUT_DIR, ".blobs"))  # Must share a filesystem with the runs
 DATE_FORMAT = "%Y-%m-%d"
 
 # Onboarding Style Configurations
@@ -36,6 +43,48 @@ VALID_RESEARCH_DEPTHS = {
     "deep": 25
 }
 
+# Research Reuse Configuration
+RESEARCH_STORE_DIRS = [OUTPUT_DIR, "LLM_output"]  # Past runs searched for reusable research
+RESEARCH_REUSE_MODE = "auto"  # "auto" reuses or tops up matching research, "off" always asks the LLM
+RESEARCH_REUSE_THRESHOLD = 0.8  # Theme similarity at which stored research is reused outright
+RESEARCH_TOPUP_THRESHOLD = 0.5  # Theme similarity at which stored research is topped up
+RESEARCH_TOPUP_MAX_SHARE = 0.5  # Largest share of a topped-up research set taken from a similar theme
+RESEARCH_DIGEST_TOKEN_BUDGET = 1200  # Approximate token size of the research digest shared by curation prompts
+
+# Local Knowledge Index Configuration
+KNOWLEDGE_DIRS = ["knowledge"]  # Reference documents indexed for grounded research
+KNOWLEDGE_INDEX_DIR = os.getenv("KNOWLEDGE_INDEX_DIR", os.path.join(OUTPUT_DIR, ".knowledge_index"))
+
+# Content Dedupe Configuration
+DEDUPE_THRESHOLD = 0.5  # Estimated Jaccard similarity at which two days count as near-duplicates
+DEDUPE_MAX_ROUNDS = 2  # Regeneration passes for flagged days before accepting the content
+
+# Lead Magnet Configuration
+LEAD_MAGNET_MODE = os.getenv("LEAD_MAGNET_MODE", "derive")  # "derive" condenses the journal, "generate" writes it from the research
+
+# Model Routing Configuration
+MODEL_ROUTING_ENABLED = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true"
+# Candidates per pipeline section, cheapest first; a model of None means the main LLM passed to the agent
+MODEL_ROUTING_POLICY = {
+    "cover": [{"model": "gpt-4o-mini", "max_tokens": 200, "max_latency_s": 10}],
+    "titles": [{"model": "gpt-4o-mini", "max_tokens": 600, "max_latency_s": 15}],
+    "author_styles": [{"model": "gpt-4o-mini", "max_tokens": 800, "max_latency_s": 15}],
+    "intro": [{"model": "gpt-4o-mini", "max_tokens": 1200, "max_latency_s": 30}],
+    "commitment": [{"model": "gpt-4o-mini", "max_tokens": 1000, "max_latency_s": 30}],
+    "certificate": [{"model": "gpt-4o-mini", "max_tokens": 1000, "max_latency_s": 30}],
+    "days": [{"model": None, "max_tokens": None}],
+    "research": [{"model": None, "max_tokens": None}],
+}
+MODEL_ROUTING_STATS_PATH = os.path.join(OUTPUT_DIR, ".model_routing_stats.json")  # Measured latency and failures per model
+MODEL_ROUTING_MAX_FAILURE_RATE = 0.3  # Candidates failing more often than this are skipped
+MODEL_ROUTING_RETRY_AFTER_S = 900  # Skipped candidates are tried again after this long
+
+# LLM Hedging Configuration
+LLM_HEDGING_ENABLED = os.getenv("LLM_HEDGING_ENABLED", "false").lower() == "true"  # Needs model routing for latency history
+LLM_HEDGE_PERCENTILE = 0.9  # A duplicate request is sent once a call runs past this quantile of its section's latency
+LLM_HEDGE_MIN_DELAY_S = 5.0  # Never hedge calls earlier than this
+LLM_HEDGE_BUDGET_PER_MINUTE = 4  # Duplicate requests allowed per rolling minute
+
 # Course Topic Configuration
 COURSE_TOPIC = "Journaling for Personal Growth"
 
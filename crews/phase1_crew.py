@@ -14,7 +14,7 @@ import os
 from datetime import datetime
 from utils import log_debug
 
-def create_phase1_crew(llm, theme: str, research_depth: str, author_style: str, title: str):
+def create_phase1_crew(llm, theme: str, research_depth: str, author_style: str, title: str, include_editing: bool = True):
     """
     Creates the Phase 1 crew for text and image-based course content creation.
     
@@ -24,6 +24,8 @@ def create_phase1_crew(llm, theme: str, research_depth: str, author_style: str,
         research_depth: The depth of research ("light", "medium", "deep").
         author_style: The writing style for content (e.g., "inspirational narrative").
         title: The selected title for the journal (e.g., "Happiness Unleashed").
+        include_editing: Whether to run the editing pass; without it the PDF is built
+            straight from the curated content (used by express workflows).
     
     Returns:
         Crew: A configured Crew instance for Phase 1 execution.
@@ -42,24 +44,34 @@ def create_phase1_crew(llm, theme: str, research_depth: str, author_style: str,
     # Create all necessary agents
     research_agent = create_research_agent(llm)
     content_curator_agent = create_content_curator_agent(llm)
-    editor_agent = create_editor_agent(llm)
     pdf_builder_agent = create_pdf_builder_agent(llm)
     
     # Create tasks with contextual inputs
     research_task = create_research_task(research_agent, theme=theme, depth=research_depth, run_dir=run_dir)
     curation_task = create_curation_task(content_curator_agent, theme=theme, title=title, author_style=author_style, run_dir=run_dir)
-    editing_task = create_editing_task(editor_agent, author_style=author_style)
     pdf_task = create_pdf_task(pdf_builder_agent, run_dir=run_dir, use_media=True)
     
     # Configure task dependencies
     curation_task.context = [research_task]
-    editing_task.context = [curation_task]
-    pdf_task.context = [editing_task]
+    agents = [research_agent, content_curator_agent]
+    tasks = [research_task, curation_task]
+    if include_editing:
+        editor_agent = create_editor_agent(llm)
+        editing_task = create_editing_task(editor_agent, author_style=author_style)
+        editing_task.context = [curation_task]
+        pdf_task.context = [editing_task]
+        agents.append(editor_agent)
+        tasks.append(editing_task)
+    else:
+        log_debug("Skipping the editing pass; building the PDF from curated content")
+        pdf_task.context = [curation_task]
+    agents.append(pdf_builder_agent)
+    tasks.append(pdf_task)
     
     # Create the crew
     crew = Crew(
-        agents=[research_agent, content_curator_agent, editor_agent, pdf_builder_agent],
-        tasks=[research_task, curation_task, editing_task, pdf_task],
+        agents=agents,
+        tasks=tasks,
         verbose=True,  # Detailed logging
         process="sequential"  # Explicitly use sequential process
     )
@@ -79,8 +91,8 @@ def process_results(crew_results):
     """
     log_debug(f"Processing Phase 1 crew results: {crew_results}")
     
-    if crew_results and len(crew_results) >= 4:
-        pdf_result = crew_results[3]  # Assumes PDF task is the 4th task
+    if crew_results and len(crew_results) >= 3:
+        pdf_result = crew_results[-1]  # PDF task is always the last task
         
         if not isinstance(pdf_result, dict) or "journal_pdf" not in pdf_result:
             log_debug("PDF task result invalid or incomplete")
@@ -44,6 +44,9 @@ from ...core.deps import get_db, get_current_user
 from ...models.user import User
 from ...models.project import Project
 from ...models.journal import JournalEntry, JournalTemplate
+from ...services.workflow_deadline_service import workflow_deadline_service
+from ...services.project_manifest import MANIFEST_FILENAME, load_manifest, artifacts_of_kind
+from ...services.project_bundle import BUNDLE_SUFFIX, ProjectBundle, unpack_bundle
 from .websocket import manager, MessageType
 
 router = APIRouter()
@@ -127,11 +130,12 @@ class CrewAIWorkflowService:
         # Start background workflow execution
         asyncio.create_task(self._execute_workflow(workflow_id, request.project_id, request.preferences, db))
 
+        workflow_type = request.preferences.get('workflow_type', 'standard')
         return WorkflowResponse(
             workflow_id=workflow_id,
             status="pending",
             message="CrewAI workflow started successfully",
-            estimated_time_minutes=30
+            estimated_time_minutes=int(workflow_deadline_service.deadline_seconds(workflow_type) // 60)
         )
 
     def _initialize_workflow_steps(self) -> List[Dict]:
@@ -181,7 +185,7 @@ class CrewAIWorkflowService:
             }
         ]
 
-    async def _execute_workflow(self, workflow_id: str, project_id: int, preferences: Dict[str, Any]):
+    async def _execute_workflow(self, workflow_id: str, project_id: int, preferences: Dict[str, Any], db: AsyncSession = None):
         """Execute the CrewAI workflow with enhanced progress tracking and continuation support"""
         try:
             workflow = self.active_workflows[workflow_id]
@@ -195,7 +199,13 @@ class CrewAIWorkflowService:
             # Store workflow type in workflow data
             workflow["workflow_type"] = workflow_type
 
-            # Set up run directory
+            # Overall deadline for the run, split into per-stage budgets as it progresses
+            deadline = workflow_deadline_service.start(workflow_type)
+            workflow["estimated_completion"] = deadline.completes_by
+
+            # Set up run directory, restoring it first if it was moved to cold storage
+            if existing_run_dir and await asyncio.to_thread(_restore_packed_run, existing_run_dir):
+                log_debug(f"Restored {existing_run_dir} from its bundle to continue it")
             if existing_run_dir and os.path.exists(existing_run_dir):
                 # Use existing project directory for continuation
                 run_dir = existing_run_dir
@@ -219,7 +229,8 @@ class CrewAIWorkflowService:
                 "project_id": project_id,
                 "action": action,
                 "preferences": preferences,
-                "estimated_duration_minutes": 30,
+                "estimated_duration_minutes": int(deadline.total_seconds // 60),
+                "deadline": deadline.completes_by.isoformat(),
                 "is_continuation": existing_run_dir is not None
             })
 
@@ -242,12 +253,13 @@ class CrewAIWorkflowService:
             else:
                 # Execute workflow based on type
                 if workflow_type == "express":
-                    await self._execute_express_workflow(workflow_id, llm, preferences, run_dir)
+                    await self._execute_express_workflow(workflow_id, llm, preferences, run_dir, deadline)
                 elif workflow_type == "comprehensive":
-                    await self._execute_comprehensive_workflow(workflow_id, llm, preferences, run_dir)
+                    await self._execute_comprehensive_workflow(workflow_id, llm, preferences, run_dir, deadline)
                 else:
                     # Standard workflow (default)
-                    await self._execute_standard_workflow(workflow_id, llm, preferences, run_dir)
+                    await self._execute_standard_workflow(workflow_id, llm, preferences, run_dir, deadline)
+                workflow["deadline_summary"] = deadline.summary()
 
             # Complete workflow
             workflow["status"] = "completed"
@@ -260,7 +272,8 @@ class CrewAIWorkflowService:
                 "workflow_id": workflow_id,
                 "result_data": workflow.get("result_data"),
                 "action": action,
-                "total_duration": (datetime.now() - workflow["start_time"]).total_seconds()
+                "total_duration": (datetime.now() - workflow["start_time"]).total_seconds(),
+                "deadline_summary": workflow.get("deadline_summary")
             })
 
         except Exception as e:
@@ -481,7 +494,7 @@ class CrewAIWorkflowService:
             await manager.start_agent_subtask(workflow_id, agent_id, "Generating title ideas", 3)
 
             await manager.update_agent_progress(workflow_id, agent_id, 3, "Analyzing theme and style preferences...")
-            result = discover_idea(discovery_agent, preferences['theme'], preferences['title_style'])
+            result = await asyncio.to_thread(discover_idea, discovery_agent, preferences['theme'], preferences['title_style'])
 
             await manager.update_agent_progress(workflow_id, agent_id, 4, "Processing generated titles...")
 
@@ -534,7 +547,7 @@ class CrewAIWorkflowService:
             await manager.update_agent_progress(workflow_id, agent_id, 3, "Researching " + preferences['theme'] + "...")
 
             research_agent = create_research_agent(llm)
-            result = research_content(research_agent, preferences['theme'], preferences['research_depth'], run_dir)
+            result = await asyncio.to_thread(research_content, research_agent, preferences['theme'], preferences['research_depth'], run_dir)
 
             await manager.update_agent_progress(workflow_id, agent_id, 4, "Processing research insights...")
 
@@ -592,7 +605,7 @@ class CrewAIWorkflowService:
             await manager.update_agent_progress(workflow_id, agent_id, 3, "Creating 30-day journal structure...")
 
             await manager.start_agent_subtask(workflow_id, agent_id, "Generating daily content", 2)
-            result = curate_content(curator_agent, research_data, preferences['theme'], preferences['title'], preferences['author_style'], run_dir)
+            result = await asyncio.to_thread(curate_content, curator_agent, research_data, preferences['theme'], preferences['title'], preferences['author_style'], run_dir)
 
             await manager.update_agent_progress(workflow_id, agent_id, 4, "Finalizing content structure...")
 
@@ -657,7 +670,7 @@ class CrewAIWorkflowService:
                 lead_magnet_file = journal_file
 
             await manager.start_agent_subtask(workflow_id, agent_id, "Final content review", 2)
-            result = edit_content(editor_agent, journal_file, lead_magnet_file, preferences['author_style'])
+            result = await asyncio.to_thread(edit_content, editor_agent, journal_file, lead_magnet_file, preferences['author_style'])
 
             await manager.update_agent_progress(workflow_id, agent_id, 4, "Finalizing edited content...")
 
@@ -705,7 +718,7 @@ class CrewAIWorkflowService:
 
             await manager.update_agent_progress(workflow_id, agent_id, 3, "Processing media requirements...")
 
-            result = generate_media(media_agent, run_dir, skip_generation=True)  # Skip actual generation for now
+            result = await asyncio.to_thread(generate_media, media_agent, run_dir, skip_generation=True)  # Skip actual generation for now
 
             await manager.update_agent_progress(workflow_id, agent_id, 4, "Finalizing media assets...")
 
@@ -753,7 +766,7 @@ class CrewAIWorkflowService:
             await manager.update_agent_progress(workflow_id, agent_id, 3, "Building professional layouts...")
 
             await manager.start_agent_subtask(workflow_id, agent_id, "Finalizing PDF exports", 2)
-            result = generate_pdf(pdf_agent, run_dir, use_media=False)  # Generate PDFs
+            result = await asyncio.to_thread(generate_pdf, pdf_agent, run_dir, use_media=False)  # Generate PDFs
 
             await manager.update_agent_progress(workflow_id, agent_id, 4, "Finalizing PDF documents...")
 
@@ -925,61 +938,90 @@ class CrewAIWorkflowService:
             })
             raise
 
-    async def _execute_express_workflow(self, workflow_id: str, llm, preferences: Dict, run_dir: str):
+    async def _run_optional_stage(self, workflow_id: str, deadline, stage: str, make_step):
+        """Run a stage the journal can ship without, skipping it when the deadline is too close"""
+        if deadline.is_short(stage):
+            deadline.degrade(stage, f"{int(deadline.budget_for(stage))}s left for an expected {int(workflow_deadline_service.expected(stage))}s")
+            if stage in deadline.pending:
+                deadline.pending.remove(stage)
+        else:
+            await deadline.run(stage, make_step(), required=False)
+            if stage not in deadline.degraded:
+                return
+        await self._send_workflow_message(workflow_id, {
+            "type": MessageType.SYSTEM_NOTIFICATION.value,
+            "message": f"Skipped {stage.replace('_', ' ')} to finish within the workflow deadline"
+        })
+
+    def _research_preferences(self, deadline, preferences: Dict) -> Dict:
+        """Preferences with research depth reduced to what the remaining budget allows"""
+        depth = workflow_deadline_service.research_depth_for(deadline, preferences.get('research_depth', 'medium'), VALID_RESEARCH_DEPTHS)
+        return {**preferences, 'research_depth': depth}
+
+    async def _execute_express_workflow(self, workflow_id: str, llm, preferences: Dict, run_dir: str, deadline=None):
         """Execute express workflow with essential agents (Discovery + Content Curation + PDF)"""
+        deadline = deadline or workflow_deadline_service.start("express")
 
         # Step 1: Execute discovery agent
-        await self._execute_discovery_step_enhanced(workflow_id, llm, preferences, run_dir)
+        await deadline.run("discovery", self._execute_discovery_step_enhanced(workflow_id, llm, preferences, run_dir))
 
         # Step 2: Execute content curator agent
-        await self._execute_curation_step_enhanced(workflow_id, llm, preferences, run_dir)
+        await deadline.run("curation", self._execute_curation_step_enhanced(workflow_id, llm, preferences, run_dir))
 
         # Step 3: Execute PDF builder agent (skip detailed editing and media for speed)
-        await self._execute_pdf_step_enhanced(workflow_id, llm, preferences, run_dir)
+        await deadline.run("pdf_building", self._execute_pdf_step_enhanced(workflow_id, llm, preferences, run_dir))
 
-    async def _execute_standard_workflow(self, workflow_id: str, llm, preferences: Dict, run_dir: str):
+    async def _execute_standard_workflow(self, workflow_id: str, llm, preferences: Dict, run_dir: str, deadline=None):
         """Execute standard workflow with core agents (Discovery + Research + Content + Editor + PDF)"""
+        deadline = deadline or workflow_deadline_service.start("standard")
 
         # Step 1: Execute discovery agent
-        await self._execute_discovery_step_enhanced(workflow_id, llm, preferences, run_dir)
+        await deadline.run("discovery", self._execute_discovery_step_enhanced(workflow_id, llm, preferences, run_dir))
 
-        # Step 2: Execute research agent
-        await self._execute_research_step_enhanced(workflow_id, llm, preferences, run_dir)
+        # Step 2: Execute research agent, with fewer insights if time is short
+        research_preferences = self._research_preferences(deadline, preferences)
+        await deadline.run("research", self._execute_research_step_enhanced(workflow_id, llm, research_preferences, run_dir))
 
         # Step 3: Execute content curator agent
-        await self._execute_curation_step_enhanced(workflow_id, llm, preferences, run_dir)
+        await deadline.run("curation", self._execute_curation_step_enhanced(workflow_id, llm, preferences, run_dir))
 
-        # Step 4: Execute editor agent
-        await self._execute_editing_step_enhanced(workflow_id, llm, preferences, run_dir)
+        # Step 4: Execute editor agent (skipped when time is short; PDFs fall back to the unedited content)
+        await self._run_optional_stage(workflow_id, deadline, "editing",
+                                       lambda: self._execute_editing_step_enhanced(workflow_id, llm, preferences, run_dir))
 
         # Step 5: Execute PDF builder agent
-        await self._execute_pdf_step_enhanced(workflow_id, llm, preferences, run_dir)
+        await deadline.run("pdf_building", self._execute_pdf_step_enhanced(workflow_id, llm, preferences, run_dir))
 
-    async def _execute_comprehensive_workflow(self, workflow_id: str, llm, preferences: Dict, run_dir: str):
+    async def _execute_comprehensive_workflow(self, workflow_id: str, llm, preferences: Dict, run_dir: str, deadline=None):
         """Execute comprehensive workflow with all 9 agents for premium quality"""
+        deadline = deadline or workflow_deadline_service.start("comprehensive")
 
         # Step 1: Execute discovery agent
-        await self._execute_discovery_step_enhanced(workflow_id, llm, preferences, run_dir)
+        await deadline.run("discovery", self._execute_discovery_step_enhanced(workflow_id, llm, preferences, run_dir))
 
-        # Step 2: Execute research agent with deep research
+        # Step 2: Execute research agent with deep research, reduced only if the deadline requires it
         deep_preferences = preferences.copy()
         deep_preferences['research_depth'] = 'deep'  # Ensure deep research for comprehensive
-        await self._execute_research_step_enhanced(workflow_id, llm, deep_preferences, run_dir)
+        deep_preferences = self._research_preferences(deadline, deep_preferences)
+        await deadline.run("research", self._execute_research_step_enhanced(workflow_id, llm, deep_preferences, run_dir))
 
         # Step 3: Execute content curator agent
-        await self._execute_curation_step_enhanced(workflow_id, llm, preferences, run_dir)
+        await deadline.run("curation", self._execute_curation_step_enhanced(workflow_id, llm, preferences, run_dir))
 
         # Step 4: Execute editor agent with enhanced polishing
-        await self._execute_editor_step_enhanced(workflow_id, llm, preferences, run_dir)
+        await self._run_optional_stage(workflow_id, deadline, "editing",
+                                       lambda: self._execute_editing_step_enhanced(workflow_id, llm, preferences, run_dir))
 
-        # Step 5: Execute media agent with full image generation
-        await self._execute_media_step_enhanced(workflow_id, llm, preferences, run_dir)
+        # Step 5: Execute media agent with full image generation (placeholders when time is short)
+        await self._run_optional_stage(workflow_id, deadline, "media",
+                                       lambda: self._execute_media_step_enhanced(workflow_id, llm, preferences, run_dir))
 
         # Step 6: Execute PDF builder agent with premium formatting
-        await self._execute_pdf_step_enhanced(workflow_id, llm, preferences, run_dir)
+        await deadline.run("pdf_building", self._execute_pdf_step_enhanced(workflow_id, llm, preferences, run_dir))
 
         # Step 7: Execute EPUB workflow for additional formats
-        await self._execute_epub_workflow(workflow_id, llm, preferences, run_dir)
+        await self._run_optional_stage(workflow_id, deadline, "epub",
+                                       lambda: self._execute_epub_workflow(workflow_id, llm, preferences, run_dir))
 
     async def resume_workflow(self, workflow_id: str, user_id: int):
         """Resume a paused or interrupted workflow"""
@@ -991,6 +1033,10 @@ class CrewAIWorkflowService:
         if workflow["status"] not in ["paused", "interrupted"]:
             raise HTTPException(status_code=400, detail=f"Cannot resume workflow in status: {workflow['status']}")
 
+        # A run paused long enough may have been packed into cold storage
+        if workflow.get("run_dir"):
+            await asyncio.to_thread(_restore_packed_run, workflow["run_dir"])
+
         # Update status to running
         workflow["status"] = "running"
         workflow["end_time"] = None
@@ -1054,6 +1100,101 @@ async def continue_project(
     )
 
 
+def _components_from_manifest(manifest: Dict[str, Any], project_directory: str, result: Dict[str, Any]):
+    """Fill the analysis components and file list from a run's manifest.json"""
+    components = result["components"]
+    stage_times = {name: stage.get("updated_at") for name, stage in manifest.get("stages", {}).items()}
+    kinds = {"config": "config", "discovery": "discovery", "research": "research",
+             "journal": "journal", "lead_magnet": "lead_magnet", "pdf": "pdf"}
+
+    for kind, component in kinds.items():
+        for rel_path, entry in artifacts_of_kind(manifest, kind):
+            file_info = {
+                "name": os.path.basename(rel_path),
+                "path": os.path.join(project_directory, rel_path),
+                "size": entry.get("size", 0),
+                "modified": stage_times.get(entry.get("stage"))
+            }
+            # Later stages supersede earlier ones (edited journal over the draft)
+            components[component] = file_info
+            result["files"].append({"type": component, **file_info})
+
+    media = artifacts_of_kind(manifest, "media")
+    if media:
+        media_dir = os.path.join(project_directory, MEDIA_SUBDIR)
+        components["media"] = {
+            "files": [os.path.basename(rel_path) for rel_path, _ in media],
+            "count": len(media),
+            "directory": media_dir
+        }
+        for rel_path, entry in media:
+            result["files"].append({
+                "name": os.path.basename(rel_path),
+                "type": "media",
+                "path": os.path.join(project_directory, rel_path),
+                "size": entry.get("size", 0),
+                "modified": stage_times.get(entry.get("stage"))
+            })
+
+
+# Component for a Json_output file, by the first matching name fragment
+JSON_COMPONENTS = [("research", "research"), ("journal", "journal"), ("onboarding", "config"),
+                   ("discovery", "discovery"), ("lead_magnet", "lead_magnet")]
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+
+
+def _restore_packed_run(run_dir: str) -> bool:
+    """Unpack a run that was moved to cold storage back into run_dir; True if it was packed"""
+    bundle_path = run_dir.rstrip(os.sep) + BUNDLE_SUFFIX
+    if os.path.exists(run_dir) or not os.path.exists(bundle_path):
+        return False
+    unpack_bundle(bundle_path, run_dir, remove_bundle=True)
+    return True
+
+
+def _components_from_bundle(bundle_path: str, result: Dict[str, Any]):
+    """Fill the analysis components and file list from a project packed into cold storage"""
+    with ProjectBundle(bundle_path) as bundle:
+        data = bundle.read(MANIFEST_FILENAME)
+        if data:
+            # Artifact paths in the manifest are relative, so they resolve inside the bundle
+            _components_from_manifest(json.loads(data), bundle_path, result)
+            return
+        artifacts = bundle.list()
+
+    components = result["components"]
+    media_files = []
+    for artifact in artifacts:
+        subdir, _, name = artifact["path"].partition("/")
+        file_info = {
+            "name": os.path.basename(name),
+            "path": os.path.join(bundle_path, artifact["path"]),
+            "size": artifact["size"],
+            "modified": datetime.fromtimestamp(artifact["mtime"]).isoformat()
+        }
+        if subdir == JSON_SUBDIR and name.endswith('.json'):
+            component = next((component for fragment, component in JSON_COMPONENTS
+                              if fragment in name.lower()), None)
+        elif subdir == PDF_SUBDIR and name.endswith('.pdf'):
+            component = "pdf"
+        elif subdir == MEDIA_SUBDIR and name.lower().endswith(IMAGE_EXTENSIONS):
+            media_files.append(file_info["name"])
+            result["files"].append({"type": "media", **file_info})
+            continue
+        else:
+            component = None
+        if component:
+            components[component] = file_info
+            result["files"].append({"type": component, **file_info})
+
+    if media_files:
+        components["media"] = {
+            "files": media_files,
+            "count": len(media_files),
+            "directory": os.path.join(bundle_path, MEDIA_SUBDIR)
+        }
+
+
 @router.post("/analyze-project/{project_id}")
 async def analyze_project(
     project_id: int,
@@ -1074,8 +1215,10 @@ async def analyze_project(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Analyze project directory
+    # Analyze project directory, or its bundle once it has been moved to cold storage
     project_directory = project.project_directory
+    bundle_path = project_directory.rstrip(os.sep) + BUNDLE_SUFFIX
+    packed = not os.path.exists(project_directory) and os.path.exists(bundle_path)
     analysis = {
         "project_id": project_id,
         "title": project.title,
@@ -1083,84 +1226,92 @@ async def analyze_project(
         "status": project.status,
         "project_directory": project_directory,
         "analysis": {
-            "exists": os.path.exists(project_directory),
+            "exists": os.path.exists(project_directory) or packed,
+            "packed": packed,
             "files": [],
             "components": {},
             "available_actions": []
         }
     }
 
-    if not os.path.exists(project_directory):
+    if not analysis["analysis"]["exists"]:
         return analysis
 
-    # Analyze files in project directory
-    json_dir = os.path.join(project_directory, JSON_SUBDIR)
-    pdf_dir = os.path.join(project_directory, PDF_SUBDIR)
-
     components = analysis["analysis"]["components"]
 
-    # Check for different file types
-    if os.path.exists(json_dir):
-        json_files = [f for f in os.listdir(json_dir) if f.endswith('.json')]
-        for file in json_files:
-            file_path = os.path.join(json_dir, file)
-            file_info = {
-                "name": file,
-                "path": file_path,
-                "size": os.path.getsize(file_path),
-                "modified": datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
-            }
+    # Runs with a manifest list their artifacts by kind; older runs are scanned
+    manifest = None if packed else load_manifest(project_directory)
+    if packed:
+        _components_from_bundle(bundle_path, analysis["analysis"])
+    elif manifest:
+        _components_from_manifest(manifest, project_directory, analysis["analysis"])
+    else:
+        # Analyze files in project directory
+        json_dir = os.path.join(project_directory, JSON_SUBDIR)
+        pdf_dir = os.path.join(project_directory, PDF_SUBDIR)
+
+        # Check for different file types
+        if os.path.exists(json_dir):
+            json_files = [f for f in os.listdir(json_dir) if f.endswith('.json')]
+            for file in json_files:
+                file_path = os.path.join(json_dir, file)
+                file_info = {
+                    "name": file,
+                    "path": file_path,
+                    "size": os.path.getsize(file_path),
+                    "modified": datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
+                }
 
-            # Determine file type based on name
-            if "research" in file.lower():
-                components["research"] = file_info
-                analysis["analysis"]["files"].append({"name": file, "type": "research", **file_info})
-            elif "journal" in file.lower():
-                components["journal"] = file_info
-                analysis["analysis"]["files"].append({"name": file, "type": "journal", **file_info})
-            elif "onboarding" in file.lower():
-                components["config"] = file_info
-                analysis["analysis"]["files"].append({"name": file, "type": "config", **file_info})
-            elif "discovery" in file.lower():
-                components["discovery"] = file_info
-                analysis["analysis"]["files"].append({"name": file, "type": "discovery", **file_info})
-            elif "lead_magnet" in file.lower():
-                components["lead_magnet"] = file_info
-                analysis["analysis"]["files"].append({"name": file, "type": "lead_magnet", **file_info})
-
-    # Check for PDF files
-    if os.path.exists(pdf_dir):
-        pdf_files = [f for f in os.listdir(pdf_dir) if f.endswith('.pdf')]
-        for file in pdf_files:
-            file_path = os.path.join(pdf_dir, file)
-            file_info = {
-                "name": file,
-                "path": file_path,
-                "size": os.path.getsize(file_path),
-                "modified": datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
-            }
-            components["pdf"] = file_info
-            analysis["analysis"]["files"].append({"name": file, "type": "pdf", **file_info})
-
-    # Check for media files
-    media_dir = os.path.join(project_directory, MEDIA_SUBDIR)
-    if os.path.exists(media_dir):
-        media_files = [f for f in os.listdir(media_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif'))]
-        if media_files:
-            components["media"] = {
-                "files": media_files,
-                "count": len(media_files),
-                "directory": media_dir
-            }
-            for file in media_files:
-                file_path = os.path.join(media_dir, file)
+                # Determine file type based on name
+                if "research" in file.lower():
+                    components["research"] = file_info
+                    analysis["analysis"]["files"].append({"name": file, "type": "research", **file_info})
+                elif "journal" in file.lower():
+                    components["journal"] = file_info
+                    analysis["analysis"]["files"].append({"name": file, "type": "journal", **file_info})
+                elif "onboarding" in file.lower():
+                    components["config"] = file_info
+                    analysis["analysis"]["files"].append({"name": file, "type": "config", **file_info})
+                elif "discovery" in file.lower():
+                    components["discovery"] = file_info
+                    analysis["analysis"]["files"].append({"name": file, "type": "discovery", **file_info})
+                elif "lead_magnet" in file.lower():
+                    components["lead_magnet"] = file_info
+                    analysis["analysis"]["files"].append({"name": file, "type": "lead_magnet", **file_info})
+
+        # Check for PDF files
+        if os.path.exists(pdf_dir):
+            pdf_files = [f for f in os.listdir(pdf_dir) if f.endswith('.pdf')]
+            for file in pdf_files:
+                file_path = os.path.join(pdf_dir, file)
                 file_info = {
                     "name": file,
                     "path": file_path,
                     "size": os.path.getsize(file_path),
                     "modified": datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
                 }
-                analysis["analysis"]["files"].append({"name": file, "type": "media", **file_info})
+                components["pdf"] = file_info
+                analysis["analysis"]["files"].append({"name": file, "type": "pdf", **file_info})
+
+        # Check for media files
+        media_dir = os.path.join(project_directory, MEDIA_SUBDIR)
+        if os.path.exists(media_dir):
+            media_files = [f for f in os.listdir(media_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif'))]
+            if media_files:
+                components["media"] = {
+                    "files": media_files,
+                    "count": len(media_files),
+                    "directory": media_dir
+                }
+                for file in media_files:
+                    file_path = os.path.join(media_dir, file)
+                    file_info = {
+                        "name": file,
+                        "path": file_path,
+                        "size": os.path.getsize(file_path),
+                        "modified": datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
+                    }
+                    analysis["analysis"]["files"].append({"name": file, "type": "media", **file_info})
 
     # Determine available actions based on what's completed
     available_actions = []
@@ -20,6 +20,7 @@ try:
     from agents.discovery_agent import discover_idea
     from config.settings import TITLE_STYLES, VALID_RESEARCH_DEPTHS, OUTPUT_DIR, JSON_SUBDIR, DATE_FORMAT
     from utils import parse_llm_json, save_json, log_debug
+    from tools.run_manifest import record_stage
 except ImportError as e:
     print(f"Import error in onboarding: {e}")
     # Fallback configurations
@@ -39,6 +40,8 @@ except ImportError as e:
 from ...core.deps import get_db, get_current_user
 from ...models.user import User
 from ...models.project import Project
+from ...services.project_manifest import MANIFEST_FILENAME, load_manifest
+from ...services.project_bundle import ProjectBundle, project_id_for
 from crewai import LLM
 
 router = APIRouter()
@@ -267,6 +270,12 @@ class OnboardingService:
             prefs_file = os.path.join(json_dir, f"onboarding_prefs_{preferences.title}_{preferences.theme}.json")
             save_json(prefs_data, prefs_file)
 
+            # The manifest is what library readers check first, so it must name the owner
+            record_stage(run_dir, "onboarding", artifacts={"config": prefs_file},
+                         title=preferences.title, theme=preferences.theme,
+                         author_style=preferences.author_style, title_style=preferences.title_style,
+                         research_depth=preferences.research_depth, user_id=user_id)
+
             log_debug(f"Saved onboarding preferences to {prefs_file}")
 
             return OnboardingPreferencesResponse(
@@ -406,6 +415,74 @@ async def get_existing_projects(
         return await _get_projects_from_directory(current_user.id)
 
 
+def _owned_project(user_id: int, project_directory: str, manifest: Optional[Dict[str, Any]],
+                   read_prefs) -> Optional[Dict[str, Any]]:
+    """Project summary when the run belongs to user_id, else None.
+
+    Runs with a manifest record their owner and state there; manifests without
+    an owner (CLI runs, older web runs) fall back to the onboarding preferences.
+    """
+    if manifest and manifest.get("user_id") is not None:
+        if manifest.get("user_id") != user_id:
+            return None
+        return {
+            "title": manifest.get("title", os.path.basename(project_directory)),
+            "theme": manifest.get("theme", "Unknown"),
+            "status": manifest.get("status", "saved"),
+            "created_at": manifest.get("created_at"),
+            "project_directory": project_directory
+        }
+
+    try:
+        prefs = read_prefs()
+    except Exception:
+        return None
+    if not prefs or prefs.get("user_id") != user_id:
+        return None
+    return {
+        "title": prefs.get("title", os.path.basename(project_directory)),
+        "theme": prefs.get("theme", "Unknown"),
+        "status": "saved",
+        "created_at": prefs.get("date"),
+        "project_directory": project_directory
+    }
+
+
+def _project_from_bundle(bundle_path: Path, user_id: int) -> Optional[Dict[str, Any]]:
+    """Project summary for a packed (cold storage) run, read from its bundle"""
+    # Report the directory the run was packed from, which is how its project row refers to it
+    project_directory = str(bundle_path.with_name(project_id_for(bundle_path.name)))
+    try:
+        with ProjectBundle(bundle_path) as bundle:
+            data = bundle.read(MANIFEST_FILENAME)
+            manifest = json.loads(data) if data else None
+
+            def read_prefs():
+                prefs_path = next((artifact["path"] for artifact in bundle.list()
+                                   if artifact["path"].startswith(f"{JSON_SUBDIR}/onboarding_prefs_")
+                                   and artifact["path"].endswith(".json")), None)
+                return json.loads(bundle.read(prefs_path)) if prefs_path else None
+
+            return _owned_project(user_id, project_directory, manifest, read_prefs)
+    except Exception as e:
+        log_debug(f"Could not read bundle {bundle_path}: {e}")
+        return None
+
+
+def _project_from_run_directory(project_dir: Path, user_id: int) -> Optional[Dict[str, Any]]:
+    """Project summary for a run directory"""
+
+    def read_prefs():
+        # Preferences file is named after the run's title and theme
+        prefs_file = next((project_dir / JSON_SUBDIR).glob("onboarding_prefs_*.json"), None)
+        if not prefs_file:
+            return None
+        with open(prefs_file, 'r') as f:
+            return json.load(f)
+
+    return _owned_project(user_id, str(project_dir), load_manifest(str(project_dir)), read_prefs)
+
+
 async def _get_projects_from_directory(user_id: int) -> Dict[str, Any]:
     """Fallback method to get projects from directory structure"""
     try:
@@ -414,24 +491,16 @@ async def _get_projects_from_directory(user_id: int) -> Dict[str, Any]:
             return {"projects": []}
 
         projects = []
-        for project_dir in output_path.iterdir():
-            if project_dir.is_dir():
-                # Try to read preferences file
-                prefs_file = project_dir / JSON_SUBDIR / f"onboarding_prefs_{project_dir.name}.json"
-                if prefs_file.exists():
-                    try:
-                        with open(prefs_file, 'r') as f:
-                            prefs = json.load(f)
-                            if prefs.get("user_id") == user_id:
-                                projects.append({
-                                    "title": prefs.get("title", project_dir.name),
-                                    "theme": prefs.get("theme", "Unknown"),
-                                    "status": "saved",
-                                    "created_at": prefs.get("date"),
-                                    "project_directory": str(project_dir)
-                                })
-                    except Exception:
-                        continue
+        for entry in output_path.iterdir():
+            if entry.is_dir():
+                project = _project_from_run_directory(entry, user_id)
+            elif project_id_for(entry.name):
+                # Projects moved to cold storage live in one bundle file each
+                project = _project_from_bundle(entry, user_id)
+            else:
+                continue
+            if project:
+                projects.append(project)
 
         return {"projects": projects}
 
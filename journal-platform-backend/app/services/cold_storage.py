@@ -0,0 +1,100 @@
+"""
+Cold Storage Compactor
+
+Moves completed projects that have not changed for a while out of the
+active tier. Each one is packed into a compressed bundle (see
+project_bundle) and its directory is removed, so the library's disk use and
+scan cost grow with the number of active projects rather than with every
+project ever generated. Downloads and analysis read cold bundles
+transparently; `project_bundle unpack` restores a project to a directory.
+
+The compactor runs in the background and holds its reads to an I/O budget
+in bytes per second, so it never competes with workflows for the disk. A
+project deleted while it is being packed is never moved: the bundle is only
+renamed into place while the project is still live, and one that landed
+just before the deletion is removed again.
+"""
+
+import time
+import asyncio
+import logging
+from typing import List, Optional
+
+from .journal_scanner import JournalScannerService
+from .project_bundle import COLD_CODEC, bundle_path_for, pack_directory
+
+logger = logging.getLogger(__name__)
+
+class ColdStorageCompactor:
+    """Periodically packs inactive completed projects into compressed bundles"""
+
+    def __init__(self, scanners: List[JournalScannerService], inactive_days: float = 90,
+                 io_budget_mb_per_s: float = 20.0, interval: float = 3600.0):
+        self.scanners = scanners
+        self.inactive_days = inactive_days
+        self.io_budget = io_budget_mb_per_s * 1024 * 1024
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def start(self):
+        if self.inactive_days <= 0:
+            logger.info("Cold storage compaction disabled")
+            return
+        self._stopping = False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        self._stopping = True
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                compacted = await asyncio.to_thread(self.compact_once)
+                if compacted:
+                    logger.info(f"Moved {len(compacted)} projects to cold storage")
+            except Exception as e:
+                logger.error(f"Cold storage compaction failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def _throttle(self, nbytes: int):
+        """Sleep long enough that packing stays within the I/O budget"""
+        if self.io_budget > 0:
+            time.sleep(nbytes / self.io_budget)
+
+    def compact_once(self) -> List[str]:
+        """Pack every current candidate; returns the IDs moved to cold storage"""
+        compacted = []
+        for scanner in self.scanners:
+            for project_id in scanner.cold_storage_candidates(self.inactive_days):
+                if self._stopping:
+                    return compacted
+                try:
+                    # Tombstones are held off while the bundle is renamed into place
+                    bundle_path = pack_directory(scanner.llm_output_dir / project_id, remove_source=True,
+                                                 codec=COLD_CODEC, throttle=self._throttle,
+                                                 commit_guard=lambda: scanner.live_guard(project_id))
+                except Exception as e:
+                    logger.error(f"Could not move {project_id} to cold storage: {e}")
+                    self._discard_if_deleted(scanner, project_id)
+                    continue
+                if bundle_path is None or self._discard_if_deleted(scanner, project_id):
+                    logger.info(f"Not moving {project_id} to cold storage: it was deleted or changed while packing")
+                    continue
+                scanner.refresh_project(project_id)
+                compacted.append(project_id)
+        return compacted
+
+    def _discard_if_deleted(self, scanner: JournalScannerService, project_id: str) -> bool:
+        """Remove the bundle of a project tombstoned while it was packed; True if it was"""
+        if scanner.is_live(project_id):
+            return False
+        bundle_path = bundle_path_for(scanner.llm_output_dir, project_id)
+        if bundle_path.is_file() and not (scanner.llm_output_dir / project_id).is_dir():
+            bundle_path.unlink()
+            # Its source is gone now, so this drops the tombstoned row
+            scanner.refresh_project(project_id)
+        return True
@@ -6,6 +6,7 @@ Phase 3.4: Export Service Implementation
 import asyncio
 import tempfile
 import os
+import sys
 from datetime import datetime
 from typing import Optional, Dict, Any, List, Union
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -18,12 +19,21 @@ import logging
 
 from app.models.export import ExportJob, ExportFormat
 from app.models.project import Project
+from app.models.journal import JournalEntry, JournalTemplate
 from app.models.user import User
 from app.models.theme import Theme
 from app.core.database import get_async_session
+from app.services.progress_sink import ProgressSink
+
+# Shared EPUB writer lives with the CrewAI tools at the repository root
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../.."))
+from tools.epub_writer import write_journal_epub
 
 logger = logging.getLogger(__name__)
 
+# Intermediate export progress is committed at most this often; status changes always are
+PROGRESS_COMMIT_INTERVAL = 2.0
+
 
 class ExportService:
     """Service for exporting projects to various formats and platforms"""
@@ -31,6 +41,11 @@ class ExportService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.temp_dir = Path(tempfile.gettempdir()) / "journal_exports"
+        # Flushed inline from the export task only, since the session is not safe to share across tasks
+        self._progress = ProgressSink(self._commit_progress, interval=PROGRESS_COMMIT_INTERVAL)
+
+    async def _commit_progress(self, export_jobs: Dict[str, Any]):
+        await self.db.commit()
 
     async def create_export_job(
         self,
@@ -360,7 +375,7 @@ class ExportService:
             # Update status to processing
             export_job.status = "processing"
             export_job.progress = 10
-            await self.db.commit()
+            await self._progress.update(export_job.id, export_job, terminal=True)
 
             # Export based on format
             if export_job.export_format == "pdf":
@@ -385,14 +400,14 @@ class ExportService:
         try:
             # Update progress
             export_job.progress = 30
-            await self.db.commit()
+            await self._progress.update(export_job.id, export_job)
 
             # Generate PDF content
             pdf_content = await self._generate_pdf_content(project)
 
             # Update progress
             export_job.progress = 70
-            await self.db.commit()
+            await self._progress.update(export_job.id, export_job)
 
             # Save file
             file_path = await self._save_export_file(
@@ -405,7 +420,7 @@ class ExportService:
             export_job.file_url = f"/exports/{file_path.name}"
             export_job.file_size = len(pdf_content)
             export_job.completed_at = datetime.utcnow()
-            await self.db.commit()
+            await self._progress.update(export_job.id, export_job, terminal=True)
 
             logger.info(f"PDF export completed: {export_job.id}")
 
@@ -422,27 +437,19 @@ class ExportService:
         try:
             # Update progress
             export_job.progress = 30
-            await self.db.commit()
-
-            # Generate EPUB content
-            epub_content = await self._generate_epub_content(project)
+            await self._progress.update(export_job.id, export_job)
 
-            # Update progress
-            export_job.progress = 70
-            await self.db.commit()
-
-            # Save file
-            file_path = await self._save_export_file(
-                export_job, project, epub_content, "epub"
-            )
+            # Stream EPUB chapters straight into the output file
+            content = await self._load_journal_content(project)
+            file_path = await asyncio.to_thread(self._write_epub_file, export_job, project, content)
 
             # Mark as completed
             export_job.status = "completed"
             export_job.progress = 100
             export_job.file_url = f"/exports/{file_path.name}"
-            export_job.file_size = len(epub_content)
+            export_job.file_size = file_path.stat().st_size
             export_job.completed_at = datetime.utcnow()
-            await self.db.commit()
+            await self._progress.update(export_job.id, export_job, terminal=True)
 
             logger.info(f"EPUB export completed: {export_job.id}")
 
@@ -459,20 +466,20 @@ class ExportService:
         try:
             # Update progress
             export_job.progress = 20
-            await self.db.commit()
+            await self._progress.update(export_job.id, export_job)
 
             # Generate KDP manuscript
             manuscript_content = await self._generate_kdp_manuscript(project)
 
             # Update progress
             export_job.progress = 50
-            await self.db.commit()
+            await self._progress.update(export_job.id, export_job)
 
             # Generate KDP cover if needed
             if export_job.kdp_metadata.get("generate_cover", False):
                 cover_content = await self._generate_kdp_cover(project, export_job.kdp_metadata)
                 export_job.progress = 70
-                await self.db.commit()
+                await self._progress.update(export_job.id, export_job)
 
             # Save manuscript
             manuscript_path = await self._save_export_file(
@@ -485,7 +492,7 @@ class ExportService:
             export_job.file_url = f"/exports/{manuscript_path.name}"
             export_job.file_size = len(manuscript_content)
             export_job.completed_at = datetime.utcnow()
-            await self.db.commit()
+            await self._progress.update(export_job.id, export_job, terminal=True)
 
             logger.info(f"KDP export completed: {export_job.id}")
 
@@ -500,12 +507,44 @@ class ExportService:
         pdf_header = f"%PDF-1.4\n% Generated for project: {project.title}\n"
         return pdf_header.encode('utf-8')
 
-    async def _generate_epub_content(self, project: Project) -> bytes:
-        """Generate EPUB content from project"""
-        # This would integrate with an EPUB generation library
-        # For now, return placeholder content
-        epub_header = f"<?xml version='1.0' encoding='UTF-8'?>\n<package xmlns='http://www.idpf.org/2007/opf'>\n<title>{project.title}</title>\n"
-        return epub_header.encode('utf-8')
+    def _write_epub_file(self, export_job: ExportJob, project: Project, content: Dict[str, Any]) -> Path:
+        """Write the project's journal content to an EPUB file, one chapter at a time"""
+        content.setdefault("cover", {}).setdefault("title", project.title)
+
+        file_path = self._export_file_path(export_job, project, "epub")
+        write_journal_epub(content, str(file_path))
+        return file_path
+
+    async def _load_journal_content(self, project: Project) -> Dict[str, Any]:
+        """Build the EPUB structure from the project's template and journal entries"""
+        content: Dict[str, Any] = {}
+
+        # A template holds the generated journal (intro, days, certificate) as JSON
+        if project.template_id:
+            result = await self.db.execute(
+                select(JournalTemplate.ai_generated_content).where(JournalTemplate.id == project.template_id)
+            )
+            raw_content = result.scalar_one_or_none()
+            try:
+                raw_content = json.loads(raw_content) if raw_content else None
+            except ValueError:
+                raw_content = None
+            if isinstance(raw_content, dict):
+                journal_content = raw_content.get("journal_content", raw_content)
+                if isinstance(journal_content, dict):
+                    content = dict(journal_content)
+
+        # Each journal entry becomes a chapter, in the order it was written
+        result = await self.db.execute(
+            select(JournalEntry.title, JournalEntry.content)
+            .where(JournalEntry.project_id == project.id)
+            .order_by(JournalEntry.created_at, JournalEntry.id)
+        )
+        entries = [{"title": title, "text": text} for title, text in result.all()]
+        if entries:
+            content["chapters"] = entries
+
+        return content
 
     async def _generate_kdp_manuscript(self, project: Project) -> bytes:
         """Generate KDP-ready manuscript"""
@@ -528,12 +567,7 @@ class ExportService:
         extension: str
     ) -> Path:
         """Save export file to storage"""
-        # Ensure temp directory exists
-        self.temp_dir.mkdir(exist_ok=True)
-
-        # Generate unique filename
-        filename = f"export_{export_job.id}_{project.title.replace(' ', '_')[:20]}_{uuid.uuid4().hex[:8]}.{extension}"
-        file_path = self.temp_dir / filename
+        file_path = self._export_file_path(export_job, project, extension)
 
         # Save content
         with open(file_path, 'wb') as f:
@@ -541,6 +575,20 @@ class ExportService:
 
         return file_path
 
+    def _export_file_path(
+        self,
+        export_job: ExportJob,
+        project: Project,
+        extension: str
+    ) -> Path:
+        """Build a unique output path inside the export directory"""
+        # Ensure temp directory exists
+        self.temp_dir.mkdir(exist_ok=True)
+
+        # Generate unique filename
+        filename = f"export_{export_job.id}_{project.title.replace(' ', '_')[:20]}_{uuid.uuid4().hex[:8]}.{extension}"
+        return self.temp_dir / filename
+
     async def _mark_job_failed(
         self,
         export_job_id: int,
@@ -548,6 +596,8 @@ class ExportService:
     ) -> None:
         """Mark export job as failed"""
         try:
+            # The failure may have been a commit (a terminal progress flush); start clean
+            await self.db.rollback()
             result = await self.db.execute(
                 select(ExportJob).where(ExportJob.id == export_job_id)
             )
@@ -19,6 +19,18 @@ from ..core.database import get_db
 # CrewAI agents for analysis
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../../agents"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../.."))
+
+from .journal_similarity_service import journal_similarity_service
+from .project_manifest import load_manifest
+from .project_bundle import BUNDLE_SUFFIX, ProjectBundle
+
+# Shared VADER engine from the pipeline tools
+try:
+    from tools.sentiment_engine import get_sentiment_engine
+    SENTIMENT_AVAILABLE = True
+except ImportError:
+    SENTIMENT_AVAILABLE = False
 
 class JournalContentAnalyzer:
     """Analyzes journal content and provides enhancement recommendations"""
@@ -71,7 +83,10 @@ class JournalContentAnalyzer:
         # Determine project directory
         project_dir = await self._get_project_directory(project)
 
-        if not project_dir or not os.path.exists(project_dir):
+        if not project_dir:
+            return self._get_empty_analysis()
+        bundle_path = project_dir + BUNDLE_SUFFIX
+        if not os.path.exists(project_dir) and not os.path.exists(bundle_path):
             return self._get_empty_analysis()
 
         # Initialize analysis structure
@@ -84,13 +99,20 @@ class JournalContentAnalyzer:
             "content_size": 0
         }
 
-        # Analyze different output directories
-        subdirs = ["PDF_output", "media", "Json_output", "LLM_output"]
+        # Runs with a manifest list their artifacts; older runs are scanned directory by directory
+        manifest = load_manifest(project_dir)
+        if not os.path.exists(project_dir):
+            # Packed projects are read straight out of their bundle
+            await self._analyze_bundle(bundle_path, analysis)
+        elif manifest:
+            await self._analyze_manifest(project_dir, manifest, analysis)
+        else:
+            subdirs = ["PDF_output", "media", "Json_output", "LLM_output"]
 
-        for subdir in subdirs:
-            subdir_path = os.path.join(project_dir, subdir)
-            if os.path.exists(subdir_path):
-                await self._analyze_subdirectory(subdir, subdir_path, analysis)
+            for subdir in subdirs:
+                subdir_path = os.path.join(project_dir, subdir)
+                if os.path.exists(subdir_path):
+                    await self._analyze_subdirectory(subdir, subdir_path, analysis)
 
         # Calculate completion percentages for each agent
         analysis["completion_map"] = await self._calculate_agent_completion(analysis)
@@ -104,8 +126,23 @@ class JournalContentAnalyzer:
         # Calculate overall enhancement potential
         analysis["enhancement_potential"] = self._calculate_enhancement_potential(analysis)
 
+        # Find library journals covering the same ground
+        analysis["similar_projects"] = await self._find_similar_projects(project_dir)
+
         return analysis
 
+    async def _find_similar_projects(self, project_dir: str) -> List[Dict[str, Any]]:
+        """Rank library projects by content similarity to this project"""
+
+        try:
+            vector = await asyncio.to_thread(journal_similarity_service.vectorize_project, project_dir)
+            if vector is None:
+                return []
+            return journal_similarity_service.query(vector, 5, exclude=os.path.basename(project_dir.rstrip(os.sep)))
+        except Exception as e:
+            print(f"Error finding similar projects for {project_dir}: {e}")
+            return []
+
     async def _analyze_subdirectory(self, subdir_name: str, subdir_path: str, analysis: Dict):
         """Analyze a specific subdirectory of the project"""
 
@@ -124,26 +161,70 @@ class JournalContentAnalyzer:
                         "extension": os.path.splitext(file)[1].lower()
                     }
 
-                    analysis["existing_files"].append(file_info)
-                    analysis["content_size"] += file_info["size"]
-
-                    # Analyze specific file types
-                    if subdir_name == "Json_output" and file.endswith('.json'):
-                        await self._analyze_json_file(file_path, file_info, analysis)
-                    elif subdir_name == "PDF_output" and file.endswith('.pdf'):
-                        await self._analyze_pdf_file(file_path, file_info, analysis)
-                    elif subdir_name == "media":
-                        await self._analyze_media_file(file_path, file_info, analysis)
+                    await self._analyze_file(subdir_name, file_path, file_info, analysis)
 
         except Exception as e:
             print(f"Error analyzing directory {subdir_path}: {e}")
 
-    async def _analyze_json_file(self, file_path: str, file_info: Dict, analysis: Dict):
+    async def _analyze_manifest(self, project_dir: str, manifest: Dict, analysis: Dict):
+        """Analyze the artifacts listed in a run's manifest.json"""
+
+        for rel_path, entry in sorted(manifest.get("artifacts", {}).items()):
+            file_path = os.path.join(project_dir, rel_path)
+            file_info = {
+                "name": os.path.basename(rel_path),
+                "path": file_path,
+                "size": entry.get("size", 0),
+                "type": rel_path.split("/", 1)[0],
+                "extension": os.path.splitext(rel_path)[1].lower()
+            }
+            await self._analyze_file(file_info["type"], file_path, file_info, analysis)
+
+    async def _analyze_bundle(self, bundle_path: str, analysis: Dict):
+        """Analyze the artifacts packed in a project bundle"""
+
+        try:
+            with ProjectBundle(bundle_path) as bundle:
+                for artifact in bundle.list():
+                    rel_path = artifact["path"]
+                    file_info = {
+                        "name": os.path.basename(rel_path),
+                        "path": os.path.join(bundle_path, rel_path),
+                        "size": artifact["size"],
+                        "type": rel_path.split("/", 1)[0],
+                        "extension": os.path.splitext(rel_path)[1].lower()
+                    }
+                    await self._analyze_file(file_info["type"], file_info["path"], file_info, analysis,
+                                             bundle=bundle, rel_path=rel_path)
+        except Exception as e:
+            print(f"Error analyzing bundle {bundle_path}: {e}")
+
+    async def _analyze_file(self, subdir_name: str, file_path: str, file_info: Dict, analysis: Dict,
+                            bundle: Optional[ProjectBundle] = None, rel_path: Optional[str] = None):
+        """Record one file and run the analyzer for its type"""
+
+        analysis["existing_files"].append(file_info)
+        analysis["content_size"] += file_info["size"]
+
+        # Analyze specific file types
+        if subdir_name == "Json_output" and file_info["name"].endswith('.json'):
+            data = bundle.read(rel_path) if bundle else None
+            await self._analyze_json_file(file_path, file_info, analysis, data)
+        elif subdir_name == "PDF_output" and file_info["name"].endswith('.pdf'):
+            header = next(bundle.iter_chunks(rel_path, 1000), b'') if bundle else None
+            await self._analyze_pdf_file(file_path, file_info, analysis, header)
+        elif subdir_name == "media":
+            await self._analyze_media_file(file_path, file_info, analysis)
+
+    async def _analyze_json_file(self, file_path: str, file_info: Dict, analysis: Dict, data: Optional[bytes] = None):
         """Analyze JSON content files"""
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = json.load(f)
+            if data is not None:
+                content = json.loads(data)
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = json.load(f)
 
             # Analyze content structure and quality
             if "research_data" in file_path.lower():
@@ -157,13 +238,14 @@ class JournalContentAnalyzer:
                     "found": True,
                     "has_structure": "journal_structure" in str(content),
                     "days_count": self._count_journal_days(content),
-                    "completeness": self._assess_content_completeness(content)
+                    "completeness": self._assess_content_completeness(content),
+                    "tone": self._assess_tone(content)
                 }
 
         except Exception as e:
             print(f"Error analyzing JSON file {file_path}: {e}")
 
-    async def _analyze_pdf_file(self, file_path: str, file_info: Dict, analysis: Dict):
+    async def _analyze_pdf_file(self, file_path: str, file_info: Dict, analysis: Dict, header: Optional[bytes] = None):
         """Analyze PDF output files"""
 
         # Basic PDF analysis
@@ -176,12 +258,13 @@ class JournalContentAnalyzer:
         # Extract basic PDF info if possible
         try:
             # Simple PDF analysis - could be enhanced with pdfminer
-            with open(file_path, 'rb') as f:
-                header = f.read(1000)
-                if b'%PDF' in header:
-                    analysis["pdf_output"]["valid"] = True
-                else:
-                    analysis["pdf_output"]["valid"] = False
+            if header is None:
+                with open(file_path, 'rb') as f:
+                    header = f.read(1000)
+            if b'%PDF' in header:
+                analysis["pdf_output"]["valid"] = True
+            else:
+                analysis["pdf_output"]["valid"] = False
         except Exception as e:
             print(f"Error analyzing PDF file {file_path}: {e}")
 
@@ -418,6 +501,18 @@ class JournalContentAnalyzer:
                 "impact_score": 50
             })
 
+        similar_projects = analysis.get("similar_projects", [])
+        if similar_projects and similar_projects[0]["score"] >= 0.9:
+            recommendations.append({
+                "type": "differentiate_content",
+                "priority": "medium",
+                "title": "Differentiate From Similar Journal",
+                "description": f"Content closely matches {similar_projects[0]['project_id']}; vary prompts and themes to stand out",
+                "agents": ["content_curator_agent", "editor_agent"],
+                "estimated_time": 12,
+                "impact_score": 55
+            })
+
         # Sort recommendations by impact score
         recommendations.sort(key=lambda x: x["impact_score"], reverse=True)
 
@@ -476,6 +571,27 @@ class JournalContentAnalyzer:
             return day_count
         return 0
 
+    def _assess_tone(self, content: Any) -> Optional[Dict[str, Any]]:
+        """Score the tone of each day's pre-writeup with the shared sentiment engine"""
+
+        if not SENTIMENT_AVAILABLE or not isinstance(content, dict):
+            return None
+        days = [day for day in content.get("days", []) if isinstance(day, dict) and day.get("pre_writeup")]
+        if not days:
+            return None
+
+        try:
+            scores = get_sentiment_engine().score_batch([day["pre_writeup"] for day in days])
+        except Exception as e:
+            print(f"Error scoring journal tone: {e}")
+            return None
+
+        compounds = [score["compound"] for score in scores]
+        return {
+            "average_compound": round(sum(compounds) / len(compounds), 3),
+            "low_tone_days": [day.get("day") for day, compound in zip(days, compounds) if compound < 0.3]
+        }
+
     def _assess_content_completeness(self, content: Any) -> int:
         """Assess the completeness of journal content (0-100)"""
 
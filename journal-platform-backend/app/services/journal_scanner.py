@@ -3,101 +3,466 @@ Journal Library Scanner Service
 
 Scans LLM_output directory for CrewAI-generated journals and provides
 structured access to completed projects for the web interface.
+
+Projects and their files are kept in a SQLite index. A refresh only stats
+the directories recorded for each project and re-walks a project when one
+of their mtimes changed, so listing the library is an indexed query rather
+than a walk over every file. A file rewritten in place without touching its
+directory keeps its indexed size until the project is next re-walked.
+Projects packed into single-file bundles are indexed from the bundle and
+served from it; a project directory takes precedence over a bundle of the
+same name. Each project's storage tier is indexed: active (a directory),
+packed (a bundle) or cold (a compressed bundle from the cold storage
+compactor). Deleting a project sets a tombstone (deleted_at) that hides it
+from every lookup at once, and the row is dropped once a deletion worker
+has removed its files.
 """
 
+import io
 import os
 import json
+import time
+import sqlite3
+import threading
 import logging
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 
+from .project_manifest import load_manifest
+from .project_bundle import ProjectBundle, bundle_path_for, project_id_for
+
 logger = logging.getLogger(__name__)
 
+# Minimum seconds between per-project mtime checks; additions and removals
+# change the root directory's mtime and are picked up immediately
+REFRESH_INTERVAL = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    theme TEXT,
+    author_style TEXT,
+    created_at TEXT,
+    status TEXT,
+    has_pdfs INTEGER,
+    tier TEXT NOT NULL DEFAULT 'active',
+    deleted_at REAL,
+    dir_mtimes TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_projects_created ON projects (created_at DESC, id);
+CREATE TABLE IF NOT EXISTS files (
+    project_id TEXT,
+    path TEXT,
+    category TEXT,
+    size INTEGER,
+    PRIMARY KEY (project_id, path)
+);
+"""
+
+PROJECT_COLUMNS = "id, title, theme, author_style, created_at, status, has_pdfs, tier"
+
+# Columns added after the first index schema, created on older indexes at startup
+ADDED_COLUMNS = (("tier", "TEXT NOT NULL DEFAULT 'active'"), ("deleted_at", "REAL"))
+
 class JournalScannerService:
     """Service to scan and parse CrewAI output directories"""
 
-    def __init__(self, llm_output_dir: str = "../LLM_output"):
+    def __init__(self, llm_output_dir: str = "../LLM_output", index_path: str = "journal_library_index.sqlite3"):
         self.llm_output_dir = Path(llm_output_dir)
-        self.projects_cache = {}
         self.last_scan = None
-
-    def scan_projects(self) -> List[Dict[str, any]]:
-        """Scan LLM_output directory and return list of projects"""
-        try:
-            if not self.llm_output_dir.exists():
+        # Set by a LibraryWatcher that keeps the index current
+        self.watched = False
+        self._root_mtime = None
+        self._last_refresh = 0.0
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(index_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(projects)")}
+        for column, definition in ADDED_COLUMNS:
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE projects ADD COLUMN {column} {definition}")
+        self._conn.commit()
+
+    def refresh(self, force: bool = False) -> List[Dict[str, str]]:
+        """Bring the index up to date with LLM_output, re-walking only changed projects.
+
+        Returns the changes found as {'event', 'project_id'} dicts, where event
+        is project_added, project_updated, project_completed or project_deleted.
+        While a watcher keeps the index current, unforced refreshes are skipped.
+        """
+        with self._lock:
+            if self.watched and not force:
+                return []
+            try:
+                root_mtime = self.llm_output_dir.stat().st_mtime_ns
+            except FileNotFoundError:
                 logger.warning(f"LLM_output directory not found: {self.llm_output_dir}")
+                return self._apply([], [row["id"] for row in self._conn.execute("SELECT id FROM projects")])
+
+            now = time.monotonic()
+            if not force and root_mtime == self._root_mtime and now - self._last_refresh < REFRESH_INTERVAL:
                 return []
 
-            projects = []
+            known = {
+                row["id"]: json.loads(row["dir_mtimes"])
+                for row in self._conn.execute("SELECT id, dir_mtimes FROM projects")
+            }
+            sources = {}
+            with os.scandir(self.llm_output_dir) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir():
+                        sources[entry.name] = entry.path
+                    elif project_id_for(entry.name):
+                        sources.setdefault(project_id_for(entry.name), entry.path)
+
+            seen = set(sources)
+            changed = []
+            for project_id, path in sources.items():
+                if project_id in known and not self._dirs_changed(path, known[project_id]):
+                    continue
+                indexed = self._index_project(Path(path))
+                if indexed:
+                    changed.append(indexed)
+
+            changes = self._apply(changed, [project_id for project_id in known if project_id not in seen])
+            self._root_mtime = root_mtime
+            self._last_refresh = now
+            self.last_scan = datetime.now()
+            return changes
+
+    def refresh_project(self, project_id: str) -> List[Dict[str, str]]:
+        """Re-walk one project regardless of mtimes, e.g. when a watcher saw it change"""
+        with self._lock:
+            project_path = self.source_path(project_id)
+            if project_path.exists():
+                indexed = self._index_project(project_path)
+                changes = self._apply([indexed] if indexed else [], [])
+            else:
+                changes = self._apply([], [project_id])
+            self.last_scan = datetime.now()
+            return changes
+
+    def _apply(self, changed: List[tuple], removed: List[str]) -> List[Dict[str, str]]:
+        """Write re-walked and removed projects to the index and describe what changed.
+
+        Tombstoned projects are not re-indexed while their files are being
+        removed, and their final removal is not announced again.
+        """
+        previous = {}
+        tombstoned = set()
+        for project_id in [project_row[0] for project_row, _ in changed] + removed:
+            row = self._conn.execute("SELECT has_pdfs, deleted_at FROM projects WHERE id = ?", (project_id,)).fetchone()
+            previous[project_id] = row["has_pdfs"] if row else None
+            if row and row["deleted_at"] is not None:
+                tombstoned.add(project_id)
+        removed = [project_id for project_id in removed if previous[project_id] is not None]
+
+        changes = []
+        with self._conn:
+            for project_id in removed:
+                self._conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+                self._conn.execute("DELETE FROM files WHERE project_id = ?", (project_id,))
+                if project_id not in tombstoned:
+                    changes.append({'event': 'project_deleted', 'project_id': project_id})
+            for project_row, files in changed:
+                project_id, has_pdfs = project_row[0], project_row[6]
+                if project_id in tombstoned:
+                    continue
+                # created_at keeps the value from when the project was first indexed, so the
+                # (created_at, id) page cursor stays valid as the project's directories change
+                self._conn.execute(
+                    f"INSERT INTO projects ({PROJECT_COLUMNS}, dir_mtimes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET title = excluded.title, theme = excluded.theme, "
+                    "author_style = excluded.author_style, "
+                    "created_at = COALESCE(projects.created_at, excluded.created_at), "
+                    "status = excluded.status, has_pdfs = excluded.has_pdfs, tier = excluded.tier, "
+                    "dir_mtimes = excluded.dir_mtimes",
+                    project_row
+                )
+                self._conn.execute("DELETE FROM files WHERE project_id = ?", (project_id,))
+                self._conn.executemany(
+                    "INSERT INTO files (project_id, path, category, size) VALUES (?, ?, ?, ?)", files
+                )
+                if previous[project_id] is None:
+                    event = 'project_added'
+                elif has_pdfs and not previous[project_id]:
+                    event = 'project_completed'
+                else:
+                    event = 'project_updated'
+                changes.append({'event': event, 'project_id': project_id})
+        return changes
+
+    def _dirs_changed(self, project_path: str, dir_mtimes: Dict[str, int]) -> bool:
+        """True when any directory (or the bundle) recorded for the project was modified, added to or removed"""
+        for rel_dir, mtime in dir_mtimes.items():
+            try:
+                path = project_path if rel_dir == "." else os.path.join(project_path, rel_dir)
+                if os.stat(path).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def _index_project(self, project_path: Path) -> Optional[tuple]:
+        """Walk one project directory and return its (project row, file rows) for the index"""
+        if project_path.is_file():
+            return self._index_bundle(project_path)
+
+        project_id = project_path.name
+        dir_mtimes = {}
+        files = []
+        stack = [""]
+        try:
+            while stack:
+                rel_dir = stack.pop()
+                abs_dir = project_path / rel_dir if rel_dir else project_path
+                dir_mtimes[rel_dir or "."] = abs_dir.stat().st_mtime_ns
+                with os.scandir(abs_dir) as entries:
+                    for entry in entries:
+                        # Skip hidden entries such as the PDF page cache and media manifest
+                        if entry.name.startswith('.'):
+                            continue
+                        rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                        if entry.is_dir():
+                            stack.append(rel_path)
+                        else:
+                            category = self._categorize(rel_dir, entry.name)
+                            files.append((project_id, rel_path, category, entry.stat().st_size))
+        except OSError as e:
+            logger.error(f"Error scanning project files for {project_id}: {e}")
+            return None
 
-            # Each subdirectory in LLM_output is a project
-            for project_dir in self.llm_output_dir.iterdir():
-                if project_dir.is_dir():
-                    project_info = self._parse_project(project_dir)
-                    if project_info:
-                        projects.append(project_info)
+        metadata = self._parse_project(project_path)
+        if not metadata:
+            return None
+        has_pdfs = any(category == 'pdfs' for _, _, category, _ in files)
 
-            # Sort by creation date (newest first)
-            projects.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+        project_row = (project_id, metadata['title'], metadata['theme'], metadata['author_style'],
+                       metadata['created_at'], metadata['status'], int(has_pdfs), 'active', json.dumps(dir_mtimes))
+        return project_row, files
 
-            self.projects_cache = {p['id']: p for p in projects}
-            self.last_scan = datetime.now()
+    def _index_bundle(self, bundle_path: Path) -> Optional[tuple]:
+        """Index a packed project from its bundle's artifact table"""
+        project_id = project_id_for(bundle_path.name)
+        try:
+            mtime = bundle_path.stat().st_mtime_ns
+            with ProjectBundle(bundle_path) as bundle:
+                files = []
+                for artifact in bundle.list():
+                    rel_dir, filename = os.path.split(artifact['path'])
+                    if any(part.startswith('.') for part in artifact['path'].split('/')):
+                        continue
+                    files.append((project_id, artifact['path'], self._categorize(rel_dir, filename), artifact['size']))
+                metadata = self._parse_project(self.llm_output_dir / project_id, bundle)
+                tier = 'cold' if bundle.meta('tier') == 'cold' else 'packed'
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Error reading bundle {bundle_path}: {e}")
+            return None
 
-            return projects
+        if not metadata:
+            return None
+        has_pdfs = any(category == 'pdfs' for _, _, category, _ in files)
+        project_row = (project_id, metadata['title'], metadata['theme'], metadata['author_style'],
+                       metadata['created_at'], metadata['status'], int(has_pdfs), tier, json.dumps({".": mtime}))
+        return project_row, files
+
+    @staticmethod
+    def _categorize(rel_dir: str, filename: str) -> Optional[str]:
+        """Category of a file by the directory it sits in"""
+        if 'PDF_output' in rel_dir:
+            return 'pdfs' if filename.endswith('.pdf') else None
+        if 'media' in rel_dir:
+            return 'media'
+        if filename.endswith('.json'):
+            return 'data'
+        return None
+
+    @staticmethod
+    def _row_to_project(row: sqlite3.Row) -> Dict[str, any]:
+        project = {key: row[key] for key in ('id', 'title', 'theme', 'author_style', 'created_at', 'status')}
+        project['files'] = {}
+        project['has_pdfs'] = bool(row['has_pdfs'])
+        project['tier'] = row['tier']
+        return project
+
+    def scan_projects(self) -> List[Dict[str, any]]:
+        """Scan LLM_output directory and return list of projects"""
+        try:
+            self.refresh()
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {PROJECT_COLUMNS} FROM projects WHERE deleted_at IS NULL ORDER BY created_at DESC, id"
+                ).fetchall()
+            return [self._row_to_project(row) for row in rows]
 
         except Exception as e:
             logger.error(f"Error scanning projects: {e}")
             return []
 
+    def list_projects_page(self, limit: int, after: Optional[Tuple[str, str]] = None,
+                           with_files: bool = False) -> Tuple[List[Dict[str, any]], Optional[Tuple[str, str]]]:
+        """One page of projects, newest first, and the (created_at, id) cursor of the next page.
+
+        Pages are read by keyset on the created_at/id index, so each page
+        costs the same however deep into the library it is. Every project
+        carries file_count and pdf_files; with_files adds its file_list.
+        """
+        self.refresh()
+        where, params = "deleted_at IS NULL", []
+        if after:
+            where += " AND (created_at < ? OR (created_at = ? AND id > ?))"
+            params = [after[0], after[0], after[1]]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {PROJECT_COLUMNS} FROM projects WHERE {where} ORDER BY created_at DESC, id LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+            rows, more = rows[:limit], len(rows) > limit
+            projects = [self._row_to_project(row) for row in rows]
+            by_id = {project['id']: project for project in projects}
+            for project in projects:
+                project['file_count'] = 0
+                project['pdf_files'] = []
+                if with_files:
+                    project['file_list'] = []
+            if by_id:
+                placeholders = ", ".join("?" * len(by_id))
+                for row in self._conn.execute(
+                    f"SELECT project_id, path, category, size FROM files WHERE project_id IN ({placeholders}) "
+                    "ORDER BY project_id, path", list(by_id)
+                ):
+                    project = by_id[row['project_id']]
+                    project['file_count'] += 1
+                    if row['category'] == 'pdfs':
+                        project['pdf_files'].append(row['path'])
+                    if with_files:
+                        project['file_list'].append(
+                            {'path': row['path'], 'category': row['category'], 'size': row['size']}
+                        )
+
+        next_cursor = (projects[-1]['created_at'], projects[-1]['id']) if more else None
+        return projects, next_cursor
+
+    def cold_storage_candidates(self, inactive_days: float) -> List[str]:
+        """IDs of completed directory projects none of whose directories changed in inactive_days"""
+        cutoff_ns = (time.time() - inactive_days * 86400) * 1e9
+        self.refresh()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, dir_mtimes FROM projects "
+                "WHERE tier = 'active' AND has_pdfs = 1 AND deleted_at IS NULL ORDER BY created_at, id"
+            ).fetchall()
+        return [row['id'] for row in rows if max(json.loads(row['dir_mtimes']).values(), default=0) < cutoff_ns]
+
     def get_project_by_id(self, project_id: str) -> Optional[Dict[str, any]]:
         """Get specific project details by ID"""
-        if not self.projects_cache:
-            self.scan_projects()
-
-        return self.projects_cache.get(project_id)
+        self.refresh()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {PROJECT_COLUMNS} FROM projects WHERE id = ? AND deleted_at IS NULL", (project_id,)
+            ).fetchone()
+        return self._row_to_project(row) if row else None
+
+    def get_project_file_list(self, project_id: str) -> List[Dict[str, any]]:
+        """A project's files with their categories and sizes, by path"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, category, size FROM files WHERE project_id = ? ORDER BY path", (project_id,)
+            ).fetchall()
+        return [{'path': row['path'], 'category': row['category'], 'size': row['size']} for row in rows]
 
     def get_project_files(self, project_id: str) -> Dict[str, List[str]]:
         """Get file structure for a specific project"""
-        project = self.get_project_by_id(project_id)
-        if not project:
+        if not self.get_project_by_id(project_id):
             return {}
 
-        project_path = self.llm_output_dir / project_id
-
         files = {
             'pdfs': [],
             'media': [],
             'data': [],
             'all': []
         }
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, category FROM files WHERE project_id = ? ORDER BY path", (project_id,)
+            ).fetchall()
+        for row in rows:
+            if row['category']:
+                files[row['category']].append(row['path'])
+            files['all'].append(row['path'])
+        return files
+
+    def open_bundled_file(self, project_id: str, file_path: str) -> Optional[Tuple[int, Iterator[bytes]]]:
+        """(size, chunk iterator) for a file of a packed project, or None when there is no such file"""
+        # A tombstoned project's bundle stays on disk until the deletion worker reaches it
+        if not self.is_live(project_id):
+            return None
+        bundle_path = bundle_path_for(self.llm_output_dir, project_id)
+        if not bundle_path.is_file():
+            return None
+        bundle = ProjectBundle(bundle_path)
+        stat = bundle.stat(file_path)
+        if not stat:
+            bundle.close()
+            return None
 
-        try:
-            # Scan for files in subdirectories
-            for root, dirs, filenames in os.walk(project_path):
-                rel_path = Path(root).relative_to(project_path)
-
-                for filename in filenames:
-                    file_path = Path(root) / filename
-                    rel_file_path = str(rel_path / filename)
-
-                    # Categorize files by directory
-                    if 'PDF_output' in str(root):
-                        if filename.endswith('.pdf'):
-                            files['pdfs'].append(rel_file_path)
-                    elif 'media' in str(root):
-                        files['media'].append(rel_file_path)
-                    elif 'Json_output' in str(root) or 'LLM_output' in str(root):
-                        if filename.endswith('.json'):
-                            files['data'].append(rel_file_path)
-
-                    files['all'].append(rel_file_path)
-
-            return files
-
-        except Exception as e:
-            logger.error(f"Error scanning project files: {e}")
-            return {}
+        def stream():
+            try:
+                yield from bundle.iter_chunks(file_path)
+            finally:
+                bundle.close()
+
+        return stat['size'], stream()
+
+    def tombstone(self, project_ids: List[str]) -> List[str]:
+        """Mark projects deleted so every lookup stops returning them; returns the IDs that were live"""
+        self.refresh()
+        marked = []
+        now = time.time()
+        with self._lock, self._conn:
+            for project_id in project_ids:
+                cursor = self._conn.execute(
+                    "UPDATE projects SET deleted_at = ? WHERE id = ? AND deleted_at IS NULL", (now, project_id)
+                )
+                if cursor.rowcount:
+                    marked.append(project_id)
+        return marked
+
+    def is_live(self, project_id: str) -> bool:
+        """True when the project is indexed and not tombstoned (no rescan)"""
+        with self.live_guard(project_id) as live:
+            return live
+
+    @contextmanager
+    def live_guard(self, project_id: str):
+        """Yield whether the project is live, holding off tombstones until the block ends"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM projects WHERE id = ? AND deleted_at IS NULL", (project_id,)
+            ).fetchone()
+            yield row is not None
+
+    def tombstoned_projects(self) -> List[str]:
+        """IDs of deleted projects whose files have not been removed yet, oldest deletion first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM projects WHERE deleted_at IS NOT NULL ORDER BY deleted_at, id"
+            ).fetchall()
+        return [row['id'] for row in rows]
+
+    def source_path(self, project_id: str) -> Path:
+        """The project's directory, or its bundle when it has no directory"""
+        project_path = self.llm_output_dir / project_id
+        if not project_path.is_dir():
+            project_path = bundle_path_for(self.llm_output_dir, project_id)
+        return project_path
 
     def get_file_path(self, project_id: str, file_path: str) -> Path:
         """Get absolute file path for download"""
@@ -107,15 +472,14 @@ class JournalScannerService:
 
         return self.llm_output_dir / project_id / file_path
 
-    def _parse_project(self, project_path: Path) -> Optional[Dict[str, any]]:
-        """Parse project directory to extract metadata"""
+    def _parse_project(self, project_path: Path, bundle: Optional[ProjectBundle] = None) -> Optional[Dict[str, any]]:
+        """Parse project directory (or its bundle) to extract metadata"""
         try:
             # Extract project ID from directory name
             project_id = project_path.name
 
             # Look for metadata in JSON files
             json_dir = project_path / "Json_output"
-            llm_dir = project_path / "LLM_output"
 
             # Generate a better title from folder name
             folder_title = self._extract_title_from_foldername(project_id)
@@ -130,11 +494,28 @@ class JournalScannerService:
                 'files': {}
             }
 
+            # Runs written with a manifest describe themselves
+            manifest = bundle.manifest() if bundle else load_manifest(str(project_path))
+            if manifest:
+                metadata.update({
+                    'title': manifest.get('title') or folder_title,
+                    'theme': manifest.get('theme') or 'unknown',
+                    'author_style': manifest.get('author_style') or 'unknown',
+                    'created_at': manifest.get('created_at') or metadata['created_at'],
+                    'status': manifest.get('status', 'completed'),
+                })
+                return metadata
+
             # Try to extract title from JSON files
             title_found = False
-            for json_file in json_dir.glob("*.json"):
+            if bundle:
+                json_files = [artifact['path'] for artifact in bundle.list()
+                              if artifact['path'].startswith('Json_output/') and artifact['path'].endswith('.json')]
+            else:
+                json_files = json_dir.glob("*.json")
+            for json_file in json_files:
                 try:
-                    with open(json_file, 'r', encoding='utf-8') as f:
+                    with (io.BytesIO(bundle.read(json_file)) if bundle else open(json_file, 'rb')) as f:
                         data = json.load(f)
                         if 'title' in data and data['title']:
                             metadata['title'] = data['title']
@@ -148,12 +529,6 @@ class JournalScannerService:
                 except Exception as e:
                     logger.debug(f"Could not read {json_file}: {e}")
 
-            # Check if PDFs exist (indicates completion)
-            pdf_dir = project_path / "PDF_output"
-            if pdf_dir.exists():
-                pdf_files = list(pdf_dir.glob("*.pdf"))
-                metadata['has_pdfs'] = len(pdf_files) > 0
-
             return metadata
 
         except Exception as e:
@@ -205,11 +580,9 @@ class JournalScannerService:
                     if part.count('-') == 2 and len(part) == 10:  # YYYY-MM-DD
                         # Try to get file modification time as fallback
                         try:
-                            import os
-                            from pathlib import Path
-                            project_path = self.llm_output_dir / filename
+                            project_path = self.source_path(filename)
                             if project_path.exists():
-                                mod_time = datetime.fromtimestamp(project_path.stat().st_mtime())
+                                mod_time = datetime.fromtimestamp(project_path.stat().st_mtime)
                                 return mod_time.isoformat()
                         except:
                             pass
@@ -218,11 +591,10 @@ class JournalScannerService:
 
             # Pattern 3: Use filesystem creation time as fallback
             try:
-                import os
-                project_path = self.llm_output_dir / filename
+                project_path = self.source_path(filename)
                 if project_path.exists():
                     # Use the earliest time we can find (creation or modification)
-                    creation_time = datetime.fromtimestamp(project_path.stat().st_mtime())
+                    creation_time = datetime.fromtimestamp(project_path.stat().st_mtime)
                     return creation_time.isoformat()
             except:
                 pass
@@ -239,8 +611,5 @@ class JournalScannerService:
         if not project:
             return False
 
-        # Check for PDF files (completion indicator)
-        project_path = self.llm_output_dir / project_id
-        pdf_dir = project_path / "PDF_output"
-
-        return pdf_dir.exists() and len(list(pdf_dir.glob("*.pdf"))) > 0
\ No newline at end of file
+        # PDF files are the completion indicator
+        return project['has_pdfs']
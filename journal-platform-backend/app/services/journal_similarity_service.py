@@ -0,0 +1,435 @@
+"""
+Journal Similarity Service
+
+Embedding-free similarity between journal projects. Journal JSON content is
+turned into signed hashed n-gram vectors, stored row-per-project in a NumPy
+memmap, and compared with batched cosine top-k queries for "similar
+journals", duplicate detection and theme clustering.
+"""
+
+import os
+import json
+import math
+import asyncio
+import re
+import threading
+import zlib
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIM = 1024
+INITIAL_CAPACITY = 1024
+QUERY_CHUNK_ROWS = 8192
+DEFAULT_CLUSTER_THRESHOLD = 0.6
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+    "that", "the", "this", "to", "was", "with", "you", "your", "day", "journal", "journaling",
+}
+
+class JournalVectorizer:
+    """Feature-hashing vectorizer over word unigrams and bigrams"""
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        if dim & (dim - 1):
+            raise ValueError("Vector dimension must be a power of two")
+        self.dim = dim
+
+    def vectorize(self, text: str) -> np.ndarray:
+        """Return an L2-normalised float32 vector for text"""
+        tokens = [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+        features = Counter(tokens)
+        features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, count in features.items():
+            hashed = zlib.crc32(feature.encode("utf-8"))
+            # Low bits pick the bucket, the top bit picks the sign to cancel collisions out
+            sign = 1.0 if hashed & 0x80000000 else -1.0
+            vector[hashed & (self.dim - 1)] += sign * (1.0 + math.log(count))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+def journal_text(content: Dict) -> str:
+    """Collect the prose of a journal or lead magnet JSON document"""
+    parts = [content.get("cover", {}).get("title", "")]
+    intro = content.get("intro_spread", {})
+    parts.append(intro.get("left", {}).get("quote", ""))
+    parts.append(intro.get("right", {}).get("writeup", ""))
+    for day in content.get("days", []):
+        if isinstance(day, dict):
+            parts.extend(str(day.get(key, "")) for key in ("title", "pre_writeup", "prompt"))
+    return "\n".join(part for part in parts if part)
+
+JOURNAL_FILE_PATTERNS = ("onboarding_prefs_*.json", "edited_30day_journal_*.json", "30day_journal_*.json")
+
+def project_files(project_dir: Path) -> List[Tuple[Path, int]]:
+    """Return (path, mtime_ns) for the JSON files that make up a project's journal text"""
+    json_dir = Path(project_dir) / "Json_output"
+    if not json_dir.exists():
+        return []
+
+    files = []
+    for pattern in JOURNAL_FILE_PATTERNS:
+        for json_file in sorted(json_dir.glob(pattern)):
+            # The edited journal supersedes its draft
+            if pattern == "30day_journal_*.json" and (json_dir / f"edited_{json_file.name}").exists():
+                continue
+            try:
+                files.append((json_file, json_file.stat().st_mtime_ns))
+            except OSError:
+                continue
+    return files
+
+def project_stamp(files: List[Tuple[Path, int]]) -> int:
+    return max((mtime_ns for _, mtime_ns in files), default=0)
+
+def project_text(project_dir: Path, files: Optional[List[Tuple[Path, int]]] = None) -> Tuple[str, int]:
+    """Return (text, newest mtime_ns) for a project's journal content"""
+    if files is None:
+        files = project_files(project_dir)
+
+    texts = []
+    stamp = 0
+    for json_file, mtime_ns in files:
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.debug(f"Could not read {json_file}: {e}")
+            continue
+        stamp = max(stamp, mtime_ns)
+        if json_file.name.startswith("onboarding_prefs"):
+            texts.append(" ".join(str(data.get(key, "")) for key in ("theme", "title", "author_style")))
+        elif isinstance(data, dict):
+            texts.append(journal_text(data))
+    return "\n".join(texts), stamp
+
+class JournalSimilarityService:
+    """Memmap-backed index of project vectors with cosine top-k queries
+
+    Nothing touches the disk until the index is first used or opened (the
+    startup hook opens it through SimilarityIndexer.start), so importing the
+    module is free. Queries read a snapshot of the matrix and project ids taken
+    under the lock, because a write can swap in a grown memmap at any time.
+    """
+
+    def __init__(self, index_dir: str = "similarity_index", dim: int = DEFAULT_DIM):
+        self.index_dir = Path(index_dir)
+        self.vectorizer = JournalVectorizer(dim)
+        self._lock = threading.Lock()
+        self._meta_path = self.index_dir / "meta.json"
+        self._vectors_path = self.index_dir / "vectors.f32"
+        # Bumped on every change so cached clusterings know when they are stale
+        self._version = 0
+        self._cluster_cache: Dict[Tuple[float, int], Tuple[int, List[List[str]]]] = {}
+        self.meta: Optional[Dict] = None
+
+    def open(self):
+        """Create or load the index on disk; later calls do nothing"""
+        with self._lock:
+            if self.meta is None:
+                self.index_dir.mkdir(parents=True, exist_ok=True)
+                self._load()
+
+    def _ensure_open(self):
+        if self.meta is None:
+            self.open()
+
+    def _snapshot(self) -> Tuple[np.ndarray, List[Optional[str]]]:
+        """The current matrix and a copy of its row ids, consistent with each other"""
+        self._ensure_open()
+        with self._lock:
+            return self._matrix, list(self.meta["ids"])
+
+    def _load(self):
+        meta = {}
+        if self._meta_path.exists():
+            try:
+                with open(self._meta_path, 'r') as f:
+                    meta = json.load(f)
+            except Exception as e:
+                logger.error(f"Similarity index metadata unreadable, rebuilding: {e}")
+        if meta.get("dim") != self.vectorizer.dim or not self._vectors_path.exists():
+            meta = {"dim": self.vectorizer.dim, "capacity": INITIAL_CAPACITY, "ids": [], "stamps": {}}
+            shape = (INITIAL_CAPACITY, self.vectorizer.dim)
+            np.memmap(self._vectors_path, dtype=np.float32, mode="w+", shape=shape).flush()
+        self.meta = meta
+        self._rows = {project_id: row for row, project_id in enumerate(meta["ids"]) if project_id is not None}
+        self._free_rows = [row for row, project_id in enumerate(meta["ids"]) if project_id is None]
+        self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(meta["capacity"], meta["dim"]))
+
+    def _save(self):
+        self._matrix.flush()
+        tmp_path = self._meta_path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def _grow(self):
+        capacity = self.meta["capacity"] * 2
+        grown_path = self._vectors_path.with_suffix(".grow")
+        grown = np.memmap(grown_path, dtype=np.float32, mode="w+", shape=(capacity, self.meta["dim"]))
+        grown[:self.meta["capacity"]] = self._matrix
+        grown.flush()
+        del self._matrix
+        os.replace(grown_path, self._vectors_path)
+        self.meta["capacity"] = capacity
+        self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.meta["dim"]))
+
+    def upsert(self, project_id: str, vector: np.ndarray, stamp: int = 0):
+        """Store or replace the vector for a project"""
+        self._ensure_open()
+        with self._lock:
+            row = self._rows.get(project_id)
+            if row is None:
+                ids = self.meta["ids"]
+                if self._free_rows:
+                    row = self._free_rows.pop()
+                    ids[row] = project_id
+                else:
+                    row = len(ids)
+                    if row >= self.meta["capacity"]:
+                        self._grow()
+                    ids.append(project_id)
+                self._rows[project_id] = row
+            self._matrix[row] = vector
+            self.meta["stamps"][project_id] = stamp
+            self._version += 1
+
+    def remove(self, project_id: str):
+        self._ensure_open()
+        with self._lock:
+            row = self._rows.pop(project_id, None)
+            if row is not None:
+                self._matrix[row] = 0.0
+                self.meta["ids"][row] = None
+                self._free_rows.append(row)
+                self.meta["stamps"].pop(project_id, None)
+                self._version += 1
+
+    def _sync_one(self, project_dir: Path) -> bool:
+        """Re-vectorize a project if its journal files changed; returns True when the index changed"""
+        self._ensure_open()
+        files = project_files(project_dir)
+        # Compare stat stamps first so unchanged projects are never parsed
+        if files and self.meta["stamps"].get(project_dir.name) == project_stamp(files):
+            return False
+        text, _ = project_text(project_dir, files)
+        if not text:
+            if project_dir.name in self._rows:
+                self.remove(project_dir.name)
+                return True
+            return False
+        self.upsert(project_dir.name, self.vectorizer.vectorize(text), project_stamp(files))
+        return True
+
+    def discard(self, project_id: str):
+        """Remove a deleted project and persist the index"""
+        self._ensure_open()
+        if project_id in self._rows:
+            self.remove(project_id)
+            with self._lock:
+                self._save()
+
+    def sync_project(self, project_dir) -> bool:
+        """Bring one project's vector up to date, dropping it if its directory is gone"""
+        self._ensure_open()
+        project_dir = Path(project_dir)
+        if project_dir.is_dir():
+            changed = self._sync_one(project_dir)
+        else:
+            changed = project_dir.name in self._rows
+            self.remove(project_dir.name)
+        if changed:
+            with self._lock:
+                self._save()
+        return changed
+
+    def sync_projects(self, projects_root, skip: Iterable[str] = ()) -> Dict[str, int]:
+        """Vectorize new or changed project directories and drop deleted ones"""
+        self._ensure_open()
+        projects_root = Path(projects_root)
+        if not projects_root.exists():
+            return {"updated": 0, "removed": 0, "projects": len(self._rows)}
+
+        skip = set(skip)
+        seen = set()
+        updated = 0
+        for project_dir in projects_root.iterdir():
+            if not project_dir.is_dir() or project_dir.name.startswith('.') or project_dir.name in skip:
+                continue
+            seen.add(project_dir.name)
+            if self._sync_one(project_dir):
+                updated += 1
+
+        with self._lock:
+            stale = [project_id for project_id in self._rows if project_id not in seen]
+        for project_id in stale:
+            self.remove(project_id)
+        if updated or stale:
+            with self._lock:
+                self._save()
+        return {"updated": updated, "removed": len(stale), "projects": len(self._rows)}
+
+    def query_batch(self, vectors: np.ndarray, k: int = 5) -> List[List[Tuple[str, float]]]:
+        """Cosine top-k for each row of vectors against every stored project"""
+        matrix, ids = self._snapshot()
+        count = len(ids)
+        vectors = np.atleast_2d(vectors).astype(np.float32, copy=False)
+        if not count:
+            return [[] for _ in range(len(vectors))]
+
+        k = min(k, count)
+        best_scores = np.full((len(vectors), k), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(vectors), k), dtype=np.int64)
+        # Scan the matrix in chunks so memory stays bounded however many projects there are
+        for start in range(0, count, QUERY_CHUNK_ROWS):
+            block = np.asarray(matrix[start:min(start + QUERY_CHUNK_ROWS, count)])
+            scores = vectors @ block.T
+            merged_scores = np.concatenate([best_scores, scores], axis=1)
+            block_rows = np.broadcast_to(np.arange(start, start + block.shape[0]), scores.shape)
+            merged_rows = np.concatenate([best_rows, block_rows], axis=1)
+            top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(merged_scores, top, axis=1)
+            best_rows = np.take_along_axis(merged_rows, top, axis=1)
+
+        results = []
+        for scores, rows in zip(best_scores, best_rows):
+            order = np.argsort(-scores)
+            results.append([
+                (ids[rows[i]], float(scores[i]))
+                for i in order if np.isfinite(scores[i]) and ids[rows[i]] is not None and scores[i] > 0
+            ])
+        return results
+
+    def query(self, vector: np.ndarray, k: int = 5, exclude: Optional[str] = None) -> List[Dict[str, float]]:
+        """Return up to k most similar projects as {'project_id', 'score'} dicts"""
+        matches = self.query_batch(vector, k + (1 if exclude else 0))[0]
+        return [
+            {"project_id": project_id, "score": round(score, 4)}
+            for project_id, score in matches if project_id != exclude
+        ][:k]
+
+    def similar_to(self, project_id: str, k: int = 5) -> Optional[List[Dict[str, float]]]:
+        """Projects most similar to an indexed project, or None if it is not indexed"""
+        self._ensure_open()
+        with self._lock:
+            row = self._rows.get(project_id)
+            if row is None:
+                return None
+            vector = np.array(self._matrix[row])
+        return self.query(vector, k, exclude=project_id)
+
+    def clusters(self, threshold: float = 0.6, neighbours: int = 10) -> List[List[str]]:
+        """Group projects whose pairwise similarity reaches threshold (single linkage)
+
+        Compares every project with every other one, so results are cached
+        until the index next changes; SimilarityIndexer recomputes the default
+        clustering in the background after each batch of library changes.
+        """
+        key = (threshold, neighbours)
+        version = self._version
+        cached = self._cluster_cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        matrix, ids = self._snapshot()
+        parent = list(range(len(ids)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        index_of = {project_id: row for row, project_id in enumerate(ids) if project_id is not None}
+        for start in range(0, len(ids), QUERY_CHUNK_ROWS):
+            block = np.asarray(matrix[start:min(start + QUERY_CHUNK_ROWS, len(ids))])
+            for offset, matches in enumerate(self.query_batch(block, neighbours + 1)):
+                row = start + offset
+                if ids[row] is None:
+                    continue
+                for project_id, score in matches:
+                    if score >= threshold and project_id != ids[row]:
+                        parent[find(row)] = find(index_of[project_id])
+
+        groups: Dict[int, List[str]] = {}
+        for row, project_id in enumerate(ids):
+            if project_id is not None:
+                groups.setdefault(find(row), []).append(project_id)
+        result = sorted((group for group in groups.values() if len(group) > 1), key=len, reverse=True)
+        self._cluster_cache = {k: v for k, v in self._cluster_cache.items() if v[0] == version}
+        self._cluster_cache[key] = (version, result)
+        return result
+
+    def vectorize_project(self, project_dir) -> Optional[np.ndarray]:
+        text, _ = project_text(Path(project_dir))
+        return self.vectorizer.vectorize(text) if text else None
+
+class SimilarityIndexer:
+    """Keeps a similarity index current from library change events
+
+    Requests only read the index: the library is synced once at start, then
+    projects reported changed by the library watcher are re-vectorized in a
+    background task, which also recomputes the default clustering.
+    """
+
+    def __init__(self, service: JournalSimilarityService, projects_root, debounce: float = 2.0,
+                 skip: Optional[Callable[[], Iterable[str]]] = None):
+        self.service = service
+        self.projects_root = Path(projects_root)
+        self.debounce = debounce
+        self.skip = skip
+        self._pending: Dict[str, bool] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            await asyncio.to_thread(self.service.open)
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def project_changed(self, project_id: str, deleted: bool = False):
+        """Queue a project for re-vectorizing, or for removal once it is deleted"""
+        self._pending[project_id] = deleted
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def _run(self):
+        try:
+            skip = await asyncio.to_thread(self.skip) if self.skip else ()
+            await asyncio.to_thread(self.service.sync_projects, self.projects_root, skip)
+            await asyncio.to_thread(self.service.clusters, DEFAULT_CLUSTER_THRESHOLD)
+        except Exception as e:
+            logger.error(f"Initial similarity index sync failed: {e}")
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.debounce)
+            self._wakeup.clear()
+            pending, self._pending = self._pending, {}
+            try:
+                for project_id, deleted in pending.items():
+                    if deleted:
+                        await asyncio.to_thread(self.service.discard, project_id)
+                    else:
+                        await asyncio.to_thread(self.service.sync_project, self.projects_root / project_id)
+                await asyncio.to_thread(self.service.clusters, DEFAULT_CLUSTER_THRESHOLD)
+            except Exception as e:
+                logger.error(f"Error updating similarity index: {e}")
+
+# Global instance
+journal_similarity_service = JournalSimilarityService(os.getenv("SIMILARITY_INDEX_DIR", "similarity_index"))
@@ -2,7 +2,9 @@
 Knowledge Base Query Service
 
 This service provides a high-level interface for CrewAI agents to query the Archon knowledge base
-and integrate research-backed insights into journal content creation.
+and integrate research-backed insights into journal content creation. Theme searches can also be
+served by the local BM25 index the pipeline builds from knowledge/ and past runs, without any
+network round trip (KNOWLEDGE_BACKEND=auto|local|archon).
 """
 
 import os
@@ -24,6 +26,20 @@ except ImportError:
     ARCHON_AVAILABLE = False
     logging.warning("Archon client not available - knowledge base features will be disabled")
 
+# Local BM25 index shared with the pipeline tools
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.append(PROJECT_ROOT)
+try:
+    from tools.knowledge_index import open_knowledge_index
+    LOCAL_INDEX_AVAILABLE = True
+except ImportError:
+    LOCAL_INDEX_AVAILABLE = False
+
+KNOWLEDGE_BACKEND = os.getenv("KNOWLEDGE_BACKEND", "auto")
+KNOWLEDGE_INDEX_DIR = os.getenv("KNOWLEDGE_INDEX_DIR", os.path.join(PROJECT_ROOT, "Projects_Derived", ".knowledge_index"))
+KNOWLEDGE_DIRS = [os.path.join(PROJECT_ROOT, "knowledge")]
+KNOWLEDGE_RUN_ROOTS = [os.path.join(PROJECT_ROOT, "Projects_Derived"), os.path.join(PROJECT_ROOT, "LLM_output")]
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -40,8 +56,10 @@ class KnowledgeQueryService:
         """Initialize the knowledge query service."""
         self.archon_client = None
         self.enabled = False
+        self.local_index = None
+        self.backend = KNOWLEDGE_BACKEND
 
-        if ARCHON_AVAILABLE:
+        if ARCHON_AVAILABLE and self.backend != "local":
             try:
                 self.archon_client = ArchonServiceClient()
                 self.enabled = True
@@ -56,6 +74,55 @@ class KnowledgeQueryService:
         """Check if knowledge base functionality is available."""
         return self.enabled and self.archon_client is not None
 
+    def _get_local_index(self):
+        """Open the local index, re-synced when new runs have landed; None when disabled or unavailable."""
+        if self.backend == "archon" or not LOCAL_INDEX_AVAILABLE:
+            return None
+        try:
+            index = open_knowledge_index(KNOWLEDGE_INDEX_DIR, KNOWLEDGE_DIRS, KNOWLEDGE_RUN_ROOTS)
+        except Exception as e:
+            logger.error(f"Failed to open local knowledge index: {e}")
+            self.backend = "archon"
+            return None
+        if self.local_index is None:
+            logger.info(f"Local knowledge index ready with {index.doc_count} passages")
+        self.local_index = index
+        return self.local_index
+
+    async def _search_local(self, theme: str, match_count: int) -> Optional[Dict[str, Any]]:
+        """Search the local BM25 index; returns None when it has nothing for the theme."""
+        index = await asyncio.to_thread(self._get_local_index)
+        if index is None:
+            return None
+        query = f"{theme} {self._create_theme_search_query(theme)}"
+        passages = index.search(query, match_count)
+        if not passages:
+            return None
+
+        processed_items = [
+            {
+                'id': passage['id'],
+                'title': passage['title'],
+                'content': passage['content'],
+                'relevance_score': passage['score'],
+                'source': passage['source'],
+                'category': 'local',
+                'key_insights': self._extract_key_insights(passage['content'])
+            }
+            for passage in passages
+        ]
+        return {
+            'success': True,
+            'theme': theme,
+            'results': processed_items,
+            'total_results': len(processed_items),
+            'query_metadata': {
+                'theme': theme,
+                'search_timestamp': datetime.now().isoformat(),
+                'source': 'local_bm25_index'
+            }
+        }
+
     async def search_knowledge_for_theme(self, theme: str, match_count: int = 5) -> Dict[str, Any]:
         """
         Search knowledge base for relevant content based on journal theme.
@@ -67,6 +134,15 @@ class KnowledgeQueryService:
         Returns:
             Dictionary containing search results and metadata
         """
+        if self.backend != "archon":
+            try:
+                local_results = await self._search_local(theme, match_count)
+            except Exception as e:
+                logger.error(f"Error searching local knowledge index for theme '{theme}': {e}")
+                local_results = None
+            if local_results or self.backend == "local":
+                return local_results or self._get_fallback_response(theme, "knowledge search")
+
         if not self.is_enabled():
             return self._get_fallback_response(theme, "knowledge search")
 
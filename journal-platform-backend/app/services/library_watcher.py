@@ -0,0 +1,232 @@
+"""
+Library Watcher Service
+
+Keeps JournalScannerService indexes current while the backend runs and
+publishes project_added, project_updated, project_completed and
+project_deleted events to WebSocket subscribers. On Linux it listens to
+inotify through libc, so only the projects that changed are re-walked.
+Elsewhere, or when the kernel's watch limit is reached, it falls back to
+polling each index with an mtime refresh.
+"""
+
+import os
+import sys
+import errno
+import struct
+import ctypes
+import ctypes.util
+import asyncio
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .journal_scanner import JournalScannerService
+from .project_bundle import project_id_for
+
+logger = logging.getLogger(__name__)
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+EVENT_HEADER = struct.Struct("iIII")
+
+class LibraryWatcher:
+    """Watches scanner output directories and streams library changes"""
+
+    def __init__(self, scanners: List[JournalScannerService], publish: Callable[[Dict], Awaitable[None]],
+                 debounce: float = 1.0, poll_interval: float = 5.0):
+        self.scanners = scanners
+        self.publish = publish
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.mode = None
+        self._fd = None
+        self._libc = None
+        self._watches: Dict[int, Tuple[JournalScannerService, Path]] = {}
+        self._dirty: Set[Tuple[int, str]] = set()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self):
+        """Index every root once, then keep the indexes current in the background"""
+        self._loop = asyncio.get_running_loop()
+        for scanner in self.scanners:
+            await asyncio.to_thread(scanner.refresh, True)
+            scanner.watched = True
+
+        if sys.platform.startswith("linux") and await asyncio.to_thread(self._init_inotify):
+            self.mode = "inotify"
+            self._loop.add_reader(self._fd, self._read_events)
+        else:
+            self.mode = "polling"
+            self._tasks.append(self._loop.create_task(self._poll()))
+        logger.info(f"Library watcher started ({self.mode}) for {[str(s.llm_output_dir) for s in self.scanners]}")
+
+    async def stop(self):
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        for task in self._tasks:
+            task.cancel()
+        for scanner in self.scanners:
+            scanner.watched = False
+
+    # ------------------------------------------------------------------
+    # inotify
+    # ------------------------------------------------------------------
+
+    def _init_inotify(self) -> bool:
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify unavailable, polling instead: {e}")
+            return False
+        if fd < 0:
+            return False
+        self._fd = fd
+
+        try:
+            for scanner in self.scanners:
+                if scanner.llm_output_dir.exists():
+                    self._watch_tree(scanner, scanner.llm_output_dir)
+        except OSError as e:
+            logger.warning(f"Could not watch library directories, polling instead: {e}")
+            os.close(self._fd)
+            self._fd = None
+            self._watches.clear()
+            return False
+        return True
+
+    def _watch_tree(self, scanner: JournalScannerService, path: Path):
+        """Add watches for path and every non-hidden directory below it"""
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(current), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOENT:
+                    continue
+                raise OSError(err, os.strerror(err), str(current))
+            self._watches[wd] = (scanner, current)
+            try:
+                with os.scandir(current) as entries:
+                    stack.extend(Path(entry.path) for entry in entries
+                                 if entry.is_dir(follow_symlinks=False) and not entry.name.startswith('.'))
+            except OSError:
+                pass
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped; fall back to an mtime refresh of every index
+                self._dirty.update((index, "*") for index in range(len(self.scanners)))
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            if wd not in self._watches:
+                continue
+
+            scanner, directory = self._watches[wd]
+            path = directory / os.fsdecode(name) if name else directory
+            relative = path.relative_to(scanner.llm_output_dir).parts
+            if not relative or relative[0].startswith('.') or any(part.startswith('.') for part in relative):
+                continue
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                try:
+                    self._watch_tree(scanner, path)
+                except OSError as e:
+                    if e.errno == errno.ENOSPC:
+                        # Out of inotify watches: changes below path would go unseen
+                        self._fall_back_to_polling(e)
+                        return
+                    logger.warning(f"Could not watch {path}: {e}")
+            # Packed projects live in <project_id>.jcbundle files at the root
+            project_id = project_id_for(relative[0]) or relative[0]
+            self._dirty.add((self.scanners.index(scanner), project_id))
+
+        if self._dirty and self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(
+                self.debounce, lambda: self._tasks.append(self._loop.create_task(self._flush()))
+            )
+
+    def _fall_back_to_polling(self, error: OSError):
+        logger.warning(f"Could not watch library directories, polling instead: {error}")
+        self._loop.remove_reader(self._fd)
+        os.close(self._fd)
+        self._fd = None
+        self._watches.clear()
+        self.mode = "polling"
+        self._tasks.append(self._loop.create_task(self._poll()))
+
+    async def _flush(self):
+        self._flush_handle = None
+        self._tasks = [task for task in self._tasks if not task.done()]
+        dirty, self._dirty = self._dirty, set()
+        for index, project_id in sorted(dirty):
+            scanner = self.scanners[index]
+            try:
+                if project_id == "*":
+                    changes = await asyncio.to_thread(scanner.refresh, True)
+                else:
+                    changes = await asyncio.to_thread(scanner.refresh_project, project_id)
+            except Exception as e:
+                logger.error(f"Error refreshing library index for {project_id}: {e}")
+                continue
+            await self._publish_changes(scanner, changes)
+
+    # ------------------------------------------------------------------
+    # Polling fallback
+    # ------------------------------------------------------------------
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            for scanner in self.scanners:
+                try:
+                    changes = await asyncio.to_thread(scanner.refresh, True)
+                except Exception as e:
+                    logger.error(f"Error polling {scanner.llm_output_dir}: {e}")
+                    continue
+                await self._publish_changes(scanner, changes)
+
+    async def _publish_changes(self, scanner: JournalScannerService, changes: List[Dict[str, str]]):
+        for change in changes:
+            project = None
+            if change['event'] != 'project_deleted':
+                project = await asyncio.to_thread(scanner.get_project_by_id, change['project_id'])
+            try:
+                await self.publish({
+                    "type": "library_update",
+                    "event": change['event'],
+                    "project_id": change['project_id'],
+                    "source": scanner.llm_output_dir.name,
+                    "project": project,
+                    "timestamp": datetime.now().isoformat()
+                })
+            except Exception as e:
+                logger.error(f"Error publishing library event: {e}")
@@ -0,0 +1,140 @@
+"""
+Load Governor
+
+Admission control for journal generation. Pressure is the highest of three
+signals: workflows in flight against the worker limit, the LLM calls those
+workflows are expected to make per minute against the LLM budget, and
+event-loop lag. As pressure rises, new runs are downgraded (comprehensive ->
+standard -> express, lighter research). Once the service is saturated they
+are rejected with a Retry-After hint instead of queueing without limit.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from .workflow_deadline_service import workflow_deadline_service
+
+logger = logging.getLogger(__name__)
+
+# Expected LLM calls per workflow type
+WORKFLOW_LLM_CALLS = {"express": 7, "standard": 12, "comprehensive": 16}
+
+WORKFLOW_DOWNGRADES = {"comprehensive": "standard", "standard": "express", "express": "express"}
+DEPTH_DOWNGRADES = {"deep": "medium", "medium": "light", "light": "light"}
+
+DOWNGRADE_PRESSURE = 0.6
+MINIMAL_PRESSURE = 0.85
+REJECT_PRESSURE = 1.0
+
+LAG_SAMPLE_INTERVAL = 0.5
+LAG_SMOOTHING = 0.3
+
+
+class LoadGovernor:
+    """Tracks in-flight workflows and event-loop lag and decides how to admit new runs"""
+
+    def __init__(self, max_workflows: int = 8, llm_calls_per_minute: int = 60, max_loop_lag: float = 0.25):
+        self.max_workflows = max_workflows
+        self.llm_calls_per_minute = llm_calls_per_minute
+        self.max_loop_lag = max_loop_lag
+        self.in_flight: Dict[str, Dict] = {}
+        self.loop_lag = 0.0
+        self._lag_task: Optional[asyncio.Task] = None
+
+    async def _monitor_loop_lag(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(LAG_SAMPLE_INTERVAL)
+            lag = max(0.0, time.monotonic() - started - LAG_SAMPLE_INTERVAL)
+            self.loop_lag += LAG_SMOOTHING * (lag - self.loop_lag)
+
+    def _ensure_lag_monitor(self):
+        if self._lag_task is None or self._lag_task.done():
+            try:
+                self._lag_task = asyncio.get_running_loop().create_task(self._monitor_loop_lag())
+            except RuntimeError:
+                pass  # No running loop (e.g. called from sync code); lag stays at its last value
+
+    def register(self, job_id: str, workflow_type: str):
+        self.in_flight[job_id] = {"workflow_type": workflow_type, "started": time.monotonic()}
+
+    def release(self, job_id: str):
+        self.in_flight.pop(job_id, None)
+
+    def pressure(self) -> Dict[str, float]:
+        """Pressure per signal, where 1.0 means saturated"""
+        llm_rate = sum(
+            WORKFLOW_LLM_CALLS.get(job["workflow_type"], WORKFLOW_LLM_CALLS["standard"])
+            / (workflow_deadline_service.deadline_seconds(job["workflow_type"]) / 60)
+            for job in self.in_flight.values()
+        )
+        return {
+            "queue": len(self.in_flight) / self.max_workflows,
+            "llm_budget": llm_rate / self.llm_calls_per_minute,
+            "loop_lag": self.loop_lag / self.max_loop_lag,
+        }
+
+    def _retry_after(self, signals: Dict[str, float]) -> int:
+        """Seconds until capacity is likely to free up"""
+        if max(signals, key=signals.get) == "loop_lag" or not self.in_flight:
+            return 5
+        now = time.monotonic()
+        soonest = min(
+            job["started"] + workflow_deadline_service.deadline_seconds(job["workflow_type"]) - now
+            for job in self.in_flight.values()
+        )
+        return int(min(600, max(5, soonest)))
+
+    def admit(self, workflow_type: str = "standard", research_depth: Optional[str] = None) -> Dict:
+        """Decide whether and how to run a new workflow.
+
+        Returns a dict with 'accepted', the possibly downgraded 'workflow_type'
+        and 'research_depth', 'degraded', 'pressure', 'reason' and, when
+        rejected, 'retry_after' in seconds.
+        """
+        self._ensure_lag_monitor()
+        signals = self.pressure()
+        pressure = max(signals.values())
+        decision = {
+            "accepted": True,
+            "workflow_type": workflow_type,
+            "research_depth": research_depth,
+            "degraded": False,
+            "pressure": round(pressure, 3),
+            "reason": None,
+            "retry_after": None,
+        }
+
+        if pressure >= REJECT_PRESSURE:
+            decision.update(
+                accepted=False,
+                retry_after=self._retry_after(signals),
+                reason=f"Service is at capacity ({max(signals, key=signals.get)} saturated)",
+            )
+        elif pressure >= MINIMAL_PRESSURE:
+            decision.update(workflow_type="express", research_depth="light" if research_depth else None,
+                            reason="High load: running an express workflow with light research")
+        elif pressure >= DOWNGRADE_PRESSURE:
+            decision.update(workflow_type=WORKFLOW_DOWNGRADES.get(workflow_type, "express"),
+                            research_depth=DEPTH_DOWNGRADES.get(research_depth, research_depth),
+                            reason="Elevated load: workflow downgraded one level")
+
+        decision["degraded"] = decision["accepted"] and (
+            decision["workflow_type"] != workflow_type or decision["research_depth"] != research_depth
+        )
+        if decision["accepted"] and not decision["degraded"]:
+            decision["reason"] = None
+        if not decision["accepted"] or decision["degraded"]:
+            logger.warning(f"Load governor ({signals}): {decision['reason']}")
+        return decision
+
+
+# Global instance
+load_governor = LoadGovernor(
+    max_workflows=int(os.getenv("MAX_CONCURRENT_WORKFLOWS", "8")),
+    llm_calls_per_minute=int(os.getenv("LLM_CALLS_PER_MINUTE", "60")),
+    max_loop_lag=float(os.getenv("MAX_EVENT_LOOP_LAG", "0.25")),
+)
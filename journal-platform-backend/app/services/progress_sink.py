@@ -0,0 +1,76 @@
+"""
+Progress Sink
+
+Coalesces high-frequency progress updates before they reach storage. It
+keeps only the latest state of each job and hands the pending states to a
+writer in one batch: when the flush interval has passed, when a job reaches
+a terminal state, and on a background timer so trailing updates are not
+held back. A job reporting every few hundred milliseconds then costs one
+write per interval instead of one per tick. A batch that fails to write is
+kept for the next flush, and a failed terminal write is raised to the caller
+so a job's final status is never lost silently. Callers push the same updates to
+WebSocket subscribers directly, so clients see every step with no added
+lag.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"completed", "error", "failed", "cancelled"}
+
+class ProgressSink:
+    """Latest-state-per-job buffer flushed to a writer in batches"""
+
+    def __init__(self, writer: Callable[[Dict[str, Any]], Awaitable[None]], interval: float = 5.0):
+        self.writer = writer
+        self.interval = interval
+        self._pending: Dict[str, Any] = {}
+        self._last_flush = 0.0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def update(self, job_id: str, state: Any, terminal: bool = False):
+        """Record a job's latest state; flushes now if the job finished or the interval has passed"""
+        self._pending[job_id] = state
+        if terminal or time.monotonic() - self._last_flush >= self.interval:
+            await self.flush(raise_errors=terminal)
+
+    async def flush(self, raise_errors: bool = False):
+        """Write every pending state in one batch.
+
+        A failed batch goes back into the buffer (behind any newer state) to be
+        retried by the next flush. With raise_errors the writer's exception is
+        re-raised after that, which terminal updates use.
+        """
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            try:
+                await self.writer(batch)
+            except Exception as e:
+                logger.error(f"Error flushing progress for {len(batch)} jobs: {e}")
+                self._pending = {**batch, **self._pending}
+                if raise_errors:
+                    raise
+
+    async def start(self):
+        """Flush trailing updates on a timer; only for writers that are safe to call from another task"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
@@ -0,0 +1,373 @@
+"""
+Project Bundle Format
+
+Packs a project directory (Json_output, LLM_output, media, PDF_output, and
+any sidecars) into one SQLite file, <project_id>.jcbundle, next to the
+project directories. Artifacts are rows keyed by their relative path. Any
+single file can be read or streamed without unpacking the rest, and new
+artifacts can be appended or replaced in place. Artifacts are written and
+streamed through SQLite's incremental blob I/O, so neither packing nor
+downloading holds a whole artifact in memory. On large volumes this turns
+dozens of small files per project into a single inode. Scans, backups and
+deletes then touch one file per project instead of walking a tree.
+
+Cold bundles, written by the cold storage compactor for inactive projects,
+also compress each artifact with zstd (zlib when zstandard is not
+installed). Reads decompress transparently, and streaming decompresses one
+chunk at a time.
+
+    python -m app.services.project_bundle pack ../LLM_output [--project ID] [--remove-source] [--cold]
+    python -m app.services.project_bundle unpack ../LLM_output/ID.jcbundle [--dest DIR]
+    python -m app.services.project_bundle ls ../LLM_output/ID.jcbundle
+"""
+
+import os
+import json
+import time
+import zlib
+import shutil
+import sqlite3
+import hashlib
+import logging
+import tempfile
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional, Union
+from urllib.parse import quote
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_SUFFIX = ".jcbundle"
+BUNDLE_FORMAT_VERSION = "1"
+STREAM_CHUNK_SIZE = 256 * 1024
+COLD_CODEC = "zstd" if ZSTD_AVAILABLE else "zlib"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    sha256 TEXT NOT NULL,
+    data BLOB NOT NULL,
+    codec TEXT NOT NULL DEFAULT ''
+);
+"""
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return zlib.compress(data, 9)
+
+def _compressor(codec: str):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compressobj()
+    return zlib.compressobj(9)
+
+def _decompressor(codec: str):
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj()
+
+def bundle_path_for(output_dir: Union[str, Path], project_id: str) -> Path:
+    return Path(output_dir) / f"{project_id}{BUNDLE_SUFFIX}"
+
+def project_id_for(bundle_name: str) -> Optional[str]:
+    """Project ID for a bundle filename, or None when the name is not a bundle"""
+    return bundle_name[:-len(BUNDLE_SUFFIX)] if bundle_name.endswith(BUNDLE_SUFFIX) else None
+
+class ProjectBundle:
+    """One project's artifacts stored as rows of a SQLite file"""
+
+    def __init__(self, path: Union[str, Path], readonly: bool = True):
+        self.path = Path(path)
+        self.readonly = readonly
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{quote(str(self.path.resolve()))}?mode=ro", uri=True,
+                                         check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+            self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('format_version', ?)",
+                               (BUNDLE_FORMAT_VERSION,))
+            self._conn.commit()
+        # Bundles written before cold storage existed have no codec column
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(artifacts)")}
+        if "codec" not in columns and not readonly:
+            self._conn.execute("ALTER TABLE artifacts ADD COLUMN codec TEXT NOT NULL DEFAULT ''")
+            self._conn.commit()
+            columns.add("codec")
+        self._codec_column = "codec" if "codec" in columns else "''"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def list(self) -> List[Dict[str, Union[str, int, float]]]:
+        """Every artifact's path, size, stored size, mtime and sha256, ordered by path"""
+        rows = self._conn.execute(
+            "SELECT path, size, length(data), mtime, sha256 FROM artifacts ORDER BY path"
+        ).fetchall()
+        return [{"path": path, "size": size, "stored_size": stored, "mtime": mtime, "sha256": digest}
+                for path, size, stored, mtime, digest in rows]
+
+    def stat(self, rel_path: str) -> Optional[Dict[str, Union[int, float]]]:
+        row = self._conn.execute("SELECT size, mtime FROM artifacts WHERE path = ?", (rel_path,)).fetchone()
+        return {"size": row[0], "mtime": row[1]} if row else None
+
+    def read(self, rel_path: str) -> Optional[bytes]:
+        row = self._conn.execute(
+            f"SELECT data, {self._codec_column} FROM artifacts WHERE path = ?", (rel_path,)
+        ).fetchone()
+        if not row:
+            return None
+        data, codec = bytes(row[0]), row[1]
+        if codec:
+            decompressor = _decompressor(codec)
+            data = decompressor.decompress(data) + decompressor.flush()
+        return data
+
+    def iter_chunks(self, rel_path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream one artifact in chunks without loading it into memory, decompressing as it goes"""
+        row = self._conn.execute(
+            f"SELECT rowid, {self._codec_column} FROM artifacts WHERE path = ?", (rel_path,)
+        ).fetchone()
+        if not row:
+            return
+        rowid, codec = row
+        decompressor = _decompressor(codec) if codec else None
+        with self._conn.blobopen("artifacts", "data", rowid, readonly=True) as blob:
+            for chunk in iter(lambda: blob.read(chunk_size), b""):
+                if decompressor:
+                    chunk = decompressor.decompress(chunk)
+                    if not chunk:
+                        continue
+                yield chunk
+        if decompressor:
+            tail = decompressor.flush()
+            if tail:
+                yield tail
+
+    def add(self, rel_path: str, data: bytes, mtime: Optional[float] = None, commit: bool = True, codec: str = ""):
+        """Append an artifact, replacing any existing one at the same path.
+
+        With a codec the artifact is stored compressed, unless compressing
+        does not make it smaller (images, PDFs, EPUBs).
+        """
+        stored = data
+        if codec:
+            stored = _compress(codec, data)
+            if len(stored) >= len(data):
+                stored, codec = data, ""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO artifacts (path, size, mtime, sha256, data, codec) VALUES (?, ?, ?, ?, ?, ?)",
+            (rel_path, len(data), mtime if mtime is not None else time.time(),
+             hashlib.sha256(data).hexdigest(), sqlite3.Binary(stored), codec)
+        )
+        if commit:
+            self._conn.commit()
+
+    def add_file(self, rel_path: str, source: Union[str, Path], commit: bool = True, codec: str = ""):
+        """Stream a file into the bundle chunk by chunk; compression works as in add()"""
+        source = Path(source)
+        digest = hashlib.sha256()
+        with open(source, 'rb') as f, tempfile.TemporaryFile(dir=self.path.parent) as packed:
+            mtime = os.fstat(f.fileno()).st_mtime
+            size = f.seek(0, os.SEEK_END)
+            f.seek(0)
+            if codec:
+                # Compress into a spool first, since the blob is sized before it is written
+                compressor = _compressor(codec)
+                for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    packed.write(compressor.compress(chunk))
+                packed.write(compressor.flush())
+                if f.tell() != size:
+                    raise ValueError(f"{source} changed while it was being packed")
+                if packed.tell() >= size:
+                    stream, stored_size, codec = f, size, ""
+                    digest = hashlib.sha256()
+                else:
+                    stream, stored_size = packed, packed.tell()
+            else:
+                stream, stored_size = f, size
+            stream.seek(0)
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (path, size, mtime, sha256, data, codec) "
+                "VALUES (?, ?, ?, '', zeroblob(?), ?)",
+                (rel_path, size, mtime, stored_size, codec)
+            )
+            rowid = self._conn.execute("SELECT rowid FROM artifacts WHERE path = ?", (rel_path,)).fetchone()[0]
+            with self._conn.blobopen("artifacts", "data", rowid) as blob:
+                while blob.tell() < stored_size:
+                    chunk = stream.read(min(STREAM_CHUNK_SIZE, stored_size - blob.tell()))
+                    if not chunk:
+                        raise ValueError(f"{source} changed while it was being packed")
+                    if stream is f:
+                        digest.update(chunk)
+                    blob.write(chunk)
+            self._conn.execute("UPDATE artifacts SET sha256 = ? WHERE rowid = ?", (digest.hexdigest(), rowid))
+        if commit:
+            self._conn.commit()
+
+    def remove(self, rel_path: str):
+        self._conn.execute("DELETE FROM artifacts WHERE path = ?", (rel_path,))
+        self._conn.commit()
+
+    def extract(self, rel_path: str, dest: Union[str, Path]) -> bool:
+        stat = self.stat(rel_path)
+        if not stat:
+            return False
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with open(dest, 'wb') as f:
+            for chunk in self.iter_chunks(rel_path):
+                f.write(chunk)
+        os.utime(dest, (stat["mtime"], stat["mtime"]))
+        return True
+
+    def manifest(self) -> Optional[Dict]:
+        """The project's manifest.json, when the bundle carries one"""
+        data = self.read("manifest.json")
+        if data is None:
+            return None
+        try:
+            manifest = json.loads(data)
+        except ValueError:
+            return None
+        return manifest if isinstance(manifest, dict) else None
+
+def _mtime_ns(path: Union[str, Path]) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def pack_directory(project_dir: Union[str, Path], bundle_path: Optional[Union[str, Path]] = None,
+                   remove_source: bool = False, codec: str = "",
+                   throttle: Optional[Callable[[int], None]] = None,
+                   commit_guard: Optional[Callable[[], ContextManager[bool]]] = None) -> Optional[Path]:
+    """Pack every file under project_dir into a bundle and return its path.
+
+    The bundle is built under a temporary name and renamed into place once
+    every file is in it, so a crash never leaves a partial bundle. The source
+    directory is removed only after that, and only when remove_source is set.
+    A codec compresses the artifacts and marks the bundle as cold. throttle
+    is called with each file's size after it is packed, so a caller can hold
+    packing to an I/O budget. commit_guard returns a context manager held
+    around the rename; when it yields False the temporary bundle is dropped,
+    nothing else changes, and None is returned. With remove_source the bundle
+    is dropped the same way when a directory's mtime moved after it was walked,
+    so files written during a long pack are never deleted.
+    """
+    project_dir = Path(project_dir)
+    bundle_path = Path(bundle_path) if bundle_path else bundle_path_for(project_dir.parent, project_dir.name)
+    tmp_path = bundle_path.with_name(bundle_path.name + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    count = 0
+    dir_mtimes = {}
+    with ProjectBundle(tmp_path, readonly=False) as bundle:
+        bundle._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('project_id', ?)", (project_dir.name,))
+        bundle._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('tier', ?)",
+                             ("cold" if codec else "packed",))
+        for root, _dirs, filenames in os.walk(project_dir):
+            dir_mtimes[root] = _mtime_ns(root)
+            for filename in filenames:
+                source = Path(root) / filename
+                bundle.add_file(source.relative_to(project_dir).as_posix(), source, commit=False, codec=codec)
+                count += 1
+                if throttle:
+                    throttle(source.stat().st_size)
+        bundle._conn.commit()
+    with commit_guard() if commit_guard else nullcontext(True) as commit:
+        changed = remove_source and any(_mtime_ns(path) != mtime for path, mtime in dir_mtimes.items())
+        if not commit or changed:
+            tmp_path.unlink()
+            reason = "it changed while packing" if changed else "packing was called off"
+            logger.info(f"Dropped bundle of {project_dir}: {reason}")
+            return None
+        os.replace(tmp_path, bundle_path)
+    logger.info(f"Packed {count} files from {project_dir} into {bundle_path}")
+
+    if remove_source:
+        shutil.rmtree(project_dir)
+    return bundle_path
+
+def unpack_bundle(bundle_path: Union[str, Path], dest_dir: Optional[Union[str, Path]] = None,
+                  remove_bundle: bool = False) -> Path:
+    """Restore a bundle to a project directory and return its path.
+
+    A new directory is extracted under a hidden temporary name and renamed into
+    place, so a crash never leaves a partial project behind. remove_bundle
+    deletes the bundle afterwards, returning the project to the active tier.
+    """
+    bundle_path = Path(bundle_path)
+    dest_dir = Path(dest_dir) if dest_dir else bundle_path.with_name(project_id_for(bundle_path.name) or bundle_path.stem)
+    target = dest_dir if dest_dir.exists() else dest_dir.with_name(f".{dest_dir.name}.unpack")
+    if target != dest_dir and target.exists():
+        shutil.rmtree(target)
+    with ProjectBundle(bundle_path) as bundle:
+        for artifact in bundle.list():
+            bundle.extract(artifact["path"], target / artifact["path"])
+    target.mkdir(exist_ok=True)
+    if target != dest_dir:
+        os.replace(target, dest_dir)
+    if remove_bundle:
+        bundle_path.unlink()
+    return dest_dir
+
+if __name__ == "__main__":
+    """CLI for converting project directories to and from bundles"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Project bundle migration tool")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    pack_parser = subparsers.add_parser("pack", help="Pack project directories into bundles")
+    pack_parser.add_argument("output_dir", help="Directory holding project directories, e.g. ../LLM_output")
+    pack_parser.add_argument("--project", action="append", help="Only pack this project (repeatable)")
+    pack_parser.add_argument("--remove-source", action="store_true", help="Delete each directory once packed")
+    pack_parser.add_argument("--cold", action="store_true", help=f"Compress artifacts ({COLD_CODEC})")
+    unpack_parser = subparsers.add_parser("unpack", help="Restore a bundle to a directory")
+    unpack_parser.add_argument("bundle")
+    unpack_parser.add_argument("--dest")
+    ls_parser = subparsers.add_parser("ls", help="List a bundle's artifacts")
+    ls_parser.add_argument("bundle")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        output_dir = Path(args.output_dir)
+        for project_dir in sorted(output_dir.iterdir()):
+            if not project_dir.is_dir() or project_dir.name.startswith('.'):
+                continue
+            if args.project and project_dir.name not in args.project:
+                continue
+            bundle_path = pack_directory(project_dir, remove_source=args.remove_source,
+                                         codec=COLD_CODEC if args.cold else "")
+            print(f"{project_dir.name} -> {bundle_path}")
+    elif args.command == "unpack":
+        print(unpack_bundle(args.bundle, args.dest))
+    elif args.command == "ls":
+        with ProjectBundle(args.bundle) as bundle:
+            for artifact in bundle.list():
+                print(f"{artifact['size']:>12}  {artifact['stored_size']:>12}  {artifact['path']}")
@@ -0,0 +1,106 @@
+"""
+Project Deletion Worker
+
+Deleting a project tombstones it in the library index and returns at
+once: listings, lookups and downloads stop seeing it immediately. The
+files are removed later by a single background worker, which unlinks them
+one at a time under an I/O budget, so deleting a media-heavy project (or
+hundreds of projects at once) never blocks the event loop or saturates the
+disk. Tombstones live in the index, so deletions interrupted by a restart
+resume when the worker starts again.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+from .journal_scanner import JournalScannerService
+
+logger = logging.getLogger(__name__)
+
+class ProjectDeletionWorker:
+    """Reclaims the files of tombstoned projects in the background"""
+
+    def __init__(self, scanners: List[JournalScannerService], files_per_second: float = 500.0):
+        self.scanners = scanners
+        self.files_per_second = files_per_second
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._queued = set()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Resume deletions left over from a previous run, then start reclaiming"""
+        for scanner in self.scanners:
+            for project_id in await asyncio.to_thread(scanner.tombstoned_projects):
+                self._enqueue(scanner, project_id)
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def delete(self, scanner: JournalScannerService, project_ids: List[str]) -> List[str]:
+        """Tombstone projects by exact ID and queue their files for removal; returns the IDs found"""
+        deleted = await asyncio.to_thread(scanner.tombstone, project_ids)
+        for project_id in deleted:
+            self._enqueue(scanner, project_id)
+        return deleted
+
+    def pending(self) -> int:
+        return len(self._queued)
+
+    def _enqueue(self, scanner: JournalScannerService, project_id: str):
+        key = (self.scanners.index(scanner), project_id)
+        if key not in self._queued:
+            self._queued.add(key)
+            self._queue.put_nowait(key)
+
+    async def _run(self):
+        while True:
+            key = await self._queue.get()
+            scanner = self.scanners[key[0]]
+            try:
+                await asyncio.to_thread(self._reclaim, scanner, key[1])
+            except Exception as e:
+                # Left tombstoned; retried on the next start
+                logger.error(f"Error removing files of deleted project {key[1]}: {e}")
+            finally:
+                self._queued.discard(key)
+
+    def _reclaim(self, scanner: JournalScannerService, project_id: str):
+        removed = 0
+        # A project can have both a directory and a bundle (e.g. unpacked for a continued run)
+        path = scanner.source_path(project_id)
+        while path.exists():
+            if path.is_dir():
+                removed += self._remove_tree(path)
+            else:
+                path.unlink()
+                removed += 1
+            path = scanner.source_path(project_id)
+        # The project's source is gone, so this drops its tombstoned row
+        scanner.refresh_project(project_id)
+        logger.info(f"Removed {removed} files of deleted project {project_id}")
+
+    def _remove_tree(self, root: Path) -> int:
+        """Unlink every file under root, deepest directories first, within the files-per-second budget"""
+        removed = 0
+        for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+            for name in filenames:
+                os.unlink(os.path.join(dirpath, name))
+                removed += 1
+                if self.files_per_second > 0:
+                    time.sleep(1 / self.files_per_second)
+            for name in dirnames:
+                subdir = os.path.join(dirpath, name)
+                if os.path.islink(subdir):
+                    os.unlink(subdir)
+                else:
+                    os.rmdir(subdir)
+        os.rmdir(root)
+        return removed
@@ -0,0 +1,39 @@
+"""
+Project Manifest Reader
+
+Every pipeline stage records its status and artifacts in one manifest.json
+per run directory (written by tools/run_manifest.py in the pipeline). The
+file holds title, theme, author_style, owner user_id, overall status, stage
+statuses, and artifact paths with their kind, size and sha256. Readers load
+this file instead of listing directories and guessing from filenames. Runs
+made before manifests existed have none, and callers fall back to scanning.
+"""
+
+import os
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+
+def load_manifest(project_dir: str) -> Optional[Dict]:
+    """Return the run's manifest, or None when it has none or it cannot be read"""
+    path = os.path.join(project_dir, MANIFEST_FILENAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Could not read {path}: {e}")
+        return None
+    return manifest if isinstance(manifest, dict) else None
+
+def artifacts_of_kind(manifest: Dict, kind: str) -> List[Tuple[str, Dict]]:
+    """(relative path, entry) pairs for the manifest's artifacts of one kind"""
+    return sorted(
+        (rel_path, entry) for rel_path, entry in manifest.get("artifacts", {}).items()
+        if entry.get("kind") == kind
+    )
@@ -0,0 +1,153 @@
+"""
+Unified Data Store
+
+SQLite persistence for the unified backend's users, projects, sessions,
+AI jobs and user settings. It replaces rewriting all of unified_data.json on
+every change. Each record is one row keyed by (collection, key) and holds
+its JSON document. A change upserts or deletes just that row, so a write
+costs the size of the record rather than of the whole database. The
+database runs in WAL mode, so readers never block the writer, and credit
+changes are a single UPDATE, so concurrent deductions cannot lose one
+another.
+
+An existing unified_data.json is imported once, the first time the store
+is opened empty, and renamed to unified_data.json.imported.
+
+    python -m app.services.unified_store import unified_data.json [--db unified_data.sqlite3]
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Collections the backend expects to exist even when empty
+DEFAULT_COLLECTIONS = ("users", "projects", "sessions", "ai_jobs")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    collection TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (collection, key)
+);
+"""
+
+class UnifiedStore:
+    """Per-record JSON documents in a WAL-mode SQLite database"""
+
+    def __init__(self, db_path: str = "unified_data.sqlite3"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Every collection as {key: record}, for the backend's in-memory view"""
+        data = {collection: {} for collection in DEFAULT_COLLECTIONS}
+        with self._lock:
+            rows = self._conn.execute("SELECT collection, key, value FROM records").fetchall()
+        for collection, key, value in rows:
+            data.setdefault(collection, {})[key] = json.loads(value)
+        return data
+
+    def get(self, collection: str, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM records WHERE collection = ? AND key = ?", (collection, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def upsert(self, collection: str, key: str, value: Any):
+        """Insert or replace one record"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO records (collection, key, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (collection, key) DO UPDATE SET value = excluded.value",
+                (collection, key, json.dumps(value))
+            )
+
+    def upsert_many(self, collection: str, records: Dict[str, Any]):
+        """Insert or replace several records of one collection in a single transaction"""
+        rows = [(collection, key, json.dumps(value)) for key, value in records.items()]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO records (collection, key, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (collection, key) DO UPDATE SET value = excluded.value",
+                rows
+            )
+
+    def delete(self, collection: str, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM records WHERE collection = ? AND key = ?", (collection, key))
+
+    def add_credits(self, user_id: str, delta: int) -> Optional[int]:
+        """Atomically add delta (negative to deduct) to a user's ai_credits and return the new balance"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE records SET value = json_set(value, '$.ai_credits', "
+                "COALESCE(json_extract(value, '$.ai_credits'), 0) + ?) "
+                "WHERE collection = 'users' AND key = ?",
+                (delta, user_id)
+            )
+            if cursor.rowcount == 0:
+                return None
+            row = self._conn.execute(
+                "SELECT json_extract(value, '$.ai_credits') FROM records WHERE collection = 'users' AND key = ?",
+                (user_id,)
+            ).fetchone()
+        return row[0]
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM records LIMIT 1").fetchone() is None
+
+    def import_json(self, json_path: str) -> int:
+        """Import a unified_data.json snapshot in one transaction; returns the number of records"""
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+
+        rows = [
+            (collection, str(key), json.dumps(value))
+            for collection, records in data.items() if isinstance(records, dict)
+            for key, value in records.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO records (collection, key, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (collection, key) DO UPDATE SET value = excluded.value",
+                rows
+            )
+        logger.info(f"Imported {len(rows)} records from {json_path} into {self.db_path}")
+        return len(rows)
+
+    def import_legacy_file(self, json_path: str):
+        """One-shot migration: import json_path into an empty store and set the file aside"""
+        if not os.path.exists(json_path) or not self.is_empty():
+            return
+        try:
+            self.import_json(json_path)
+        except Exception as e:
+            logger.error(f"Error importing {json_path}: {e}")
+            return
+        os.replace(json_path, f"{json_path}.imported")
+
+if __name__ == "__main__":
+    """CLI for importing unified_data.json"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Unified data store tool")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="Import a unified_data.json snapshot")
+    import_parser.add_argument("json_path")
+    import_parser.add_argument("--db", default="unified_data.sqlite3")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        print(f"Imported {UnifiedStore(args.db).import_json(args.json_path)} records")
@@ -0,0 +1,227 @@
+"""
+Workflow Deadline Service
+
+Gives every CrewAI workflow an overall deadline based on its type and splits
+it into per-stage budgets in proportion to how long each stage has taken
+historically. Stages can check whether they are short on time and degrade
+(lighter research, placeholder media, skipped polish) instead of letting one
+slow stage push the whole run past its deadline.
+
+A stage that runs past its time is stopped through a StageGate: its worker
+threads keep running until their next check, but none of their writes can
+land in the run directory once the gate is stopped.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import threading
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+# Stage gates live with the CrewAI tools at the repository root
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../.."))
+from tools.stage_gate import StageGate, reset_current_gate, set_current_gate
+
+logger = logging.getLogger(__name__)
+
+# Overall deadline per workflow type, in seconds
+WORKFLOW_DEADLINES = {
+    "express": 10 * 60,
+    "standard": 20 * 60,
+    "comprehensive": 30 * 60,
+}
+
+# Stages each workflow type runs, in order
+WORKFLOW_STAGES = {
+    "express": ["discovery", "curation", "pdf_building"],
+    "standard": ["discovery", "research", "curation", "editing", "pdf_building"],
+    "comprehensive": ["discovery", "research", "curation", "editing", "media", "pdf_building", "epub"],
+}
+
+# Expected stage durations in seconds until real measurements exist
+DEFAULT_STAGE_SECONDS = {
+    "discovery": 30,
+    "research": 120,
+    "curation": 300,
+    "editing": 180,
+    "media": 240,
+    "pdf_building": 60,
+    "epub": 10,
+    "crew": 600,
+}
+
+# Insights per research depth (mirrors VALID_RESEARCH_DEPTHS in the pipeline settings)
+RESEARCH_DEPTH_INSIGHTS = {"light": 5, "medium": 15, "deep": 25}
+
+# Deepest research each workflow type does; express runs have no research stage of
+# their own, so curation gets only the light research it cannot do without
+WORKFLOW_MAX_RESEARCH_DEPTH = {
+    "express": "light",
+    "standard": "medium",
+    "comprehensive": "deep",
+}
+
+# Stages the Phase 1 crew can run; research, curation and PDF building always run
+CREW_STAGES = ["research", "curation", "editing", "pdf_building"]
+CREW_REQUIRED_STAGES = {"research", "curation", "pdf_building"}
+
+HISTORY_SMOOTHING = 0.3
+
+
+class WorkflowDeadline:
+    """Deadline for one workflow run, handing out budgets to its remaining stages"""
+
+    def __init__(self, service: "WorkflowDeadlineService", workflow_type: str, stages: List[str], total_seconds: float):
+        self.service = service
+        self.workflow_type = workflow_type
+        self.total_seconds = total_seconds
+        self.pending = list(stages)
+        self.started = time.monotonic()
+        self.deadline = self.started + total_seconds
+        self.completes_by = datetime.now() + timedelta(seconds=total_seconds)
+        self.timings: Dict[str, float] = {}
+        self.degraded: List[str] = []
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def budget_for(self, stage: str) -> float:
+        """Share of the remaining time this stage gets, weighted by expected stage durations"""
+        pending = self.pending if stage in self.pending else self.pending + [stage]
+        total_expected = sum(self.service.expected(s) for s in pending)
+        return self.remaining() * self.service.expected(stage) / total_expected if total_expected else self.remaining()
+
+    def is_short(self, stage: str) -> bool:
+        """True when the stage's budget is below its expected duration"""
+        return self.budget_for(stage) < self.service.expected(stage)
+
+    def degrade(self, stage: str, reason: str):
+        self.degraded.append(stage)
+        logger.info(f"Degrading {stage} for {self.workflow_type} workflow: {reason}")
+
+    async def run(self, stage: str, coro, required: bool = True):
+        """Await a stage within the deadline.
+
+        Required stages may use all the remaining time and raise TimeoutError
+        when the deadline passes. Optional stages are limited to their own
+        budget and are abandoned (returning None) when they run over. Either
+        way the stage's gate is stopped, so work it started in threads cannot
+        write into the run after it has been given up on.
+        """
+        timeout = self.remaining() if required else self.budget_for(stage)
+        started = time.monotonic()
+        gate = StageGate(stage)
+        # wait_for runs the coroutine in a task that copies this context, and
+        # asyncio.to_thread copies it again, so the stage's threads see the gate
+        token = set_current_gate(gate)
+        try:
+            result = await asyncio.wait_for(coro, timeout=max(timeout, 1.0))
+        except asyncio.TimeoutError:
+            # wait_for only abandons the await; the gate makes the stage's threads stand down
+            gate.stop()
+            if required:
+                raise TimeoutError(f"Workflow deadline of {int(self.total_seconds)}s reached during {stage}")
+            self.degrade(stage, f"ran past its {int(timeout)}s budget")
+            return None
+        else:
+            elapsed = time.monotonic() - started
+            self.timings[stage] = round(elapsed, 2)
+            self.service.record(stage, elapsed)
+            return result
+        finally:
+            reset_current_gate(token)
+            if stage in self.pending:
+                self.pending.remove(stage)
+
+    def summary(self) -> Dict:
+        return {
+            "workflow_type": self.workflow_type,
+            "deadline_seconds": self.total_seconds,
+            "remaining_seconds": round(self.remaining(), 1),
+            "stage_seconds": self.timings,
+            "degraded_stages": self.degraded,
+        }
+
+
+class WorkflowDeadlineService:
+    """Workflow deadlines plus a persisted moving average of stage latencies"""
+
+    def __init__(self, history_path: str = "workflow_stage_history.json"):
+        self.history_path = history_path
+        self._lock = threading.Lock()
+        self.history: Dict[str, float] = {}
+        if os.path.exists(history_path):
+            try:
+                with open(history_path, 'r') as f:
+                    self.history = json.load(f)
+            except Exception as e:
+                logger.error(f"Could not load stage latency history: {e}")
+
+    def deadline_seconds(self, workflow_type: str) -> float:
+        return WORKFLOW_DEADLINES.get(workflow_type, WORKFLOW_DEADLINES["standard"])
+
+    def stages_for(self, workflow_type: str) -> List[str]:
+        return WORKFLOW_STAGES.get(workflow_type, WORKFLOW_STAGES["standard"])
+
+    def crew_stages_for(self, workflow_type: str) -> List[str]:
+        """Phase 1 crew stages a workflow type runs; optional ones outside the type are skipped"""
+        stages = self.stages_for(workflow_type)
+        return [s for s in CREW_STAGES if s in stages or s in CREW_REQUIRED_STAGES]
+
+    def research_depth_cap(self, workflow_type: str, requested_depth: str) -> str:
+        """Requested research depth, no deeper than the workflow type allows"""
+        cap = WORKFLOW_MAX_RESEARCH_DEPTH.get(workflow_type, WORKFLOW_MAX_RESEARCH_DEPTH["standard"])
+        if requested_depth not in RESEARCH_DEPTH_INSIGHTS:
+            return requested_depth
+        return min(requested_depth, cap, key=RESEARCH_DEPTH_INSIGHTS.get)
+
+    def expected(self, stage: str) -> float:
+        return self.history.get(stage, DEFAULT_STAGE_SECONDS.get(stage, 60))
+
+    def start(self, workflow_type: str, stages: Optional[List[str]] = None,
+              total_seconds: Optional[float] = None) -> WorkflowDeadline:
+        return WorkflowDeadline(
+            self,
+            workflow_type,
+            stages or self.stages_for(workflow_type),
+            total_seconds or self.deadline_seconds(workflow_type),
+        )
+
+    def record(self, stage: str, elapsed_seconds: float):
+        """Fold a measured stage duration into the history"""
+        with self._lock:
+            previous = self.history.get(stage)
+            if previous is None:
+                self.history[stage] = round(elapsed_seconds, 2)
+            else:
+                self.history[stage] = round(previous + HISTORY_SMOOTHING * (elapsed_seconds - previous), 2)
+            try:
+                tmp_path = f"{self.history_path}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(self.history, f, indent=2)
+                os.replace(tmp_path, self.history_path)
+            except Exception as e:
+                logger.error(f"Could not save stage latency history: {e}")
+
+    def research_depth_for(self, deadline: WorkflowDeadline, requested_depth: str,
+                           depths: Optional[Dict[str, int]] = None) -> str:
+        """Deepest research depth, no deeper than requested, that fits the research budget"""
+        depths = depths or RESEARCH_DEPTH_INSIGHTS
+        if requested_depth not in depths or not deadline.is_short("research"):
+            return requested_depth
+        requested_insights = depths[requested_depth]
+        affordable = requested_insights * deadline.budget_for("research") / self.expected("research")
+        fitting = [name for name, count in sorted(depths.items(), key=lambda item: item[1], reverse=True)
+                   if count <= min(affordable, requested_insights)]
+        depth = fitting[0] if fitting else min(depths, key=depths.get)
+        if depth != requested_depth:
+            deadline.degrade("research", f"depth {requested_depth} -> {depth}")
+        return depth
+
+
+# Global instance
+workflow_deadline_service = WorkflowDeadlineService(os.getenv("WORKFLOW_STAGE_HISTORY_PATH", "workflow_stage_history.json"))
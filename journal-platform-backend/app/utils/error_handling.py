@@ -185,7 +185,8 @@ class ErrorHandler:
         error_code: str,
         status_code: int,
         details: Dict[str, Any] = None,
-        should_show_details: bool = False
+        should_show_details: bool = False,
+        headers: Dict[str, str] = None
     ) -> JSONResponse:
         """Create standardized error response"""
 
@@ -204,7 +205,8 @@ class ErrorHandler:
 
         return JSONResponse(
             status_code=status_code,
-            content=response_content
+            content=response_content,
+            headers=headers
         )
 
     @staticmethod
@@ -291,7 +293,8 @@ class ErrorHandler:
             error_id=error_id,
             message=custom_exc.message,
             error_code=custom_exc.error_code,
-            status_code=custom_exc.status_code
+            status_code=custom_exc.status_code,
+            headers=getattr(exc, "headers", None)
         )
 
     @staticmethod
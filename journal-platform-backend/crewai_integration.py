@@ -14,6 +14,9 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../crews'))
 
 from dotenv import load_dotenv
 
+from app.services.workflow_deadline_service import workflow_deadline_service
+from app.services.load_governor import load_governor
+
 # Load environment variables
 load_dotenv()
 
@@ -78,6 +81,9 @@ class JournalCreationService:
             'error': None
         }
 
+        # Count the run against the load governor until it finishes
+        load_governor.register(job_id, preferences.get('workflowType', 'standard'))
+
         # Start the background task
         asyncio.create_task(self._execute_journal_creation(job_id, api_key, progress_callback))
 
@@ -112,6 +118,18 @@ class JournalCreationService:
             # Convert web preferences to CrewAI format
             crewai_prefs = self._convert_preferences(preferences, job_id)
 
+            # The workflow type (possibly downgraded by the load governor) decides how much
+            # work the crew does: how deep it researches and whether it runs the editing pass.
+            # Research is lightened further when past stage timings say it would not fit.
+            workflow_type = preferences.get('workflowType', 'standard')
+            crew_stages = workflow_deadline_service.crew_stages_for(workflow_type)
+            deadline = workflow_deadline_service.start(workflow_type, stages=crew_stages)
+            crewai_prefs['research_depth'] = workflow_deadline_service.research_depth_cap(workflow_type, crewai_prefs['research_depth'])
+            crewai_prefs['research_depth'] = workflow_deadline_service.research_depth_for(deadline, crewai_prefs['research_depth'])
+            self.active_jobs[job_id]['deadline'] = deadline.completes_by.isoformat()
+            self.active_jobs[job_id]['workflow_type'] = workflow_type
+            self.active_jobs[job_id]['research_depth'] = crewai_prefs['research_depth']
+
             # Import CrewAI modules (lazy loading to avoid startup issues)
             await self._update_progress(job_id, 'research', 15, 'Starting research phase...', progress_callback)
 
@@ -132,7 +150,8 @@ class JournalCreationService:
                     theme=crewai_prefs['theme'],
                     research_depth=crewai_prefs['research_depth'],
                     author_style=crewai_prefs['author_style'],
-                    title=crewai_prefs['title']
+                    title=crewai_prefs['title'],
+                    include_editing='editing' in crew_stages
                 )
 
                 # Execute crew with progress tracking
@@ -142,7 +161,7 @@ class JournalCreationService:
                 await self._simulate_progress(job_id, progress_callback)
 
                 # Execute the crew
-                result = await self._execute_crew_with_progress(crew, job_id, progress_callback)
+                result = await self._execute_crew_with_progress(crew, job_id, progress_callback, deadline)
 
                 # Process results
                 processed_result = process_results(result)
@@ -170,6 +189,9 @@ class JournalCreationService:
             self.active_jobs[job_id]['status'] = 'error'
             self.active_jobs[job_id]['error'] = error_message
 
+        finally:
+            load_governor.release(job_id)
+
     def _convert_preferences(self, web_prefs: Dict[str, Any], job_id: str) -> Dict[str, Any]:
         """Convert web preferences to CrewAI format."""
         # Create job directory
@@ -255,8 +277,11 @@ class JournalCreationService:
 
                 await asyncio.sleep(0.5)  # Brief pause between activities
 
-    async def _execute_crew_with_progress(self, crew, job_id: str, progress_callback: Optional[Callable] = None):
-        """Execute CrewAI crew with robust error handling and timeout protection."""
+    async def _execute_crew_with_progress(self, crew, job_id: str, progress_callback: Optional[Callable] = None, deadline=None):
+        """Execute CrewAI crew with robust error handling and timeout protection.
+
+        The timeout is whatever is left of the workflow deadline, or 10 minutes without one.
+        """
         import asyncio
 
         try:
@@ -266,8 +291,9 @@ class JournalCreationService:
             # Execute crew with timeout and error handling
             print(f"🤖 Executing CrewAI crew for job {job_id}...")
 
-            # Set a timeout for crew execution (10 minutes)
-            timeout_seconds = 600
+            # Time left on the workflow deadline (10 minutes when run without one)
+            timeout_seconds = int(deadline.remaining()) if deadline else 600
+            started = datetime.now()
 
             try:
                 # Run crew.kickoff() in a thread with timeout
@@ -281,6 +307,7 @@ class JournalCreationService:
                     raise ValueError("CrewAI execution returned None result")
 
                 print(f"✅ CrewAI execution completed successfully for job {job_id}")
+                workflow_deadline_service.record("crew", (datetime.now() - started).total_seconds())
 
                 # Send completion progress update
                 await self._update_progress(job_id, 'executing', 90, '✅ CrewAI execution completed, processing results...', progress_callback)
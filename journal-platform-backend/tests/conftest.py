@@ -3,8 +3,10 @@ Pytest Configuration and Fixtures
 Phase 3.5: Comprehensive API Testing Suite
 """
 
+import json
 import pytest
 import asyncio
+from pathlib import Path
 from typing import AsyncGenerator, Generator
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
@@ -252,4 +254,39 @@ def sample_export_data():
             "trim_size": "6x9",
             "generate_cover": False
         }
-    }
\ No newline at end of file
+    }
+
+
+@pytest.fixture
+def output_dir(tmp_path: Path) -> Path:
+    """Empty LLM_output folder for library tests"""
+    path = tmp_path / "LLM_output"
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def scanner(output_dir: Path, tmp_path: Path):
+    """Journal scanner over output_dir with its own index"""
+    from app.services.journal_scanner import JournalScannerService
+
+    return JournalScannerService(str(output_dir), str(tmp_path / "library_index.sqlite3"))
+
+
+@pytest.fixture
+def make_project(output_dir: Path):
+    """Create minimal pipeline run directories, with a manifest when created_at is given"""
+    def _make_project(project_id: str, with_pdf: bool = True, created_at: str = None) -> Path:
+        project_dir = output_dir / project_id
+        (project_dir / "Json_output").mkdir(parents=True)
+        (project_dir / "Json_output" / f"journal_{project_id}.json").write_text(json.dumps({"title": project_id}))
+        if with_pdf:
+            (project_dir / "PDF_output").mkdir()
+            (project_dir / "PDF_output" / f"{project_id}.pdf").write_bytes(b"%PDF-1.4 " + project_id.encode())
+        if created_at:
+            manifest = {"version": 1, "title": project_id, "theme": "Testing", "created_at": created_at,
+                        "status": "completed", "stages": {}, "artifacts": {}}
+            (project_dir / "manifest.json").write_text(json.dumps(manifest))
+        return project_dir
+
+    return _make_project
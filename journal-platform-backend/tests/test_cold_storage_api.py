@@ -0,0 +1,56 @@
+"""
+Cold Storage Tests
+Moving inactive projects into compressed bundles
+"""
+
+import os
+from pathlib import Path
+
+from app.services.journal_scanner import JournalScannerService
+from app.services.project_bundle import bundle_path_for
+from app.services.cold_storage import ColdStorageCompactor
+
+
+def backdate(project_dir: Path, days: float = 365):
+    """Make every directory of a project look untouched for days"""
+    stamp = os.stat(project_dir).st_mtime - days * 86400
+    for dirpath, _dirnames, _filenames in os.walk(project_dir):
+        os.utime(dirpath, (stamp, stamp))
+
+
+class TestColdStorage:
+    """Test moving inactive projects into compressed bundles"""
+
+    def test_compactor_moves_inactive_projects(self, scanner: JournalScannerService, output_dir: Path, make_project):
+        """Test completed projects untouched past the cutoff are packed cold"""
+        backdate(make_project("Old_Run"))
+        make_project("New_Run")
+        compactor = ColdStorageCompactor([scanner], inactive_days=30, io_budget_mb_per_s=0)
+
+        assert compactor.compact_once() == ["Old_Run"]
+
+        assert not (output_dir / "Old_Run").exists()
+        assert bundle_path_for(output_dir, "Old_Run").is_file()
+        assert scanner.get_project_by_id("Old_Run")["tier"] == "cold"
+        assert scanner.get_project_by_id("New_Run")["tier"] == "active"
+
+    def test_compactor_skips_incomplete_projects(self, scanner: JournalScannerService, output_dir: Path, make_project):
+        """Test projects without a PDF stay active however old they are"""
+        backdate(make_project("Old_Draft", with_pdf=False))
+        compactor = ColdStorageCompactor([scanner], inactive_days=30, io_budget_mb_per_s=0)
+
+        assert compactor.compact_once() == []
+        assert (output_dir / "Old_Draft").is_dir()
+
+    def test_compactor_skips_project_deleted_while_packing(
+        self, scanner: JournalScannerService, output_dir: Path, make_project
+    ):
+        """Test a project tombstoned mid-pack never gets a bundle"""
+        backdate(make_project("Old_Run"))
+        compactor = ColdStorageCompactor([scanner], inactive_days=30, io_budget_mb_per_s=0)
+        compactor._throttle = lambda nbytes: scanner.tombstone(["Old_Run"])
+
+        assert compactor.compact_once() == []
+
+        assert not bundle_path_for(output_dir, "Old_Run").exists()
+        assert scanner.tombstoned_projects() == ["Old_Run"]
@@ -300,4 +300,38 @@ class TestExportAPI:
         assert data["pagination"]["skip"] == 0
         assert data["pagination"]["limit"] == 5
         assert "has_more" in data["pagination"]
-        assert "total" in data["pagination"]
\ No newline at end of file
+        assert "total" in data["pagination"]
+
+    async def test_epub_export_includes_journal_chapters(
+        self, db_session: AsyncSession, mock_user, test_project, test_export_job
+    ):
+        """Test EPUB export writes the project's journal entries as chapters"""
+        import zipfile
+        from pathlib import Path
+        from app.models.journal import JournalEntry
+        from app.services.export_service import ExportService
+
+        for day in (1, 2):
+            db_session.add(JournalEntry(
+                user_id=mock_user.id,
+                project_id=test_project.id,
+                title=f"Entry {day}",
+                content=f"Reflection for entry {day}",
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            ))
+        await db_session.commit()
+
+        test_export_job.export_format = "epub"
+        await ExportService(db_session)._export_to_epub(test_export_job, test_project)
+
+        assert test_export_job.status == "completed"
+        epub_path = Path(ExportService(db_session).temp_dir) / Path(test_export_job.file_url).name
+        with zipfile.ZipFile(epub_path) as epub:
+            names = epub.namelist()
+            chapters = [name for name in names if name.startswith("OEBPS/text/chapter")]
+            assert len(chapters) == 2
+            first_chapter = epub.read(chapters[0]).decode("utf-8")
+            assert "Entry 1" in first_chapter
+            assert "Reflection for entry 1" in first_chapter
+            assert "Entry 2" in epub.read("OEBPS/nav.xhtml").decode("utf-8")
@@ -0,0 +1,68 @@
+"""
+Journal Library Tests
+SQLite library index and incremental refresh
+"""
+
+import shutil
+
+from app.services.journal_scanner import JournalScannerService
+
+
+class TestLibraryIndex:
+    """Test indexing and incremental refresh of the library"""
+
+    def test_refresh_indexes_new_projects(self, scanner: JournalScannerService, make_project):
+        """Test new project directories are indexed with their files"""
+        make_project("Run_One")
+        make_project("Run_Two", with_pdf=False)
+
+        changes = scanner.refresh(force=True)
+
+        assert sorted(change["project_id"] for change in changes) == ["Run_One", "Run_Two"]
+        assert all(change["event"] == "project_added" for change in changes)
+        assert scanner.get_project_by_id("Run_One")["has_pdfs"] is True
+        assert scanner.get_project_by_id("Run_Two")["has_pdfs"] is False
+        files = scanner.get_project_files("Run_One")
+        assert files["pdfs"] == ["PDF_output/Run_One.pdf"]
+        assert files["data"] == ["Json_output/journal_Run_One.json"]
+
+    def test_unchanged_projects_are_not_rewalked(self, scanner: JournalScannerService, make_project):
+        """Test a refresh with nothing changed reports nothing"""
+        make_project("Run_One")
+        scanner.refresh(force=True)
+
+        assert scanner.refresh(force=True) == []
+
+    def test_refresh_reports_completed_project(self, scanner: JournalScannerService, make_project):
+        """Test a project gaining its PDF is reported as completed"""
+        project_dir = make_project("Run_One", with_pdf=False)
+        scanner.refresh(force=True)
+
+        (project_dir / "PDF_output").mkdir()
+        (project_dir / "PDF_output" / "Run_One.pdf").write_bytes(b"%PDF-1.4")
+        changes = scanner.refresh(force=True)
+
+        assert changes == [{"event": "project_completed", "project_id": "Run_One"}]
+        assert scanner.get_project_by_id("Run_One")["has_pdfs"] is True
+
+    def test_refresh_drops_removed_projects(self, scanner: JournalScannerService, make_project):
+        """Test a removed directory is dropped from the index"""
+        project_dir = make_project("Run_One")
+        scanner.refresh(force=True)
+
+        shutil.rmtree(project_dir)
+        changes = scanner.refresh(force=True)
+
+        assert changes == [{"event": "project_deleted", "project_id": "Run_One"}]
+        assert scanner.get_project_by_id("Run_One") is None
+
+    def test_refresh_project_rewalks_one_project(self, scanner: JournalScannerService, make_project):
+        """Test refresh_project picks up a change without a full refresh"""
+        project_dir = make_project("Run_One")
+        scanner.refresh(force=True)
+
+        (project_dir / "Json_output" / "research_data.json").write_text("[]")
+        changes = scanner.refresh_project("Run_One")
+
+        assert changes == [{"event": "project_updated", "project_id": "Run_One"}]
+        assert len(scanner.get_project_file_list("Run_One")) == 3
@@ -0,0 +1,66 @@
+"""
+Library Paging Tests
+Keyset pagination over the library index
+"""
+
+from pathlib import Path
+
+from app.services.journal_scanner import JournalScannerService
+
+
+class TestLibraryPaging:
+    """Test keyset pagination of the library"""
+
+    def all_pages(self, scanner: JournalScannerService, limit: int):
+        pages, cursor = [], None
+        while True:
+            projects, cursor = scanner.list_projects_page(limit, cursor)
+            pages.append([project["id"] for project in projects])
+            if not cursor:
+                return pages
+
+    def test_pages_cover_library_newest_first(self, scanner: JournalScannerService, make_project):
+        """Test paging returns every project once, newest first"""
+        for day in range(1, 6):
+            make_project(f"Run_{day}", created_at=f"2025-03-0{day}T10:00:00")
+
+        pages = self.all_pages(scanner, 2)
+
+        assert pages == [["Run_5", "Run_4"], ["Run_3", "Run_2"], ["Run_1"]]
+
+    def test_pages_include_file_summaries(self, scanner: JournalScannerService, make_project):
+        """Test each page carries file counts, with file lists only when asked for"""
+        make_project("Run_1", created_at="2025-03-01T10:00:00")
+
+        summary, _ = scanner.list_projects_page(10)
+        detail, _ = scanner.list_projects_page(10, with_files=True)
+
+        assert summary[0]["file_count"] == 3
+        assert summary[0]["pdf_files"] == ["PDF_output/Run_1.pdf"]
+        assert "file_list" not in summary[0]
+        assert len(detail[0]["file_list"]) == 3
+
+    def test_cursor_survives_project_changes(self, scanner: JournalScannerService, output_dir: Path, make_project):
+        """Test projects changing between pages are neither repeated nor skipped"""
+        for name in ("Alpha_Run", "Beta_Run", "Gamma_Run", "Delta_Run"):
+            make_project(name)
+
+        first_page, cursor = scanner.list_projects_page(2)
+        for project in first_page:
+            (output_dir / project["id"] / "Json_output" / "edited.json").write_text("{}")
+            scanner.refresh_project(project["id"])
+        second_page, _ = scanner.list_projects_page(2, cursor)
+
+        seen = [project["id"] for project in first_page + second_page]
+        assert sorted(seen) == ["Alpha_Run", "Beta_Run", "Delta_Run", "Gamma_Run"]
+
+    def test_created_at_is_stable_across_rewalks(self, scanner: JournalScannerService, make_project):
+        """Test a project's created_at does not move when it is re-walked"""
+        project_dir = make_project("Journal_Run_2025-03-20")
+        scanner.refresh(force=True)
+        created_at = scanner.get_project_by_id("Journal_Run_2025-03-20")["created_at"]
+
+        (project_dir / "Json_output" / "edited.json").write_text("{}")
+        scanner.refresh_project("Journal_Run_2025-03-20")
+
+        assert scanner.get_project_by_id("Journal_Run_2025-03-20")["created_at"] == created_at
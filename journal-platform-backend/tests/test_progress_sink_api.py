@@ -0,0 +1,84 @@
+"""
+Progress Sink Tests
+Coalescing of job progress writes
+"""
+
+import pytest
+
+from app.services.progress_sink import ProgressSink
+
+
+@pytest.mark.asyncio
+class TestProgressSink:
+    """Test coalescing of progress writes"""
+
+    async def test_updates_are_coalesced(self):
+        """Test only the latest state per job is written between flushes"""
+        batches = []
+
+        async def writer(batch):
+            batches.append(dict(batch))
+
+        sink = ProgressSink(writer, interval=60)
+        await sink.update("job-1", {"progress": 10})
+        await sink.update("job-1", {"progress": 20})
+        await sink.update("job-2", {"progress": 5})
+        await sink.update("job-1", {"progress": 30})
+
+        assert batches == [{"job-1": {"progress": 10}}]
+
+        await sink.update("job-2", {"progress": 100, "status": "completed"}, terminal=True)
+
+        assert batches[1] == {"job-1": {"progress": 30}, "job-2": {"progress": 100, "status": "completed"}}
+
+    async def test_stop_flushes_trailing_updates(self):
+        """Test updates still buffered at shutdown are written"""
+        batches = []
+
+        async def writer(batch):
+            batches.append(dict(batch))
+
+        sink = ProgressSink(writer, interval=60)
+        await sink.update("job-1", {"progress": 10})
+        await sink.update("job-1", {"progress": 40})
+        await sink.stop()
+
+        assert batches[-1] == {"job-1": {"progress": 40}}
+
+    async def test_failed_terminal_write_is_raised(self):
+        """Test a failed terminal write reaches the caller and is retried"""
+        batches = []
+        failing = [True]
+
+        async def writer(batch):
+            if failing[0]:
+                raise RuntimeError("commit failed")
+            batches.append(dict(batch))
+
+        sink = ProgressSink(writer, interval=60)
+        with pytest.raises(RuntimeError):
+            await sink.update("job-1", {"status": "completed"}, terminal=True)
+
+        failing[0] = False
+        await sink.flush()
+
+        assert batches == [{"job-1": {"status": "completed"}}]
+
+    async def test_failed_periodic_write_is_kept(self):
+        """Test a failed non-terminal write is not raised and does not lose the state"""
+        batches = []
+        failing = [True]
+
+        async def writer(batch):
+            if failing[0]:
+                raise RuntimeError("database is locked")
+            batches.append(dict(batch))
+
+        sink = ProgressSink(writer, interval=60)
+        await sink.update("job-1", {"progress": 10})
+        await sink.update("job-2", {"progress": 50})
+
+        failing[0] = False
+        await sink.flush()
+
+        assert batches == [{"job-1": {"progress": 10}, "job-2": {"progress": 50}}]
@@ -0,0 +1,105 @@
+"""
+Project Bundle Tests
+Single-file project bundles and streaming their artifacts
+"""
+
+import os
+import json
+from contextlib import nullcontext
+from pathlib import Path
+
+from app.services.journal_scanner import JournalScannerService
+from app.services.project_bundle import COLD_CODEC, ProjectBundle, bundle_path_for, pack_directory, unpack_bundle
+
+
+class TestProjectBundles:
+    """Test the single-file project bundle format"""
+
+    def test_pack_and_unpack_round_trip(self, output_dir: Path, make_project):
+        """Test a packed project unpacks to the same files"""
+        project_dir = make_project("Run_One")
+        original = (project_dir / "PDF_output" / "Run_One.pdf").read_bytes()
+
+        bundle_path = pack_directory(project_dir, remove_source=True)
+
+        assert bundle_path == bundle_path_for(output_dir, "Run_One")
+        assert not project_dir.exists()
+        with ProjectBundle(bundle_path) as bundle:
+            assert bundle.read("PDF_output/Run_One.pdf") == original
+            assert bundle.meta("tier") == "packed"
+
+        restored = unpack_bundle(bundle_path)
+        assert (restored / "PDF_output" / "Run_One.pdf").read_bytes() == original
+
+    def test_unpack_returns_project_to_active_tier(self, output_dir: Path, make_project):
+        """Test unpacking with remove_bundle leaves only the restored directory"""
+        bundle_path = pack_directory(make_project("Run_One"), remove_source=True, codec=COLD_CODEC)
+
+        restored = unpack_bundle(bundle_path, remove_bundle=True)
+
+        assert restored == output_dir / "Run_One"
+        assert sorted(os.listdir(output_dir)) == ["Run_One"]
+        assert (restored / "PDF_output" / "Run_One.pdf").read_bytes() == b"%PDF-1.4 Run_One"
+
+    def test_cold_bundle_streams_decompressed(self, make_project):
+        """Test a compressed bundle streams back the original bytes"""
+        project_dir = make_project("Run_One")
+        text = json.dumps([{"insight": "gratitude " * 40, "n": n} for n in range(2000)]).encode()
+        (project_dir / "Json_output" / "research_data.json").write_bytes(text)
+
+        bundle_path = pack_directory(project_dir, codec=COLD_CODEC)
+
+        with ProjectBundle(bundle_path) as bundle:
+            artifact = next(a for a in bundle.list() if a["path"] == "Json_output/research_data.json")
+            assert artifact["stored_size"] < artifact["size"]
+            assert b"".join(bundle.iter_chunks("Json_output/research_data.json", 4096)) == text
+            assert bundle.meta("tier") == "cold"
+
+    def test_large_artifact_streams_in_chunks(self, make_project):
+        """Test an artifact larger than one chunk is written and read back piecewise"""
+        project_dir = make_project("Run_One")
+        payload = os.urandom(3 * 1024 * 1024 + 17)
+        (project_dir / "PDF_output" / "Run_One.pdf").write_bytes(payload)
+
+        bundle_path = pack_directory(project_dir)
+
+        with ProjectBundle(bundle_path) as bundle:
+            chunks = list(bundle.iter_chunks("PDF_output/Run_One.pdf", 1024 * 1024))
+            assert [len(chunk) for chunk in chunks] == [1024 * 1024] * 3 + [17]
+            assert b"".join(chunks) == payload
+
+    def test_packing_can_be_called_off(self, output_dir: Path, make_project):
+        """Test a commit guard yielding False leaves the project as it was"""
+        project_dir = make_project("Run_One")
+
+        result = pack_directory(project_dir, remove_source=True, commit_guard=lambda: nullcontext(False))
+
+        assert result is None
+        assert project_dir.is_dir()
+        assert sorted(os.listdir(output_dir)) == ["Run_One"]
+
+    def test_project_changed_while_packing_is_kept(self, output_dir: Path, make_project):
+        """Test a file written during packing stops the source from being removed"""
+        project_dir = make_project("Run_One")
+        late_file = project_dir / "PDF_output" / "Run_One_cover.pdf"
+
+        result = pack_directory(project_dir, remove_source=True,
+                                throttle=lambda nbytes: late_file.write_bytes(b"%PDF-1.4 cover"))
+
+        assert result is None
+        assert late_file.is_file()
+        assert sorted(os.listdir(output_dir)) == ["Run_One"]
+
+    def test_scanner_serves_packed_projects(self, scanner: JournalScannerService, make_project):
+        """Test a packed project is indexed and its files streamed from the bundle"""
+        project_dir = make_project("Run_One")
+        pack_directory(project_dir, remove_source=True)
+
+        scanner.refresh(force=True)
+
+        project = scanner.get_project_by_id("Run_One")
+        assert project["tier"] == "packed"
+        size, chunks = scanner.open_bundled_file("Run_One", "PDF_output/Run_One.pdf")
+        assert b"".join(chunks) == b"%PDF-1.4 Run_One"
+        assert size == len(b"%PDF-1.4 Run_One")
+        assert scanner.open_bundled_file("Run_One", "PDF_output/missing.pdf") is None
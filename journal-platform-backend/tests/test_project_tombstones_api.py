@@ -0,0 +1,77 @@
+"""
+Project Tombstone Tests
+Hiding deleted projects and reclaiming their files in the background
+"""
+
+import os
+from pathlib import Path
+
+from app.services.journal_scanner import JournalScannerService
+from app.services.project_bundle import bundle_path_for, pack_directory
+from app.services.project_deletion import ProjectDeletionWorker
+
+
+class TestProjectTombstones:
+    """Test deleting projects through index tombstones"""
+
+    def test_tombstone_hides_project(self, scanner: JournalScannerService, output_dir: Path, make_project):
+        """Test a tombstoned project disappears from every lookup at once"""
+        make_project("Run_One")
+        make_project("Run_Two")
+        scanner.refresh(force=True)
+
+        assert scanner.tombstone(["Run_One", "Missing"]) == ["Run_One"]
+
+        assert scanner.get_project_by_id("Run_One") is None
+        assert [project["id"] for project in scanner.scan_projects()] == ["Run_Two"]
+        projects, _ = scanner.list_projects_page(10)
+        assert [project["id"] for project in projects] == ["Run_Two"]
+        assert scanner.tombstoned_projects() == ["Run_One"]
+        assert (output_dir / "Run_One").is_dir()
+
+    def test_tombstoned_bundle_is_not_served(self, scanner: JournalScannerService, output_dir: Path, make_project):
+        """Test files of a tombstoned packed project can no longer be downloaded"""
+        pack_directory(make_project("Run_One"), remove_source=True)
+        scanner.refresh(force=True)
+
+        scanner.tombstone(["Run_One"])
+
+        assert bundle_path_for(output_dir, "Run_One").is_file()
+        assert scanner.open_bundled_file("Run_One", "PDF_output/Run_One.pdf") is None
+
+    def test_tombstoned_project_is_not_reindexed(self, scanner: JournalScannerService, make_project):
+        """Test changes to a tombstoned project's files do not bring it back"""
+        project_dir = make_project("Run_One")
+        scanner.refresh(force=True)
+        scanner.tombstone(["Run_One"])
+
+        (project_dir / "Json_output" / "late.json").write_text("{}")
+        changes = scanner.refresh(force=True)
+
+        assert changes == []
+        assert scanner.get_project_by_id("Run_One") is None
+
+    def test_reclaim_removes_files_and_row(self, scanner: JournalScannerService, output_dir: Path, make_project):
+        """Test the deletion worker removes the files and then the tombstoned row, silently"""
+        make_project("Run_One")
+        scanner.refresh(force=True)
+        scanner.tombstone(["Run_One"])
+        worker = ProjectDeletionWorker([scanner], files_per_second=0)
+
+        worker._reclaim(scanner, "Run_One")
+
+        assert not (output_dir / "Run_One").exists()
+        assert scanner.tombstoned_projects() == []
+        assert scanner.refresh(force=True) == []
+
+    def test_reclaim_removes_directory_and_bundle(self, scanner: JournalScannerService, output_dir: Path, make_project):
+        """Test a project with both a directory and a bundle has both removed"""
+        pack_directory(make_project("Run_One"))
+        scanner.refresh(force=True)
+        scanner.tombstone(["Run_One"])
+        worker = ProjectDeletionWorker([scanner], files_per_second=0)
+
+        worker._reclaim(scanner, "Run_One")
+
+        assert os.listdir(output_dir) == []
+        assert scanner.tombstoned_projects() == []
@@ -0,0 +1,84 @@
+"""
+Unified Store Tests
+SQLite per-record data store behind the unified backend
+"""
+
+import json
+import threading
+import pytest
+from pathlib import Path
+
+from app.services.unified_store import UnifiedStore
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> UnifiedStore:
+    return UnifiedStore(str(tmp_path / "unified_data.sqlite3"))
+
+
+class TestUnifiedStore:
+    """Test the SQLite unified data store"""
+
+    def test_load_includes_default_collections(self, store: UnifiedStore):
+        """Test an empty store loads every collection the backend expects"""
+        assert store.is_empty()
+        assert store.load() == {"users": {}, "projects": {}, "sessions": {}, "ai_jobs": {}}
+
+    def test_upsert_get_and_delete(self, store: UnifiedStore):
+        """Test single records are written, replaced and removed"""
+        store.upsert("users", "1", {"email": "test@example.com", "ai_credits": 3})
+        store.upsert("users", "1", {"email": "test@example.com", "ai_credits": 5})
+
+        assert store.get("users", "1") == {"email": "test@example.com", "ai_credits": 5}
+        assert store.load()["users"] == {"1": {"email": "test@example.com", "ai_credits": 5}}
+
+        store.delete("users", "1")
+        assert store.get("users", "1") is None
+        assert store.is_empty()
+
+    def test_upsert_many(self, store: UnifiedStore):
+        """Test a batch of records lands in one call"""
+        store.upsert_many("ai_jobs", {"job-1": {"progress": 10}, "job-2": {"progress": 20}})
+        store.upsert_many("ai_jobs", {"job-1": {"progress": 50}})
+
+        assert store.load()["ai_jobs"] == {"job-1": {"progress": 50}, "job-2": {"progress": 20}}
+
+    def test_concurrent_credit_deductions_are_not_lost(self, store: UnifiedStore):
+        """Test parallel credit changes all apply"""
+        store.upsert("users", "1", {"email": "test@example.com", "ai_credits": 100})
+
+        threads = [threading.Thread(target=store.add_credits, args=("1", -1)) for _ in range(40)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert store.get("users", "1")["ai_credits"] == 60
+        assert store.add_credits("1", 5) == 65
+
+    def test_add_credits_unknown_user(self, store: UnifiedStore):
+        """Test credit changes for a missing user return None"""
+        assert store.add_credits("missing", -1) is None
+
+    def test_import_legacy_file_once(self, store: UnifiedStore, tmp_path: Path):
+        """Test unified_data.json is imported into an empty store and set aside"""
+        legacy = tmp_path / "unified_data.json"
+        legacy.write_text(json.dumps({"users": {"1": {"ai_credits": 2}}, "projects": {"7": {"title": "Calm"}}}))
+
+        store.import_legacy_file(str(legacy))
+
+        assert store.get("users", "1") == {"ai_credits": 2}
+        assert store.get("projects", "7") == {"title": "Calm"}
+        assert not legacy.exists()
+        assert (tmp_path / "unified_data.json.imported").exists()
+
+    def test_import_legacy_file_skipped_for_populated_store(self, store: UnifiedStore, tmp_path: Path):
+        """Test an existing store is never overwritten by the legacy file"""
+        store.upsert("users", "1", {"ai_credits": 9})
+        legacy = tmp_path / "unified_data.json"
+        legacy.write_text(json.dumps({"users": {"1": {"ai_credits": 2}}}))
+
+        store.import_legacy_file(str(legacy))
+
+        assert store.get("users", "1") == {"ai_credits": 9}
+        assert legacy.exists()
@@ -4,13 +4,14 @@ Unified Backend Server for Journal Craft Crew
 Phase 4: Security Hardened Production Backend
 """
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Depends, Security, status, BackgroundTasks
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Depends, Security, status, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse, HTMLResponse, FileResponse
+from fastapi.responses import JSONResponse, HTMLResponse, FileResponse, StreamingResponse
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import json
+import base64
 import asyncio
 import time
 import uuid
@@ -41,6 +42,13 @@ from crewai_integration import journal_service
 
 # Import journal scanner service
 from app.services.journal_scanner import JournalScannerService
+from app.services.library_watcher import LibraryWatcher
+from app.services.cold_storage import ColdStorageCompactor
+from app.services.unified_store import UnifiedStore
+from app.services.progress_sink import ProgressSink, TERMINAL_STATUSES
+from app.services.project_deletion import ProjectDeletionWorker
+from app.services.journal_similarity_service import SimilarityIndexer, journal_similarity_service
+from app.services.load_governor import load_governor
 
 # Configure logging
 logging.basicConfig(
@@ -58,38 +66,45 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440
 if SECRET_KEY == "your-super-secret-key-change-in-production" or SECRET_KEY.startswith("CHANGE_ME"):
     logger.warning("Using default or placeholder SECRET_KEY. Please set a secure SECRET_KEY in production!")
 
-# File-based data persistence
+# Record-level data persistence; unified_data.json is imported once on first start
 DATA_FILE = "unified_data.json"
+DB_FILE = "unified_data.sqlite3"
+unified_store = UnifiedStore(DB_FILE)
 
 def load_data():
-    """Load data from file"""
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Error loading data: {e}")
-            return {
-                "users": {},
-                "projects": {},
-                "sessions": {},
-                "ai_jobs": {}
-            }
-    return {
-        "users": {},
-        "projects": {},
-        "sessions": {},
-        "ai_jobs": {}
-    }
+    """Load data from the store"""
+    unified_store.import_legacy_file(DATA_FILE)
+    try:
+        return unified_store.load()
+    except Exception as e:
+        logger.error(f"Error loading data: {e}")
+        return {
+            "users": {},
+            "projects": {},
+            "sessions": {},
+            "ai_jobs": {}
+        }
 
-def save_data(data):
-    """Save data to file"""
+def save_record(collection: str, key: str):
+    """Persist one record of data_store"""
     try:
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        logger.info("Data saved successfully")
+        unified_store.upsert(collection, key, data_store[collection][key])
     except Exception as e:
-        logger.error(f"Error saving data: {e}")
+        logger.error(f"Error saving {collection}/{key}: {e}")
+
+def delete_record(collection: str, key: str):
+    """Remove one record of data_store from the store"""
+    try:
+        unified_store.delete(collection, key)
+    except Exception as e:
+        logger.error(f"Error deleting {collection}/{key}: {e}")
+
+async def write_job_progress(jobs: Dict[str, dict]):
+    """Persist a batch of coalesced ai_jobs progress records"""
+    unified_store.upsert_many("ai_jobs", jobs)
+
+# Progress ticks update data_store at once but reach the store at most once per interval
+job_progress_sink = ProgressSink(write_job_progress, interval=float(os.getenv("PROGRESS_FLUSH_INTERVAL", "5")))
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -147,6 +162,7 @@ data_store = load_data()
 
 # Initialize journal scanner service
 journal_scanner = JournalScannerService(llm_output_dir="../LLM_output")
+derived_scanner = JournalScannerService(llm_output_dir="../Projects_Derived", index_path="derived_library_index.sqlite3")
 
 # Security
 security = HTTPBearer()
@@ -268,6 +284,7 @@ class JournalPreferences(BaseModel):
     titleStyle: str = Field(..., description="Title style preference")
     authorStyle: str = Field(..., description="Author writing style")
     researchDepth: str = Field(..., description="Research depth: 'light', 'medium', or 'deep'")
+    workflowType: str = Field("standard", pattern="^(express|standard|comprehensive)$", description="Workflow type: 'express', 'standard', or 'comprehensive'")
 
 class JournalCreationRequest(BaseModel):
     preferences: JournalPreferences
@@ -412,7 +429,7 @@ async def register_user(user_data: UserRegistration):
         }
 
         data_store["users"][user_id] = user
-        save_data(data_store)
+        save_record("users", user_id)
 
         logger.info(f"User registered: {user_data.email}")
 
@@ -488,7 +505,7 @@ async def save_api_key(request: APIKeyRequest, current_user: dict = Depends(get_
         data_store["user_settings"][user_id]["api_provider"] = request.provider
         data_store["user_settings"][user_id]["api_key_updated_at"] = datetime.now().isoformat()
 
-        save_data(data_store)
+        save_record("user_settings", user_id)
 
         return APIKeyResponse(
             success=True,
@@ -617,7 +634,7 @@ async def generate_journal(request: AIGenerationRequest, current_user: dict = De
         }
 
         data_store["ai_jobs"][job_id] = ai_job
-        save_data(data_store)
+        save_record("ai_jobs", job_id)
 
         # Start background task to simulate AI generation
         asyncio.create_task(simulate_ai_generation(job_id))
@@ -716,7 +733,7 @@ async def update_project(project_id: str, settings: CustomizationSettings, curre
     project["updated_at"] = time.time()
 
     data_store["projects"][project_id] = project
-    save_data(data_store)
+    save_record("projects", project_id)
 
     return {
         "success": True,
@@ -736,7 +753,7 @@ async def delete_project(project_id: str, current_user: dict = Depends(get_curre
         raise HTTPException(status_code=403, detail="Access denied")
 
     del data_store["projects"][project_id]
-    save_data(data_store)
+    delete_record("projects", project_id)
 
     return {
         "success": True,
@@ -752,7 +769,7 @@ async def get_journal_library(current_user: dict = Depends(get_current_user)):
     """Get user's completed CrewAI journal projects"""
     try:
         # Scan projects using the journal scanner service
-        projects = journal_scanner.scan_projects()
+        projects = await asyncio.to_thread(journal_scanner.scan_projects)
 
         return {
             "projects": projects,
@@ -765,6 +782,55 @@ async def get_journal_library(current_user: dict = Depends(get_current_user)):
         logger.error(f"Error scanning journal library: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/journals/clusters")
+async def get_journal_clusters(threshold: float = 0.6, current_user: dict = Depends(get_current_user)):
+    """Group library journals with similar content"""
+    try:
+        # Cached until the index changes; the similarity indexer keeps it current in the background
+        clusters = await asyncio.to_thread(journal_similarity_service.clusters, threshold)
+
+        return {
+            "clusters": clusters,
+            "count": len(clusters),
+            "threshold": threshold,
+            "success": True
+        }
+
+    except Exception as e:
+        logger.error(f"Error clustering journal library: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/journals/{project_id}/similar")
+async def get_similar_journals(project_id: str, limit: int = 5, current_user: dict = Depends(get_current_user)):
+    """Get library journals whose content is most similar to a project"""
+    try:
+        matches = journal_similarity_service.similar_to(project_id, limit)
+        if matches is None:
+            # Not indexed yet (e.g. created since the last library event); vectorize just this project
+            if not journal_scanner.get_project_by_id(project_id):
+                raise HTTPException(status_code=404, detail="Project not found")
+            await asyncio.to_thread(journal_similarity_service.sync_project, journal_scanner.llm_output_dir / project_id)
+            matches = journal_similarity_service.similar_to(project_id, limit)
+
+        if matches is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        for match in matches:
+            project = journal_scanner.get_project_by_id(match["project_id"])
+            match["title"] = project["title"] if project else match["project_id"]
+
+        return {
+            "project_id": project_id,
+            "similar": matches,
+            "success": True
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error finding similar journals: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/journals/{project_id}/files")
 async def get_project_files(project_id: str, current_user: dict = Depends(get_current_user)):
     """Get file structure for a specific journal project"""
@@ -813,8 +879,12 @@ async def download_journal_file(project_id: str, file_path: str, current_user: d
         # Get the absolute file path
         full_path = journal_scanner.get_file_path(project_id, file_path)
 
+        # Packed projects are streamed straight out of their bundle
+        bundled = None
         if not full_path or not full_path.exists():
-            raise HTTPException(status_code=404, detail="File not found")
+            bundled = journal_scanner.open_bundled_file(project_id, file_path)
+            if not bundled:
+                raise HTTPException(status_code=404, detail="File not found")
 
         # Determine media type
         if file_path.endswith('.pdf'):
@@ -828,6 +898,17 @@ async def download_journal_file(project_id: str, file_path: str, current_user: d
         else:
             media_type = 'application/octet-stream'
 
+        if bundled:
+            size, chunks = bundled
+            return StreamingResponse(
+                chunks,
+                media_type=media_type,
+                headers={
+                    "Content-Length": str(size),
+                    "Content-Disposition": f'attachment; filename="{os.path.basename(file_path)}"'
+                }
+            )
+
         return FileResponse(
             path=full_path,
             filename=os.path.basename(file_path),
@@ -857,48 +938,90 @@ async def get_project_completion_status(project_id: str, current_user: dict = De
         logger.error(f"Error checking project status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Library listing: summary projection by default, file lists on demand, keyset pages
+LIBRARY_PAGE_SIZE = 50
+LIBRARY_MAX_PAGE_SIZE = 200
+LLM_PROJECT_FIELDS = {
+    "id", "title", "description", "status", "created_at", "updated_at", "theme", "author_style",
+    "tier", "file_count", "source", "progress", "word_count", "has_pdfs", "files"
+}
+
+def encode_library_cursor(cursor: Tuple[str, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(cursor)).encode()).decode().rstrip("=")
+
+def decode_library_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, project_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(created_at), str(project_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def format_llm_project(project: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a scanner project for the frontend; files only when the file list was loaded"""
+    formatted = {
+        "id": project['id'],
+        "title": project['title'],
+        "description": f"Theme: {project['theme']} | Style: {project['author_style']}",
+        "status": project['status'],
+        "created_at": project['created_at'],
+        "updated_at": project['created_at'],
+        "theme": project['theme'],
+        "author_style": project['author_style'],
+        "tier": project['tier'],
+        "file_count": project['file_count'],
+        "source": "LLM_output folder",
+        "progress": 100 if project['status'] == 'completed' else 0,
+        "word_count": "N/A",
+        "has_pdfs": project['pdf_files']
+    }
+    if 'file_list' in project:
+        formatted["files"] = [
+            {
+                "name": os.path.basename(file['path']),
+                "path": file['path'],
+                "type": os.path.splitext(file['path'])[1].lower(),
+                "size": file['size']
+            }
+            for file in project['file_list']
+        ]
+    return formatted
+
 @app.get("/api/library/llm-projects")
-async def get_llm_output_projects():
-    """Scan and return projects from LLM_output folder using JournalScannerService"""
+async def get_llm_output_projects(
+    view: str = Query("summary", pattern="^(summary|detail)$", description="detail adds each project's file list"),
+    limit: int = Query(LIBRARY_PAGE_SIZE, ge=1, le=LIBRARY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="nextCursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return; id is always included")
+):
+    """Page through projects from LLM_output folder using JournalScannerService"""
+    selected = None
+    if fields:
+        selected = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = selected - LLM_PROJECT_FIELDS
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    after = decode_library_cursor(cursor) if cursor else None
+    with_files = view == "detail" or (selected is not None and "files" in selected)
+
     try:
-        # Use the JournalScannerService to scan projects
-        projects = journal_scanner.scan_projects()
+        # One keyset query per page, plus the page's files
+        projects, next_cursor = await asyncio.to_thread(
+            journal_scanner.list_projects_page, limit, after, with_files
+        )
 
         # Format projects for frontend compatibility
         formatted_projects = []
         for project in projects:
-            # Extract files information
-            project_files = journal_scanner.get_project_files(project['id'])
-
-            formatted_project = {
-                "id": project['id'],
-                "title": project['title'],
-                "description": f"Theme: {project['theme']} | Style: {project['author_style']}",
-                "status": project['status'],
-                "created_at": project['created_at'],
-                "updated_at": project['created_at'],
-                "theme": project['theme'],
-                "author_style": project['author_style'],
-                "files": [
-                    {
-                        "name": os.path.basename(file_path),
-                        "path": file_path,
-                        "type": os.path.splitext(file_path)[1].lower(),
-                        "size": os.path.getsize(journal_scanner.get_file_path(project['id'], file_path)) if journal_scanner.get_file_path(project['id'], file_path) and os.path.exists(journal_scanner.get_file_path(project['id'], file_path)) else 0
-                    }
-                    for file_path in project_files.get('all', [])
-                ],
-                "file_count": len(project_files.get('all', [])),
-                "source": "LLM_output folder",
-                "progress": 100 if project['status'] == 'completed' else 0,
-                "word_count": "N/A",
-                "has_pdfs": project_files.get('pdfs', [])
-            }
+            formatted_project = format_llm_project(project)
+            if selected is not None:
+                formatted_project = {key: value for key, value in formatted_project.items()
+                                     if key == "id" or key in selected}
             formatted_projects.append(formatted_project)
 
         return {
             "projects": formatted_projects,
             "count": len(formatted_projects),
+            "nextCursor": encode_library_cursor(next_cursor) if next_cursor else None,
             "source": "LLM_output folder (via JournalScannerService)"
         }
 
@@ -907,9 +1030,23 @@ async def get_llm_output_projects():
         return {
             "projects": [],
             "count": 0,
+            "nextCursor": None,
             "error": str(e)
         }
 
+@app.get("/api/library/llm-projects/{project_id}")
+async def get_llm_output_project(project_id: str):
+    """Detail projection of one LLM_output project, with its file list"""
+    folder_name = project_id[4:] if project_id.startswith("llm_") else project_id
+    project = await asyncio.to_thread(journal_scanner.get_project_by_id, folder_name)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    project['file_list'] = await asyncio.to_thread(journal_scanner.get_project_file_list, folder_name)
+    project['file_count'] = len(project['file_list'])
+    project['pdf_files'] = [file['path'] for file in project['file_list'] if file['category'] == 'pdfs']
+    return {"project": format_llm_project(project)}
+
 @app.delete("/api/library/llm-projects/{project_id}")
 async def delete_llm_output_project(project_id: str):
     """Delete a project from LLM_output folder"""
@@ -920,15 +1057,10 @@ async def delete_llm_output_project(project_id: str):
         else:
             raise HTTPException(status_code=400, detail="Invalid project ID format")
 
-        llm_output_path = os.path.join("..", "LLM_output")
-        folder_path = os.path.join(llm_output_path, folder_name)
-
-        if not os.path.exists(folder_path):
+        # Tombstone by exact indexed ID; the folder is removed in the background
+        if not await project_deletion_worker.delete(journal_scanner, [folder_name]):
             raise HTTPException(status_code=404, detail="Project not found")
-
-        # Delete the entire folder and its contents
-        import shutil
-        shutil.rmtree(folder_path)
+        await announce_deleted_projects(journal_scanner, [folder_name])
 
         logger.info(f"Deleted LLM project folder: {folder_name}")
 
@@ -943,6 +1075,25 @@ async def delete_llm_output_project(project_id: str):
         logger.error(f"Error deleting LLM project: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete project")
 
+class BulkDeleteRequest(BaseModel):
+    projectIds: List[str] = Field(..., min_length=1, max_length=1000, description="LLM project IDs, with or without the llm_ prefix")
+
+@app.post("/api/library/llm-projects/bulk-delete")
+async def bulk_delete_llm_output_projects(request: BulkDeleteRequest):
+    """Delete many LLM_output projects at once; files are removed in the background"""
+    folder_names = {(project_id[4:] if project_id.startswith("llm_") else project_id): project_id
+                    for project_id in request.projectIds}
+    deleted = await project_deletion_worker.delete(journal_scanner, list(folder_names))
+    await announce_deleted_projects(journal_scanner, deleted)
+    logger.info(f"Bulk deleted {len(deleted)} LLM projects")
+
+    return {
+        "message": f"{len(deleted)} projects deleted successfully",
+        "deleted": [folder_names[folder_name] for folder_name in deleted],
+        "notFound": [project_id for folder_name, project_id in folder_names.items() if folder_name not in deleted],
+        "pendingRemoval": project_deletion_worker.pending()
+    }
+
 @app.delete("/api/library/projects/{project_id}")
 async def delete_project_universal(project_id: str):
     """Universal project deletion that handles different ID formats"""
@@ -975,6 +1126,7 @@ async def delete_project_universal(project_id: str):
             # Check if it exists in data_store
             if project_id in data_store.get("journal_projects", {}):
                 del data_store["journal_projects"][project_id]
+                delete_record("journal_projects", project_id)
                 logger.info(f"Deleted journal creation project from data_store: {project_id}")
                 return {
                     "message": "Journal creation project deleted successfully",
@@ -985,29 +1137,22 @@ async def delete_project_universal(project_id: str):
             journal_folder = os.path.join("..", "journal_outputs", project_id)
             if os.path.exists(journal_folder):
                 import shutil
-                shutil.rmtree(journal_folder)
+                await asyncio.to_thread(shutil.rmtree, journal_folder)
                 logger.info(f"Deleted journal creation folder: {project_id}")
                 return {
                     "message": "Journal creation project folder deleted successfully",
                     "project_id": project_id
                 }
 
-        # Strategy 3: Check if it's an LLM project with different format
-        if not project_id.startswith("llm_"):
-            # Try to find it in LLM_output with different naming patterns
-            llm_output_path = os.path.join("..", "LLM_output")
-            if os.path.exists(llm_output_path):
-                for folder_name in os.listdir(llm_output_path):
-                    if project_id in folder_name or folder_name in project_id:
-                        folder_path = os.path.join(llm_output_path, folder_name)
-                        if os.path.isdir(folder_path):
-                            import shutil
-                            shutil.rmtree(folder_path)
-                            logger.info(f"Deleted matching LLM project folder: {folder_name}")
-                            return {
-                                "message": f"LLM project deleted successfully (matched folder: {folder_name})",
-                                "project_id": project_id
-                            }
+        # Strategy 3: Check if it's an LLM project, by its exact indexed ID
+        folder_name = project_id[4:] if project_id.startswith("llm_") else project_id
+        if await project_deletion_worker.delete(journal_scanner, [folder_name]):
+            await announce_deleted_projects(journal_scanner, [folder_name])
+            logger.info(f"Deleted LLM project folder: {folder_name}")
+            return {
+                "message": f"LLM project deleted successfully (matched folder: {folder_name})",
+                "project_id": project_id
+            }
 
         # If we get here, we couldn't find the project
         logger.warning(f"Project not found: {project_id}")
@@ -1038,7 +1183,7 @@ async def simulate_ai_generation(job_id: str):
         if job_id in data_store["ai_jobs"]:
             data_store["ai_jobs"][job_id]["progress"] = progress
             data_store["ai_jobs"][job_id]["current_stage"] = stage
-            save_data(data_store)
+            await job_progress_sink.update(job_id, data_store["ai_jobs"][job_id])
 
             # Send WebSocket update
             progress_data = {
@@ -1053,13 +1198,19 @@ async def simulate_ai_generation(job_id: str):
     # Create completed project
     if job_id in data_store["ai_jobs"]:
         data_store["ai_jobs"][job_id]["status"] = "completed"
+        try:
+            await job_progress_sink.update(job_id, data_store["ai_jobs"][job_id], terminal=True)
+        except Exception as e:
+            # Still held by the sink; the next flush retries it
+            logger.error(f"Could not save completion of job {job_id}: {e}")
 
         # Deduct AI credit from user
         job = data_store["ai_jobs"][job_id]
         user_id = job["user_id"]
         if user_id in data_store["users"]:
-            data_store["users"][user_id]["ai_credits"] -= 1
-            save_data(data_store)
+            credits = unified_store.add_credits(user_id, -1)
+            if credits is not None:
+                data_store["users"][user_id]["ai_credits"] = credits
 
         # Create a mock project
         project_id = f"project_{uuid.uuid4().hex[:12]}"
@@ -1086,7 +1237,7 @@ async def simulate_ai_generation(job_id: str):
         }
 
         data_store["projects"][project_id] = project
-        save_data(data_store)
+        save_record("projects", project_id)
 
         # Send completion notification
         completion_data = {
@@ -1127,6 +1278,18 @@ async def create_journal(request: JournalCreationRequest, current_user: dict = D
                 detail="OpenAI API key not configured. Please add your API key in settings."
             )
 
+        # Admission control: shed or downgrade new runs while the service is saturated
+        preferences = request.preferences.model_dump()
+        admission = load_governor.admit(preferences["workflowType"], preferences["researchDepth"])
+        if not admission["accepted"]:
+            raise HTTPException(
+                status_code=503,
+                detail=admission["reason"],
+                headers={"Retry-After": str(admission["retry_after"])}
+            )
+        preferences["workflowType"] = admission["workflow_type"]
+        preferences["researchDepth"] = admission["research_depth"]
+
         # Create WebSocket progress callback
         async def websocket_progress_callback(progress_update: dict):
             """Send progress updates to WebSocket clients"""
@@ -1137,12 +1300,20 @@ async def create_journal(request: JournalCreationRequest, current_user: dict = D
 
                 # Send message to WebSocket clients for this job
                 await manager.send_progress(job_id, progress_update)
+
+                # Keep the stored job current without a write per update
+                job = data_store["ai_jobs"].get(job_id)
+                if job:
+                    job["status"] = progress_update.get('status', job.get("status"))
+                    job["progress"] = progress_update.get('progress', job.get("progress"))
+                    job["current_stage"] = progress_update.get('current_stage')
+                    await job_progress_sink.update(job_id, job, terminal=job["status"] in TERMINAL_STATUSES)
             except Exception as e:
                 print(f"❌ Error sending WebSocket progress: {e}")
 
         # Start journal creation process with user's API key
         job_id = await journal_service.start_journal_creation(
-            request.preferences.model_dump(),
+            preferences,
             api_key=user_api_key,  # Pass user's API key
             progress_callback=websocket_progress_callback  # Connect to WebSocket
         )
@@ -1153,18 +1324,24 @@ async def create_journal(request: JournalCreationRequest, current_user: dict = D
 
         data_store["ai_jobs"][job_id] = {
             "user_id": user_id,
-            "preferences": request.preferences.model_dump(),
+            "preferences": preferences,
             "status": "started",
             "created_at": datetime.now().isoformat()
         }
-        save_data(data_store)
+        save_record("ai_jobs", job_id)
 
         return {
             "success": True,
             "jobId": job_id,
-            "message": "Journal creation started successfully"
+            "message": "Journal creation started successfully",
+            "workflowType": admission["workflow_type"],
+            "researchDepth": admission["research_depth"],
+            "degraded": admission["degraded"],
+            "degradedReason": admission["reason"]
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating journal: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1266,39 +1443,64 @@ async def download_journal(job_id: str, current_user: dict = Depends(get_current
 @app.post("/api/crewai/start-workflow", response_model=dict)
 async def start_crewai_workflow(
     workflow_request: dict,
-    current_user: dict = Depends(get_current_user),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    current_user: dict = Depends(get_current_user)
 ):
     """Start a new CrewAI workflow for journal creation"""
     try:
         # Import CrewAI workflow service
         from crewai_integration import journal_service
 
-        # Create project record
-        project_id = str(uuid.uuid4())
+        # Clients send the preferences nested or flat, with snake_case or camelCase keys
+        submitted = workflow_request.get("preferences") or workflow_request.get("user_preferences") or workflow_request
+        preferences = {
+            "theme": submitted.get("theme"),
+            "title": submitted.get("title"),
+            "titleStyle": submitted.get("titleStyle", submitted.get("title_style")),
+            "authorStyle": submitted.get("authorStyle", submitted.get("author_style")),
+            "researchDepth": submitted.get("researchDepth", submitted.get("research_depth")),
+            "workflowType": submitted.get("workflowType", submitted.get("workflow_type"))
+            or workflow_request.get("workflow_type", "standard"),
+        }
+        preferences = {key: value for key, value in preferences.items() if value is not None}
 
-        # Log workflow start
-        logger.info(f"🤖 Starting CrewAI workflow for user {current_user['user_id']}, project_id: {project_id}")
-        logger.info(f"📋 Workflow preferences: {workflow_request}")
+        # Admission control: shed or downgrade new runs while the service is saturated
+        admission = load_governor.admit(preferences["workflowType"], preferences.get("researchDepth"))
+        if not admission["accepted"]:
+            raise HTTPException(
+                status_code=503,
+                detail=admission["reason"],
+                headers={"Retry-After": str(admission["retry_after"])}
+            )
+        preferences["workflowType"] = admission["workflow_type"]
+        if admission["research_depth"]:
+            preferences["researchDepth"] = admission["research_depth"]
 
-        # Start workflow in background
-        background_tasks.add_task(
-            journal_service.start_workflow,
-            {
-                "project_id": project_id,
-                "user_id": current_user["user_id"],
-                "preferences": workflow_request
-            }
-        )
+        logger.info(f"🤖 Starting CrewAI workflow for user {current_user['user_id']}")
+        logger.info(f"📋 Workflow preferences: {preferences}")
+
+        # start_journal_creation registers the run with the load governor and releases it when it ends
+        job_id = await journal_service.start_journal_creation(preferences)
+
+        data_store.setdefault("ai_jobs", {})[job_id] = {
+            "user_id": current_user["user_id"],
+            "preferences": preferences,
+            "status": "started",
+            "created_at": datetime.now().isoformat()
+        }
+        save_record("ai_jobs", job_id)
 
         return {
-            "workflow_id": project_id,
+            "workflow_id": job_id,
             "status": "started",
             "message": "CrewAI workflow started successfully",
-            "estimated_duration": validated_request.get("estimated_duration_minutes", 30),
-            "workflow_type": validated_request.get("workflow_type", "standard")
+            "estimated_duration": workflow_request.get("estimated_duration_minutes", 30),
+            "workflow_type": admission["workflow_type"],
+            "degraded": admission["degraded"],
+            "degraded_reason": admission["reason"]
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error starting CrewAI workflow: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1478,6 +1680,7 @@ async def websocket_crewai_progress(websocket: WebSocket, workflow_id: str):
 class WebSocketManager:
     def __init__(self):
         self.active_connections: dict[str, WebSocket] = {}
+        self.library_subscribers: list[WebSocket] = []
 
     async def connect(self, websocket: WebSocket, job_id: str):
         await websocket.accept()
@@ -1496,8 +1699,103 @@ class WebSocketManager:
                 # Remove broken connection
                 self.disconnect(job_id)
 
+    async def subscribe_library(self, websocket: WebSocket):
+        await websocket.accept()
+        self.library_subscribers.append(websocket)
+
+    def unsubscribe_library(self, websocket: WebSocket):
+        if websocket in self.library_subscribers:
+            self.library_subscribers.remove(websocket)
+
+    async def broadcast_library(self, data: dict):
+        message = json.dumps(data)
+        for websocket in list(self.library_subscribers):
+            try:
+                await websocket.send_text(message)
+            except Exception as e:
+                logger.error(f"Error sending library update: {e}")
+                self.unsubscribe_library(websocket)
+
 manager = WebSocketManager()
 
+# Similarity vectors follow library changes in the background instead of re-syncing per request
+similarity_indexer = SimilarityIndexer(
+    journal_similarity_service, journal_scanner.llm_output_dir, skip=journal_scanner.tombstoned_projects
+)
+
+async def publish_library_event(event: dict):
+    """Send a library change to WebSocket subscribers and the similarity indexer"""
+    if event.get("source") == journal_scanner.llm_output_dir.name:
+        similarity_indexer.project_changed(event["project_id"], deleted=event["event"] == "project_deleted")
+    await manager.broadcast_library(event)
+
+# Keep the library indexes current and push changes to subscribers
+library_watcher = LibraryWatcher([journal_scanner, derived_scanner], publish=publish_library_event)
+
+# Pack completed projects untouched for COLD_STORAGE_AFTER_DAYS into compressed bundles (0 disables)
+cold_storage_compactor = ColdStorageCompactor(
+    [journal_scanner, derived_scanner],
+    inactive_days=float(os.getenv("COLD_STORAGE_AFTER_DAYS", "90")),
+    io_budget_mb_per_s=float(os.getenv("COLD_STORAGE_IO_MB_PER_S", "20"))
+)
+
+@app.on_event("startup")
+async def start_library_watcher():
+    await library_watcher.start()
+    await similarity_indexer.start()
+    await cold_storage_compactor.start()
+
+@app.on_event("shutdown")
+async def stop_library_watcher():
+    await cold_storage_compactor.stop()
+    await similarity_indexer.stop()
+    await library_watcher.stop()
+
+# Deleted projects are tombstoned in the index and their files removed in the background
+project_deletion_worker = ProjectDeletionWorker(
+    [journal_scanner, derived_scanner],
+    files_per_second=float(os.getenv("DELETION_FILES_PER_SECOND", "500"))
+)
+
+async def announce_deleted_projects(scanner: JournalScannerService, project_ids: List[str]):
+    """Tell library subscribers about tombstoned projects without waiting for their files to go"""
+    for project_id in project_ids:
+        await publish_library_event({
+            "type": "library_update",
+            "event": "project_deleted",
+            "project_id": project_id,
+            "source": scanner.llm_output_dir.name,
+            "project": None,
+            "timestamp": datetime.now().isoformat()
+        })
+
+@app.on_event("startup")
+async def start_project_deletion_worker():
+    await project_deletion_worker.start()
+
+@app.on_event("shutdown")
+async def stop_project_deletion_worker():
+    await project_deletion_worker.stop()
+
+@app.on_event("startup")
+async def start_progress_sink():
+    await job_progress_sink.start()
+
+@app.on_event("shutdown")
+async def flush_progress_sink():
+    await job_progress_sink.stop()
+
+@app.websocket("/ws/library")
+async def websocket_library_updates(websocket: WebSocket):
+    """WebSocket endpoint streaming project added/updated/completed/deleted events"""
+    await manager.subscribe_library(websocket)
+    try:
+        while True:
+            # Drain client messages so disconnects are noticed
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        manager.unsubscribe_library(websocket)
+
 @app.websocket("/ws/journal/{job_id}")
 async def websocket_journal_progress(websocket: WebSocket, job_id: str):
     """WebSocket endpoint for real-time journal creation progress"""
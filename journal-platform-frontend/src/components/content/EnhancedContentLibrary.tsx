@@ -67,6 +67,8 @@ const EnhancedContentLibrary: React.FC<EnhancedContentLibraryProps> = ({ classNa
   const { token } = useAuth();
 
   const [projects, setProjects] = useState<ProjectWithAnalysis[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [loadingAnalysis, setLoadingAnalysis] = useState(false);
   const [viewMode, setViewMode] = useState<'grid' | 'list'>('grid');
@@ -76,12 +78,42 @@ const EnhancedContentLibrary: React.FC<EnhancedContentLibraryProps> = ({ classNa
   const [selectedProject, setSelectedProject] = useState<ProjectWithAnalysis | null>(null);
   const [showCreateModal, setShowCreateModal] = useState(false);
 
-  // Fetch projects with analysis
-  const fetchProjects = useCallback(async () => {
+  // Attach the AI analysis to one project, leaving it as is when analysis fails
+  const analyzeProject = useCallback(async (project: JournalContent): Promise<ProjectWithAnalysis> => {
     try {
-      setLoading(true);
+      const analysisResponse = await fetch(
+        `${getApiURL()}/api/journal-content/analyze-project/${project.id}`,
+        {
+          headers: {
+            'Authorization': `Bearer ${token}`
+          }
+        }
+      );
+
+      if (analysisResponse.ok) {
+        const analysisData = await analysisResponse.json();
+        return {
+          ...project,
+          analysis: analysisData.analysis
+        };
+      }
+    } catch (error) {
+      console.error(`Failed to analyze project ${project.id}:`, error);
+    }
+    return project;
+  }, [token]);
+
+  // Fetch one page of projects with analysis; without a cursor the list is reloaded from the first page
+  const fetchProjects = useCallback(async (cursor?: string) => {
+    try {
+      if (cursor) {
+        setLoadingMore(true);
+      } else {
+        setLoading(true);
+      }
+      const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
       const response = await fetch(
-        `${getApiURL()}/api/library/llm-projects`,
+        `${getApiURL()}/api/library/llm-projects${params}`,
         {
           headers: {
             'Authorization': `Bearer ${token}`
@@ -91,40 +123,55 @@ const EnhancedContentLibrary: React.FC<EnhancedContentLibraryProps> = ({ classNa
 
       if (response.ok) {
         const data = await response.json();
-        const projectsWithAnalysis = await Promise.all(
-          data.projects.map(async (project: JournalContent) => {
-            try {
-              const analysisResponse = await fetch(
-                `${getApiURL()}/api/journal-content/analyze-project/${project.id}`,
-                {
-                  headers: {
-                    'Authorization': `Bearer ${token}`
-                  }
-                }
-              );
-
-              if (analysisResponse.ok) {
-                const analysisData = await analysisResponse.json();
-                return {
-                  ...project,
-                  analysis: analysisData.analysis
-                };
-              }
-            } catch (error) {
-              console.error(`Failed to analyze project ${project.id}:`, error);
-            }
-            return project;
-          })
-        );
-
-        setProjects(projectsWithAnalysis);
+        const projectsWithAnalysis = await Promise.all(data.projects.map(analyzeProject));
+
+        setProjects(prev => cursor ? [...prev, ...projectsWithAnalysis] : projectsWithAnalysis);
+        setNextCursor(data.nextCursor ?? null);
       }
     } catch (error) {
       console.error('Error fetching projects:', error);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
-  }, [token]);
+  }, [token, analyzeProject]);
+
+  // Re-read a single project after a library event and patch it into the loaded pages in place,
+  // so one finished run does not reload (and re-analyze) the whole library
+  const refreshProject = useCallback(async (projectId: string, added: boolean) => {
+    try {
+      const response = await fetch(
+        `${getApiURL()}/api/library/llm-projects/${encodeURIComponent(projectId)}`,
+        {
+          headers: {
+            'Authorization': `Bearer ${token}`
+          }
+        }
+      );
+
+      if (response.status === 404) {
+        setProjects(prev => prev.filter(project => String(project.id) !== projectId));
+        return;
+      }
+      if (!response.ok) return;
+
+      const data = await response.json();
+      const updated = await analyzeProject(data.project);
+      setProjects(prev => {
+        const index = prev.findIndex(project => String(project.id) === projectId);
+        if (index === -1) {
+          // New projects are the newest, so they belong at the top of the first page;
+          // anything else missing here sits on a page that has not been loaded yet
+          return added ? [updated, ...prev] : prev;
+        }
+        const next = [...prev];
+        next[index] = updated;
+        return next;
+      });
+    } catch (error) {
+      console.error(`Error refreshing project ${projectId}:`, error);
+    }
+  }, [token, analyzeProject]);
 
   // Refresh analysis for all projects
   const refreshAnalysis = useCallback(async () => {
@@ -137,6 +184,37 @@ const EnhancedContentLibrary: React.FC<EnhancedContentLibraryProps> = ({ classNa
     fetchProjects();
   }, [fetchProjects]);
 
+  // Live library updates pushed by the backend's library watcher
+  useEffect(() => {
+    const apiURL = getApiURL();
+    const wsUrl = `${apiURL.replace('http://', 'ws://').replace('https://', 'wss://')}/ws/library`;
+    const ws = new WebSocket(wsUrl);
+
+    ws.onmessage = (event) => {
+      try {
+        const update = JSON.parse(event.data);
+        // This view lists LLM_output projects only; derived runs are indexed separately
+        if (update.type !== 'library_update' || update.source !== 'LLM_output') return;
+
+        if (update.event === 'project_deleted') {
+          setProjects(prev => prev.filter(project => String(project.id) !== update.project_id));
+        } else {
+          refreshProject(update.project_id, update.event === 'project_added');
+        }
+      } catch (error) {
+        console.error('Error parsing library update:', error);
+      }
+    };
+
+    ws.onerror = (error) => {
+      console.error('Library WebSocket error:', error);
+    };
+
+    return () => {
+      ws.close();
+    };
+  }, [refreshProject]);
+
   // Filter and sort projects
   const filteredProjects = projects.filter(project => {
     const matchesSearch = project.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
@@ -424,6 +502,18 @@ const EnhancedContentLibrary: React.FC<EnhancedContentLibraryProps> = ({ classNa
             ))}
           </div>
         )}
+
+        {nextCursor && !loading && (
+          <div className="flex justify-center mt-8">
+            <Button
+              variant="outline"
+              onClick={() => fetchProjects(nextCursor)}
+              disabled={loadingMore}
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </Button>
+          </div>
+        )}
       </div>
     </div>
   );
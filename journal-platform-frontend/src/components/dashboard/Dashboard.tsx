@@ -28,6 +28,9 @@ import JournalProgress from '@/components/journal/JournalProgress';
 import ContentLibrary from '@/components/content/ContentLibrary';
 import UnifiedJournalCreator from '@/components/journal/UnifiedJournalCreator';
 
+// The dashboard only summarizes projects, so it asks for a sparse projection without file lists
+const DASHBOARD_PROJECT_FIELDS = ['title', 'description', 'status', 'progress', 'created_at', 'word_count'];
+
 interface DashboardProps {
   user?: {
     name: string;
@@ -81,7 +84,7 @@ const Dashboard: React.FC<DashboardProps> = ({ user }) => {
     // Fetch LLM projects when component mounts
     const fetchLLMProjects = async () => {
       try {
-        const response = await projectAPI.getLLMProjects();
+        const response = await projectAPI.getLLMProjects({ limit: 200, fields: DASHBOARD_PROJECT_FIELDS });
         if (response.projects && response.projects.length > 0) {
           const formattedProjects = response.projects
             .filter((project: any) => !orphanedProjectIds.has(project.id))
@@ -214,7 +217,7 @@ const Dashboard: React.FC<DashboardProps> = ({ user }) => {
     // Refresh the recent projects list instead of full reload
     const fetchLLMProjects = async () => {
       try {
-        const response = await projectAPI.getLLMProjects();
+        const response = await projectAPI.getLLMProjects({ limit: 200, fields: DASHBOARD_PROJECT_FIELDS });
         if (response.projects && response.projects.length > 0) {
           const formattedProjects = response.projects
             .filter((project: any) => !orphanedProjectIds.has(project.id))
@@ -180,9 +180,9 @@ const CrewAIProjectDetail: React.FC<CrewAIProjectDetailProps> = ({
       try {
         const token = localStorage.getItem('access_token');
 
-        // First try to get project from the library API
+        // Get the project's detail projection, including its file list
         const libraryResponse = await fetch(
-          `${getApiURL()}/api/library/llm-projects`,
+          `${getApiURL()}/api/library/llm-projects/${encodeURIComponent(projectId)}`,
           {
             headers: {
               'Authorization': `Bearer ${token}`,
@@ -191,11 +191,9 @@ const CrewAIProjectDetail: React.FC<CrewAIProjectDetailProps> = ({
           }
         );
 
-        if (libraryResponse.ok) {
+        if (libraryResponse.ok || libraryResponse.status === 404) {
           const libraryData = await libraryResponse.json();
-          const projectData = libraryData.projects?.find((p: any) =>
-            p.id === projectId || p.project_id === projectId
-          );
+          const projectData = libraryResponse.ok ? libraryData.project : null;
 
           if (projectData) {
             // Transform the project data to our format
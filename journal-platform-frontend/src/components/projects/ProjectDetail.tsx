@@ -64,30 +64,26 @@ const ProjectDetail: React.FC = () => {
         throw new Error('Authentication required')
       }
 
-      // Get project files from the same endpoint that ContentLibrary uses
-      console.log('Fetching files from:', `/api/library/llm-projects`)
-      const libraryResponse = await fetch(`/api/library/llm-projects`, {
+      // Get this project's detail projection, including its file list
+      console.log('Fetching files from:', `/api/library/llm-projects/${projectId}`)
+      const libraryResponse = await fetch(`/api/library/llm-projects/${encodeURIComponent(projectId)}`, {
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json'
         }
       })
 
+      if (libraryResponse.status === 404) {
+        throw new Error('Project not found in library')
+      }
       if (!libraryResponse.ok) {
         throw new Error('Failed to load project files')
       }
 
       const libraryData = await libraryResponse.json()
-      console.log('Library data received:', libraryData)
-
-      // Find the specific project from the library data
-      const projectData = libraryData.projects?.find(p => p.id === projectId)
+      const projectData = libraryData.project
       console.log('Found project data:', projectData)
 
-      if (!projectData) {
-        throw new Error('Project not found in library')
-      }
-
       // Organize files by sections
       const allFiles = projectData.files || []
       const sections = {
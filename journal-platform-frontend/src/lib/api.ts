@@ -153,8 +153,22 @@ class UnifiedBackendAPI implements APIClient {
     return this.delete<{ success: boolean; message: string }>(`/api/library/projects/${projectId}`);
   }
 
-  async getLLMProjects(): Promise<{ projects: any[]; count: number; source?: string; message?: string; error?: string }> {
-    return this.get<{ projects: any[]; count: number; source?: string; message?: string; error?: string }>('/api/library/llm-projects');
+  async getLLMProjects(
+    query: { view?: 'summary' | 'detail'; limit?: number; cursor?: string | null; fields?: string[] } = {}
+  ): Promise<{ projects: any[]; count: number; nextCursor?: string | null; source?: string; message?: string; error?: string }> {
+    const params = new URLSearchParams();
+    if (query.view) params.set('view', query.view);
+    if (query.limit) params.set('limit', String(query.limit));
+    if (query.cursor) params.set('cursor', query.cursor);
+    if (query.fields?.length) params.set('fields', query.fields.join(','));
+    const search = params.toString();
+    return this.get<{ projects: any[]; count: number; nextCursor?: string | null; source?: string; message?: string; error?: string }>(
+      `/api/library/llm-projects${search ? `?${search}` : ''}`
+    );
+  }
+
+  async getLLMProject(projectId: string): Promise<{ project: any }> {
+    return this.get<{ project: any }>(`/api/library/llm-projects/${projectId}`);
   }
 
   // Journal Library Methods
@@ -259,7 +273,7 @@ export const projectAPI = {
   getProject: (projectId: string) => apiClient.getProject(projectId),
   updateProject: (projectId: string, settings: CustomizationSettings) => apiClient.updateProject(projectId, settings),
   deleteProject: (projectId: string) => apiClient.deleteProject(projectId),
-  getLLMProjects: () => apiClient.getLLMProjects(),
+  getLLMProjects: (query?: Parameters<typeof apiClient.getLLMProjects>[0]) => apiClient.getLLMProjects(query),
 };
 
 export const journalAPI = {
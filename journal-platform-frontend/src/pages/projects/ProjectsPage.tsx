@@ -17,12 +17,15 @@ interface Project {
 const ProjectsPage: React.FC = () => {
   const [projects, setProjects] = useState<Project[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const loadProjects = async () => {
       try {
         const response = await projectAPI.getLLMProjects();
         setProjects(response.projects || []);
+        setNextCursor(response.nextCursor ?? null);
       } catch (error) {
         console.error('Failed to load projects:', error);
       } finally {
@@ -33,6 +36,20 @@ const ProjectsPage: React.FC = () => {
     loadProjects();
   }, []);
 
+  const loadMoreProjects = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await projectAPI.getLLMProjects({ cursor: nextCursor });
+      setProjects(prev => [...prev, ...(response.projects || [])]);
+      setNextCursor(response.nextCursor ?? null);
+    } catch (error) {
+      console.error('Failed to load more projects:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   return (
     <div className="min-h-screen gradient-bg">
       <div className="section-container py-8">
@@ -131,6 +148,14 @@ const ProjectsPage: React.FC = () => {
             ))}
           </div>
         )}
+
+        {nextCursor && !loading && (
+          <div className="flex justify-center mt-8">
+            <Button variant="outline" onClick={loadMoreProjects} disabled={loadingMore}>
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </Button>
+          </div>
+        )}
       </div>
     </div>
   );
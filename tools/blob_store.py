@@ -0,0 +1,177 @@
+import hashlib
+import os
+import shutil
+import stat
+import threading
+from typing import Dict, Optional, Tuple
+from utils import log_debug
+
+_HASH_CHUNK = 1024 * 1024
+SKIPPED_FILES = {"manifest.json"}
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class BlobStore:
+    """Content-addressed store shared by every run under an output root.
+
+    Each distinct file content is kept once, as <store_dir>/<sha[:2]>/<sha>, and
+    run directories hold hardlinks to it, so fonts, placeholder media, branding
+    images and JSON copied into edited_* files cost their bytes once. The sha256
+    recorded for each artifact in a run's manifest.json is its blob key. The
+    link count of a blob is its reference count: deleting a run drops its
+    references, and gc() removes blobs nothing links to any more. Blobs are made
+    read-only; writers must replace rather than truncate files in a run
+    (remove, then write) so a run never modifies content shared with another.
+    The store must live on the same filesystem as the runs; where it cannot
+    link, a file is left as a private copy.
+    """
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.store_dir, digest[:2], digest)
+
+    def refcount(self, digest: str) -> int:
+        """Number of run files referencing a blob (0 when it is not stored)."""
+        try:
+            return os.stat(self._blob_path(digest)).st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def ingest(self, path: str) -> Tuple[Optional[str], int]:
+        """Move one file's content into the store and link it back into place.
+
+        Returns the blob digest (None when the file could not be linked) and the
+        number of bytes freed because the content was already stored.
+        """
+        try:
+            digest = _file_digest(path)
+            blob_path = self._blob_path(digest)
+            with self._lock:
+                for _ in range(2):
+                    try:
+                        blob_stat = os.stat(blob_path)
+                    except FileNotFoundError:
+                        try:
+                            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                            os.link(path, blob_path)
+                            os.chmod(blob_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                            return digest, 0
+                        except FileExistsError:
+                            continue  # stored by another process in the meantime
+                    file_stat = os.stat(path)
+                    if file_stat.st_ino == blob_stat.st_ino and file_stat.st_dev == blob_stat.st_dev:
+                        return digest, 0
+                    # Hidden like utils.atomic_path, so the library watcher and ingest_run skip it
+                    directory, name = os.path.split(path)
+                    tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    try:
+                        os.link(blob_path, tmp_path)
+                    except FileNotFoundError:
+                        continue  # collected by gc in the meantime
+                    os.replace(tmp_path, path)
+                    return digest, file_stat.st_size if file_stat.st_nlink == 1 else 0
+        except OSError as e:
+            log_debug(f"Could not store {path} as a blob: {e}")
+        return None, 0
+
+    def ingest_run(self, run_dir: str) -> Dict[str, int]:
+        """Ingest every artifact of a run; hidden directories and manifest.json are left alone."""
+        files = 0
+        freed = 0
+        for root, dirs, filenames in os.walk(run_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for filename in filenames:
+                if filename in SKIPPED_FILES or filename.startswith("."):
+                    continue
+                digest, saved = self.ingest(os.path.join(root, filename))
+                if digest:
+                    files += 1
+                    freed += saved
+        log_debug(f"Stored {files} artifacts of {run_dir} as blobs, {freed} bytes deduplicated")
+        return {"files": files, "bytes_freed": freed}
+
+    def clone_run(self, source_dir: str, dest_dir: str) -> str:
+        """Duplicate a run by linking its blobs into dest_dir; no artifact bytes are copied.
+
+        The source is ingested first (already-stored files are skipped after a
+        hash), then each file is a single link(2) call. The manifest is copied,
+        since it is rewritten as stages run.
+        """
+        self.ingest_run(source_dir)
+        for root, dirs, filenames in os.walk(source_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            target_root = os.path.join(dest_dir, os.path.relpath(root, source_dir))
+            os.makedirs(target_root, exist_ok=True)
+            for filename in filenames:
+                source = os.path.join(root, filename)
+                target = os.path.join(target_root, filename)
+                if filename in SKIPPED_FILES:
+                    shutil.copy2(source, target)
+                    continue
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copy2(source, target)
+        log_debug(f"Cloned {source_dir} to {dest_dir}")
+        return dest_dir
+
+    def gc(self) -> Dict[str, int]:
+        """Remove blobs no run links to any more."""
+        removed = 0
+        freed = 0
+        with self._lock:
+            for shard in os.listdir(self.store_dir):
+                shard_dir = os.path.join(self.store_dir, shard)
+                if not os.path.isdir(shard_dir):
+                    continue
+                for name in os.listdir(shard_dir):
+                    blob_path = os.path.join(shard_dir, name)
+                    try:
+                        blob_stat = os.stat(blob_path)
+                        if blob_stat.st_nlink > 1:
+                            continue
+                        os.remove(blob_path)
+                    except FileNotFoundError:
+                        continue
+                    removed += 1
+                    freed += blob_stat.st_size
+                if not os.listdir(shard_dir):
+                    os.rmdir(shard_dir)
+        log_debug(f"Blob store gc removed {removed} unreferenced blobs ({freed} bytes)")
+        return {"blobs_removed": removed, "bytes_freed": freed}
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from config.settings import BLOB_STORE_DIR
+
+    parser = argparse.ArgumentParser(description="Content-addressed artifact store")
+    parser.add_argument("--store", default=BLOB_STORE_DIR)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = subparsers.add_parser("ingest", help="Store the artifacts of existing runs as blobs")
+    ingest_parser.add_argument("run_dirs", nargs="+")
+    clone_parser = subparsers.add_parser("clone", help="Duplicate a run without copying its artifacts")
+    clone_parser.add_argument("source")
+    clone_parser.add_argument("dest")
+    subparsers.add_parser("gc", help="Remove blobs no run references")
+    args = parser.parse_args()
+
+    store = BlobStore(args.store)
+    if args.command == "ingest":
+        for run_dir in args.run_dirs:
+            print(run_dir, json.dumps(store.ingest_run(run_dir)))
+    elif args.command == "clone":
+        print(store.clone_run(args.source, args.dest))
+    else:
+        print(json.dumps(store.gc()))
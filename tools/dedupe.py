@@ -0,0 +1,63 @@
+import random
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD = re.compile(r"[a-z0-9']+")
+
+def shingles(text: str, size: int = 3) -> set:
+    """Hashed word n-grams of text; short texts fall back to their individual words."""
+    words = _WORD.findall(str(text).lower())
+    if len(words) < size:
+        return {zlib.crc32(word.encode("utf-8")) for word in words}
+    return {zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)}
+
+class MinHasher:
+    """MinHash signatures whose agreement estimates the Jaccard similarity of shingle sets."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+
+    def signature(self, shingle_set: Iterable[int]) -> Optional[List[int]]:
+        shingle_set = list(shingle_set)
+        if not shingle_set:
+            return None
+        return [min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in shingle_set) for a, b in self.params]
+
+    @staticmethod
+    def similarity(left: Sequence[int], right: Sequence[int]) -> float:
+        return sum(1 for x, y in zip(left, right) if x == y) / len(left)
+
+def find_near_duplicates(days: List[dict], fields: Sequence[str] = ("pre_writeup", "prompt"), threshold: float = 0.5,
+                         reference_days: Optional[List[dict]] = None, reference_name: str = "reference") -> List[Dict]:
+    """Flag days whose text nearly repeats an earlier day or a day in reference_days.
+
+    The first occurrence is kept, so only the later day of each pair is flagged.
+    Returns dicts with 'day', 'field', 'duplicate_of' ({'source', 'day'}) and 'similarity'.
+    """
+    hasher = MinHasher()
+    flagged = []
+    for field in fields:
+        seen = []
+        for day in reference_days or []:
+            signature = hasher.signature(shingles(day.get(field, "")))
+            if signature:
+                seen.append((reference_name, day.get("day"), signature))
+        for day in days:
+            signature = hasher.signature(shingles(day.get(field, "")))
+            if not signature:
+                continue
+            best = None
+            for source, day_num, other in seen:
+                score = hasher.similarity(signature, other)
+                if score >= threshold and (best is None or score > best["similarity"]):
+                    best = {"day": day.get("day"), "field": field,
+                            "duplicate_of": {"source": source, "day": day_num}, "similarity": round(score, 3)}
+            if best:
+                flagged.append(best)
+            else:
+                seen.append(("self", day.get("day"), signature))
+    return flagged
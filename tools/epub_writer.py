@@ -0,0 +1,231 @@
+import os
+import uuid
+import zipfile
+from datetime import datetime, timezone
+from html import escape
+from typing import Dict, Iterable, List, Optional
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+
+CONTAINER_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>
+"""
+
+STYLESHEET = """body { font-family: serif; line-height: 1.5; margin: 1em; }
+h1, h2 { text-align: center; }
+p.centered { text-align: center; }
+figure { text-align: center; margin: 1em 0; }
+figure img { max-width: 100%; }
+.lines { border-bottom: 1px solid #999; height: 1.5em; }
+"""
+
+def _image_media_type(path: str) -> Optional[str]:
+    """Sniff the image type from the file header; placeholders written as text return None."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(8)
+    except OSError:
+        return None
+    if header.startswith(PNG_SIGNATURE):
+        return "image/png"
+    if header.startswith(JPEG_SIGNATURE):
+        return "image/jpeg"
+    return None
+
+class EpubWriter:
+    """Stream an EPUB 3 package to disk one chapter at a time.
+
+    Chapters are compressed into the zip container as soon as they are added and
+    media files are copied from disk in chunks, so only the manifest entries are
+    kept in memory regardless of book length. Uses the standard library only so
+    the web backend can import it as well as the agents.
+    """
+
+    def __init__(self, output_path: str, title: str, author: str = "Journal Craft Crew", language: str = "en",
+                 identifier: str = None):
+        self.output_path = output_path
+        self.title = title
+        self.author = author
+        self.language = language
+        self.identifier = identifier or f"urn:uuid:{uuid.uuid4()}"
+        self._manifest: List[Dict[str, str]] = []
+        self._spine: List[str] = []
+        self._toc: List[Dict[str, str]] = []
+        self._media: Dict[str, str] = {}
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        # Built beside the target and moved over it on close, so an EPUB linked from the
+        # blob store is replaced rather than rewritten and readers never see a partial file
+        self._tmp_path = os.path.join(output_dir, f".{os.path.basename(output_path)}.{os.getpid()}.tmp")
+        self._zip = zipfile.ZipFile(self._tmp_path, "w", compression=zipfile.ZIP_DEFLATED)
+        # The mimetype entry must come first and be stored uncompressed
+        self._zip.writestr(zipfile.ZipInfo("mimetype"), "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+        self._zip.writestr("META-INF/container.xml", CONTAINER_XML)
+        self._zip.writestr("OEBPS/styles.css", STYLESHEET)
+        self._manifest.append({"id": "css", "href": "styles.css", "media-type": "text/css"})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._zip.close()
+            os.remove(self._tmp_path)
+        return False
+
+    def add_media(self, source_path: str, media_id: str = None) -> Optional[str]:
+        """Copy an image into the package by reference and return its href, or None if unusable."""
+        if source_path in self._media:
+            return self._media[source_path]
+        if not source_path or not os.path.isfile(source_path):
+            return None
+        media_type = _image_media_type(source_path)
+        if not media_type:
+            return None
+        media_id = media_id or f"img{len(self._media) + 1}"
+        extension = ".png" if media_type == "image/png" else ".jpg"
+        href = f"images/{media_id}{extension}"
+        # ZipFile.write copies the file in fixed-size chunks instead of reading it whole
+        self._zip.write(source_path, f"OEBPS/{href}", compress_type=zipfile.ZIP_STORED)
+        self._manifest.append({"id": media_id, "href": href, "media-type": media_type})
+        self._media[source_path] = href
+        return href
+
+    def add_chapter(self, chapter_id: str, title: str, body_html: str, in_toc: bool = True):
+        """Write one XHTML chapter into the container immediately."""
+        href = f"text/{chapter_id}.xhtml"
+        document = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<!DOCTYPE html>\n'
+            '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops" '
+            f'lang="{self.language}" xml:lang="{self.language}">\n'
+            f"<head><title>{escape(title)}</title>"
+            '<link rel="stylesheet" type="text/css" href="../styles.css"/></head>\n'
+            f"<body>\n{body_html}\n</body>\n</html>\n"
+        )
+        self._zip.writestr(f"OEBPS/{href}", document)
+        self._manifest.append({"id": chapter_id, "href": href, "media-type": "application/xhtml+xml"})
+        self._spine.append(chapter_id)
+        if in_toc:
+            self._toc.append({"href": href, "title": title})
+
+    def close(self):
+        """Write the navigation document and package file, then finalize the zip."""
+        nav_items = "\n".join(
+            f'      <li><a href="{entry["href"]}">{escape(entry["title"])}</a></li>' for entry in self._toc
+        )
+        nav = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<!DOCTYPE html>\n'
+            '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">\n'
+            "<head><title>Contents</title></head>\n"
+            '<body>\n  <nav epub:type="toc" id="toc">\n    <h1>Contents</h1>\n    <ol>\n'
+            f"{nav_items}\n    </ol>\n  </nav>\n</body>\n</html>\n"
+        )
+        self._zip.writestr("OEBPS/nav.xhtml", nav)
+
+        manifest_items = ['    <item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>']
+        for item in self._manifest:
+            manifest_items.append(
+                f'    <item id="{item["id"]}" href="{item["href"]}" media-type="{item["media-type"]}"/>'
+            )
+        spine_items = "\n".join(f'    <itemref idref="{chapter_id}"/>' for chapter_id in self._spine)
+        modified = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        opf = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="bookid">\n'
+            '  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">\n'
+            f'    <dc:identifier id="bookid">{escape(self.identifier)}</dc:identifier>\n'
+            f"    <dc:title>{escape(self.title)}</dc:title>\n"
+            f"    <dc:creator>{escape(self.author)}</dc:creator>\n"
+            f"    <dc:language>{self.language}</dc:language>\n"
+            f'    <meta property="dcterms:modified">{modified}</meta>\n'
+            "  </metadata>\n"
+            "  <manifest>\n" + "\n".join(manifest_items) + "\n  </manifest>\n"
+            f"  <spine>\n{spine_items}\n  </spine>\n"
+            "</package>\n"
+        )
+        self._zip.writestr("OEBPS/content.opf", opf)
+        self._zip.close()
+        os.replace(self._tmp_path, self.output_path)
+
+def _paragraphs(text: str) -> str:
+    """Render plain text as centered XHTML paragraphs."""
+    if not text:
+        return ""
+    blocks = [block.strip() for block in str(text).split("\n\n") if block.strip()]
+    return "\n".join(f'<p class="centered">{escape(block)}</p>' for block in blocks)
+
+def _figure(writer: EpubWriter, media_dir: Optional[str], image_id: str) -> str:
+    """Embed an image from media_dir if present, otherwise emit the same caption the PDF uses."""
+    if not image_id:
+        return ""
+    href = writer.add_media(os.path.join(media_dir, f"{image_id}.png")) if media_dir else None
+    if href:
+        return f'<figure><img src="../{href}" alt="{escape(image_id)}"/></figure>'
+    return f'<p class="centered">[Image: {escape(image_id)}]</p>'
+
+def iter_journal_chapters(content: dict) -> Iterable[tuple]:
+    """Yield (chapter_id, title, sections) in the same order as the PDF layout."""
+    intro = content.get("intro_spread", {})
+    if intro.get("left", {}).get("quote"):
+        yield "welcome", "Welcome", [("text", intro["left"]["quote"])]
+    if intro.get("right", {}).get("writeup"):
+        yield "introduction", intro["right"].get("title") or "Introduction", [("text", intro["right"]["writeup"])]
+    commitment = content.get("commitment_page", {})
+    if commitment.get("writeup"):
+        yield "commitment", "My Commitment", [
+            ("text", commitment["writeup"]),
+            ("text", "Signature: ______________________________"),
+        ]
+    for day in content.get("days", []):
+        day_num = day.get("day")
+        yield f"day{day_num}", f"Day {day_num}", [
+            ("image", day.get("image_full_page")),
+            ("text", day.get("pre_writeup", "")),
+            ("image", day.get("image_bottom")),
+            ("heading", "Prompt"),
+            ("text", day.get("prompt", "")),
+            ("lines", day.get("lines", 25)),
+        ]
+    for index, chapter in enumerate(content.get("chapters", []), 1):
+        yield f"chapter{index}", chapter.get("title") or f"Chapter {index}", [("text", chapter.get("text", ""))]
+    certificate = content.get("certificate", {})
+    if certificate:
+        yield "certificate", "Congratulations", [
+            ("text", certificate.get("summary", "")),
+            ("text", certificate.get("text", "")),
+        ]
+
+def write_journal_epub(content: dict, output_path: str, media_dir: str = None,
+                       author: str = "Journal Craft Crew") -> str:
+    """Stream a journal or lead magnet JSON structure into an EPUB 3 file."""
+    title = content.get("cover", {}).get("title") or os.path.splitext(os.path.basename(output_path))[0]
+    with EpubWriter(output_path, title=title, author=author) as writer:
+        cover_image = _figure(writer, media_dir, content.get("cover", {}).get("image", ""))
+        writer.add_chapter("cover", title, f"<h1>{escape(title)}</h1>\n{cover_image}", in_toc=False)
+        for chapter_id, chapter_title, sections in iter_journal_chapters(content):
+            body = [f"<h1>{escape(str(chapter_title))}</h1>"]
+            for kind, value in sections:
+                if kind == "text":
+                    body.append(_paragraphs(value))
+                elif kind == "heading":
+                    body.append(f"<h2>{escape(value)}</h2>")
+                elif kind == "image":
+                    body.append(_figure(writer, media_dir, value))
+                elif kind == "lines":
+                    try:
+                        line_count = min(int(value), 40)
+                    except (TypeError, ValueError):
+                        line_count = 25
+                    body.append("\n".join('<div class="lines"></div>' for _ in range(line_count)))
+            writer.add_chapter(chapter_id, str(chapter_title), "\n".join(part for part in body if part))
+    return output_path
@@ -0,0 +1,512 @@
+import glob
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+INDEX_VERSION = 1
+POSTING = struct.Struct("<II")  # (doc_id, term frequency)
+MAX_SEGMENTS = 8
+PASSAGE_CHARS = 1200
+SYNC_CHECK_INTERVAL = 10.0  # seconds between corpus freshness checks of an open index
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+    "that", "the", "this", "to", "was", "with", "you", "your",
+}
+
+# Pipeline artifacts worth indexing inside run directories
+RUN_ARTIFACT_PATTERNS = (
+    "research_output_*.txt", "research_data_*.json",
+    "30day_journal_*.json", "lead_magnet_*.json",
+    "edited_30day_journal_*.json", "edited_lead_magnet_*.json",
+)
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(str(text).lower()) if token not in _STOPWORDS]
+
+def _strip_fences(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```json") and text.endswith("```"):
+        return text[7:-3].strip()
+    if text.startswith("```") and text.endswith("```"):
+        return text[3:-3].strip()
+    return text
+
+def _text_passages(title: str, text: str) -> List[dict]:
+    """Group paragraphs into passages of roughly PASSAGE_CHARS characters."""
+    passages = []
+    buffer = ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if buffer and len(buffer) + len(paragraph) > PASSAGE_CHARS:
+            passages.append({"title": title, "content": buffer})
+            buffer = ""
+        buffer = f"{buffer}\n\n{paragraph}" if buffer else paragraph
+    if buffer:
+        passages.append({"title": title, "content": buffer})
+    return passages
+
+def _insight_passages(title: str, insights) -> List[dict]:
+    if isinstance(insights, dict):
+        insights = insights.get("insights", list(insights.values()))
+    if not isinstance(insights, list):
+        return []
+    return [
+        {"title": str(item.get("technique") or title), "content": str(item.get("description", ""))}
+        for item in insights if isinstance(item, dict) and item.get("description")
+    ]
+
+def _journal_passages(title: str, journal: dict) -> List[dict]:
+    passages = []
+    intro = journal.get("intro_spread", {}).get("right", {})
+    if intro.get("writeup"):
+        passages.append({"title": f"{title} - Introduction", "content": intro["writeup"]})
+    for day in journal.get("days", []):
+        if isinstance(day, dict):
+            content = " ".join(str(day.get(key, "")) for key in ("pre_writeup", "prompt") if day.get(key))
+            if content:
+                passages.append({"title": f"{title} - Day {day.get('day')}", "content": content})
+    return passages
+
+def _flatten_strings(value) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [text for item in value.values() for text in _flatten_strings(item)]
+    if isinstance(value, list):
+        return [text for item in value for text in _flatten_strings(item)]
+    return []
+
+def passages_for_file(path: str) -> List[dict]:
+    """Split a knowledge file or pipeline artifact into searchable passages."""
+    name = os.path.basename(path)
+    title = os.path.splitext(name)[0]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = f.read()
+    except (OSError, UnicodeDecodeError):
+        return []
+    if name.startswith("research_output_"):
+        try:
+            return _insight_passages(title, json.loads(_strip_fences(raw)))
+        except json.JSONDecodeError:
+            return _text_passages(title, raw)
+    if name.endswith(".json"):
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            return []
+        if name.startswith("research_data_"):
+            return _insight_passages(data.get("theme", title), data.get("research"))
+        if isinstance(data, dict) and "days" in data:
+            return _journal_passages(data.get("cover", {}).get("title") or title, data)
+        return _text_passages(title, "\n\n".join(_flatten_strings(data)))
+    return _text_passages(title, raw)
+
+def iter_corpus_files(knowledge_dirs: Iterable[str] = (), run_roots: Iterable[str] = ()) -> Iterable[str]:
+    """Yield knowledge files and the research/journal artifacts of past runs."""
+    for directory in knowledge_dirs:
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for name in sorted(files):
+                if name.endswith((".txt", ".md", ".json")):
+                    yield os.path.join(root, name)
+    for root_dir in run_roots:
+        if not os.path.isdir(root_dir):
+            continue
+        for pattern in RUN_ARTIFACT_PATTERNS:
+            for path in sorted(glob.glob(os.path.join(root_dir, "*", "*", pattern))):
+                directory, name = os.path.split(path)
+                # Index the edited copy of a document instead of its draft
+                if not name.startswith("edited_") and os.path.exists(os.path.join(directory, f"edited_{name}")):
+                    continue
+                yield path
+
+def corpus_stamp(knowledge_dirs: Iterable[str] = (), run_roots: Iterable[str] = ()) -> tuple:
+    """Cheap change marker for the corpus: (latest directory mtime, directory count).
+
+    Only directories are stat'ed: every knowledge directory, and each run root
+    down to its run directories. Writers replace files rather than rewrite them
+    in place, so any new, changed or removed artifact moves its directory's mtime.
+    """
+    latest = 0
+    count = 0
+    for directory in knowledge_dirs:
+        for root, dirs, _ in os.walk(directory):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            latest = max(latest, os.stat(root).st_mtime_ns)
+            count += 1
+    for root_dir in run_roots:
+        if not os.path.isdir(root_dir):
+            continue
+        for path in [root_dir] + glob.glob(os.path.join(root_dir, "*")) + glob.glob(os.path.join(root_dir, "*", "*")):
+            try:
+                latest = max(latest, os.stat(path).st_mtime_ns)
+            except FileNotFoundError:
+                continue
+            count += 1
+    return latest, count
+
+class KnowledgeIndex:
+    """Offline BM25 index with memory-mapped postings and incremental adds.
+
+    Each add writes an immutable segment: a term dictionary (term -> offset,
+    count) kept in memory and a postings file of packed (doc_id, tf) records
+    that is memory-mapped, so queries only touch the postings of their terms.
+    Passages are appended to docs.jsonl and read back by offset for the hits.
+    Segments are merged once there are more than MAX_SEGMENTS of them, which
+    also drops deleted passages from docs.jsonl. The pipeline and the web
+    backend share one index directory, so writers take an exclusive flock on
+    its lock file and reload the metadata before allocating ids, and readers
+    reload whenever meta.json has been replaced by another process. Within a
+    process, reads and writes are serialized per instance. Standard library
+    only so the web backend can open the same index.
+    """
+
+    def __init__(self, index_dir: str, k1: float = 1.2, b: float = 0.75):
+        self.index_dir = index_dir
+        self.k1 = k1
+        self.b = b
+        os.makedirs(index_dir, exist_ok=True)
+        self._meta_path = os.path.join(index_dir, "meta.json")
+        self._docs_path = os.path.join(index_dir, "docs.jsonl")
+        self._segments: List[dict] = []
+        self._doc_offsets: Dict[int, int] = {}
+        self._doc_lengths: Dict[int, int] = {}
+        self._docs_file = None
+        self._lock = threading.RLock()
+        self._lock_path = os.path.join(index_dir, ".lock")
+        self._write_depth = 0
+        self._meta_stamp = None
+        with self._file_lock(shared=True):
+            self._load()
+
+    # Locking
+
+    @contextmanager
+    def _file_lock(self, shared: bool = False):
+        """flock the index directory's lock file; a no-op where fcntl is unavailable."""
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _writing(self):
+        """Hold the index for writing across threads and processes, starting from the latest metadata."""
+        with self._lock:
+            if self._write_depth:
+                # Nested write (sync -> add_documents -> compact) already holds the flock
+                self._write_depth += 1
+                try:
+                    yield
+                finally:
+                    self._write_depth -= 1
+                return
+            with self._file_lock():
+                self._write_depth = 1
+                try:
+                    self._reload_if_changed()
+                    yield
+                finally:
+                    self._write_depth = 0
+
+    def _stat_meta(self):
+        try:
+            stat = os.stat(self._meta_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _reload_if_changed(self):
+        """Reload when another process has replaced meta.json since this instance last read or wrote it."""
+        if self._stat_meta() != self._meta_stamp:
+            self._load()
+
+    def _refresh_for_read(self):
+        if self._write_depth == 0 and self._stat_meta() != self._meta_stamp:
+            with self._file_lock(shared=True):
+                self._load()
+
+    # Loading
+
+    def _load(self):
+        self.close()
+        self._meta_stamp = self._stat_meta()
+        try:
+            with open(self._meta_path, "r") as f:
+                self.meta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.meta = {}
+        if self.meta.get("version") != INDEX_VERSION:
+            self.meta = {"version": INDEX_VERSION, "segments": [], "next_doc_id": 0, "sources": {}, "deleted": []}
+        self._deleted = set(self.meta["deleted"])
+
+        self._doc_offsets.clear()
+        self._doc_lengths.clear()
+        if os.path.exists(self._docs_path):
+            with open(self._docs_path, "rb") as f:
+                offset = 0
+                for line in f:
+                    record = json.loads(line)
+                    # Lines past next_doc_id belong to an add that never committed its metadata
+                    if record["id"] < self.meta["next_doc_id"]:
+                        self._doc_offsets[record["id"]] = offset
+                        self._doc_lengths[record["id"]] = record["length"]
+                    offset += len(line)
+            self._docs_file = open(self._docs_path, "rb")
+        # Ids dropped from docs.jsonl by a compaction that did not get to save its metadata
+        self._deleted.intersection_update(self._doc_lengths)
+        # Indexes written before the running total was kept get it computed once
+        if "total_length" not in self.meta:
+            self.meta["total_length"] = sum(self._doc_lengths.values())
+
+        for name in self.meta["segments"]:
+            with open(os.path.join(self.index_dir, f"{name}.terms.json"), "r") as f:
+                terms = json.load(f)
+            postings_file = open(os.path.join(self.index_dir, f"{name}.postings"), "rb")
+            postings = mmap.mmap(postings_file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(postings_file.name) else None
+            self._segments.append({"name": name, "terms": terms, "file": postings_file, "postings": postings})
+
+    def close(self):
+        for segment in self._segments:
+            if segment["postings"] is not None:
+                segment["postings"].close()
+            segment["file"].close()
+        self._segments = []
+        if self._docs_file:
+            self._docs_file.close()
+            self._docs_file = None
+
+    def _save_meta(self):
+        self.meta["deleted"] = sorted(self._deleted)
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self._meta_path)
+        self._meta_stamp = self._stat_meta()
+
+    @property
+    def doc_count(self) -> int:
+        return len(self._doc_lengths) - len(self._deleted)
+
+    # Writing
+
+    def _write_segment(self, name: str, postings_by_term: Dict[str, List[tuple]]):
+        terms = {}
+        tmp_postings = os.path.join(self.index_dir, f"{name}.postings.tmp")
+        with open(tmp_postings, "wb") as f:
+            offset = 0
+            for term in sorted(postings_by_term):
+                entries = postings_by_term[term]
+                f.write(b"".join(POSTING.pack(doc_id, tf) for doc_id, tf in entries))
+                terms[term] = [offset, len(entries)]
+                offset += len(entries)
+        tmp_terms = os.path.join(self.index_dir, f"{name}.terms.json.tmp")
+        with open(tmp_terms, "w") as f:
+            json.dump(terms, f)
+        os.replace(tmp_postings, os.path.join(self.index_dir, f"{name}.postings"))
+        os.replace(tmp_terms, os.path.join(self.index_dir, f"{name}.terms.json"))
+
+    def add_documents(self, documents: Iterable[dict], source: str = None) -> List[int]:
+        """Index passages ({'title', 'content'}) as a new segment and return their ids."""
+        with self._writing():
+            postings_by_term: Dict[str, List[tuple]] = {}
+            doc_ids = []
+            total_length = 0
+            next_id = self.meta["next_doc_id"]
+            with open(self._docs_path, "ab") as docs:
+                for document in documents:
+                    tokens = tokenize(f"{document.get('title', '')} {document.get('content', '')}")
+                    if not tokens:
+                        continue
+                    record = {"id": next_id, "title": document.get("title", ""), "content": document.get("content", ""),
+                              "source": document.get("source", source), "length": len(tokens)}
+                    docs.write((json.dumps(record) + "\n").encode("utf-8"))
+                    for term, tf in Counter(tokens).items():
+                        postings_by_term.setdefault(term, []).append((next_id, tf))
+                    doc_ids.append(next_id)
+                    total_length += len(tokens)
+                    next_id += 1
+            if not doc_ids:
+                return []
+
+            name = f"seg_{self.meta['next_doc_id']:08d}"
+            self._write_segment(name, postings_by_term)
+            self.meta["segments"].append(name)
+            self.meta["next_doc_id"] = next_id
+            self.meta["total_length"] += total_length
+            self._save_meta()
+            self._load()
+            if len(self.meta["segments"]) > MAX_SEGMENTS:
+                self.compact()
+            return doc_ids
+
+    def delete_documents(self, doc_ids: Iterable[int]):
+        with self._writing():
+            self._deleted.update(doc_ids)
+            self._save_meta()
+
+    def compact(self):
+        """Merge all segments into one and drop deleted passages."""
+        with self._writing():
+            postings_by_term: Dict[str, List[tuple]] = {}
+            for segment in self._segments:
+                for term, (offset, count) in segment["terms"].items():
+                    for doc_id, tf in self._read_postings(segment, offset, count):
+                        if doc_id not in self._deleted:
+                            postings_by_term.setdefault(term, []).append((doc_id, tf))
+            old_segments = list(self.meta["segments"])
+            name = f"seg_{self.meta['next_doc_id']:08d}_merged"
+            self._write_segment(name, postings_by_term)
+            self.meta["segments"] = [name]
+            self._save_meta()
+
+            # Rewrite docs.jsonl without the deleted passages; surviving ids keep their numbers
+            tmp_docs = f"{self._docs_path}.tmp"
+            with open(tmp_docs, "wb") as docs:
+                for doc_id in sorted(self._doc_offsets):
+                    if doc_id not in self._deleted:
+                        self._docs_file.seek(self._doc_offsets[doc_id])
+                        docs.write(self._docs_file.readline())
+            self.close()
+            os.replace(tmp_docs, self._docs_path)
+            self.meta["total_length"] = sum(length for doc_id, length in self._doc_lengths.items()
+                                            if doc_id not in self._deleted)
+            self._deleted.clear()
+            self._save_meta()
+            for old in old_segments:
+                if old != name:
+                    for suffix in (".postings", ".terms.json"):
+                        try:
+                            os.remove(os.path.join(self.index_dir, f"{old}{suffix}"))
+                        except FileNotFoundError:
+                            pass
+            self._load()
+
+    def sync(self, knowledge_dirs: Iterable[str] = (), run_roots: Iterable[str] = ()) -> Dict[str, int]:
+        """Bring the index up to date with the corpus, re-indexing only new or changed files."""
+        with self._writing():
+            sources = self.meta["sources"]
+            seen = set()
+            removed = 0
+            pending: List[dict] = []
+            pending_sources: Dict[str, int] = {}
+            for path in iter_corpus_files(knowledge_dirs, run_roots):
+                key = os.path.abspath(path)
+                seen.add(key)
+                mtime_ns = os.stat(path).st_mtime_ns
+                if key in sources and sources[key]["mtime_ns"] == mtime_ns:
+                    continue
+                if key in sources:
+                    self._deleted.update(sources[key]["doc_ids"])
+                    removed += len(sources[key]["doc_ids"])
+                passages = passages_for_file(path)
+                for passage in passages:
+                    passage["source"] = key
+                pending.extend(passages)
+                pending_sources[key] = mtime_ns
+            for key in [key for key in sources if key not in seen]:
+                stale_ids = sources.pop(key)["doc_ids"]
+                self._deleted.update(stale_ids)
+                removed += len(stale_ids)
+
+            doc_ids = self.add_documents(pending) if pending else []
+            # add_documents assigns ids in order, so map them back to their source files
+            by_source: Dict[str, List[int]] = {key: [] for key in pending_sources}
+            for doc_id in doc_ids:
+                by_source[self._read_doc(doc_id)["source"]].append(doc_id)
+            for key, mtime_ns in pending_sources.items():
+                sources[key] = {"mtime_ns": mtime_ns, "doc_ids": by_source[key]}
+            # add_documents reloads meta from disk, so reattach the updated source map
+            self.meta["sources"] = sources
+            self._save_meta()
+            return {"added": len(doc_ids), "removed": removed, "documents": self.doc_count}
+
+    # Reading
+
+    def _read_postings(self, segment: dict, offset: int, count: int):
+        if segment["postings"] is None:
+            return []
+        start = offset * POSTING.size
+        return POSTING.iter_unpack(segment["postings"][start:start + count * POSTING.size])
+
+    def _read_doc(self, doc_id: int) -> dict:
+        self._docs_file.seek(self._doc_offsets[doc_id])
+        return json.loads(self._docs_file.readline())
+
+    def search(self, query: str, top_k: int = 5) -> List[dict]:
+        """Return the top_k passages for query ranked by BM25."""
+        with self._lock:
+            self._refresh_for_read()
+            live_docs = self.doc_count
+            if not live_docs:
+                return []
+            avg_length = self.meta["total_length"] / max(len(self._doc_lengths), 1) or 1.0
+            scores: Dict[int, float] = {}
+            for term in set(tokenize(query)):
+                hits = []
+                for segment in self._segments:
+                    entry = segment["terms"].get(term)
+                    if entry:
+                        hits.extend(self._read_postings(segment, *entry))
+                if not hits:
+                    continue
+                idf = math.log(1 + (live_docs - len(hits) + 0.5) / (len(hits) + 0.5))
+                for doc_id, tf in hits:
+                    if doc_id in self._deleted:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            results = []
+            for doc_id, score in heapq.nlargest(top_k, scores.items(), key=lambda item: item[1]):
+                document = self._read_doc(doc_id)
+                results.append({"id": doc_id, "title": document["title"], "content": document["content"],
+                                "source": document["source"], "score": round(score, 4)})
+            return results
+
+_indexes: Dict[str, dict] = {}
+_indexes_lock = threading.Lock()
+
+def open_knowledge_index(index_dir: str, knowledge_dirs: Iterable[str] = (), run_roots: Iterable[str] = (),
+                         sync: bool = True) -> KnowledgeIndex:
+    """Return the process-wide index for index_dir, re-syncing it whenever the corpus has changed.
+
+    Long-lived processes call this per search: the corpus is checked at most every
+    SYNC_CHECK_INTERVAL seconds, and only a changed corpus_stamp triggers a sync.
+    """
+    key = os.path.abspath(index_dir)
+    with _indexes_lock:
+        entry = _indexes.get(key)
+        if entry is None:
+            entry = _indexes[key] = {"index": KnowledgeIndex(index_dir), "stamp": None, "checked": 0.0}
+        if sync and time.monotonic() - entry["checked"] >= SYNC_CHECK_INTERVAL:
+            entry["checked"] = time.monotonic()
+            stamp = corpus_stamp(knowledge_dirs, run_roots)
+            if stamp != entry["stamp"]:
+                entry["index"].sync(knowledge_dirs, run_roots)
+                entry["stamp"] = stamp
+    return entry["index"]
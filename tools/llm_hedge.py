@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+from config.settings import LLM_HEDGING_ENABLED, LLM_HEDGE_MIN_DELAY_S, LLM_HEDGE_BUDGET_PER_MINUTE
+
+class LLMHedger:
+    """Sends a duplicate LLM request when the first one runs unusually long.
+
+    The first response to arrive wins. The other request is abandoned: its
+    result is ignored, but an HTTP call already in flight cannot be stopped,
+    so every hedge costs one extra request. A rolling per-minute budget caps
+    that cost and report() says what was spent.
+    """
+
+    def __init__(self, budget_per_minute: int = 4, min_delay_s: float = 5.0, max_workers: int = 8):
+        self.budget_per_minute = budget_per_minute
+        self.min_delay_s = min_delay_s
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self.stats = {"calls": 0, "hedges_sent": 0, "hedge_wins": 0, "budget_denied": 0, "extra_input_tokens": 0}
+
+    def delay_for(self, percentile_latency: Optional[float]) -> Optional[float]:
+        """Seconds to wait before hedging, or None when there is no latency history yet."""
+        if percentile_latency is None:
+            return None
+        return max(self.min_delay_s, percentile_latency)
+
+    def _take_budget(self) -> bool:
+        now = time.time()
+        with self._lock:
+            while self._recent and now - self._recent[0] >= 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.budget_per_minute:
+                self.stats["budget_denied"] += 1
+                return False
+            self._recent.append(now)
+            self.stats["hedges_sent"] += 1
+            return True
+
+    def call(self, fn: Callable[[], str], delay_s: float, timeout_s: float, prompt_tokens: int = 0,
+             timeout_exception=TimeoutError) -> str:
+        """Run fn, hedging it with a second fn() after delay_s; raise timeout_exception after timeout_s."""
+        started = time.time()
+        with self._lock:
+            self.stats["calls"] += 1
+        primary = self._executor.submit(fn)
+        done, _ = wait([primary], timeout=delay_s)
+        if done or not self._take_budget():
+            remaining = max(0.0, timeout_s - (time.time() - started))
+            done, _ = wait([primary], timeout=remaining)
+            if not done:
+                raise timeout_exception(f"LLM call exceeded {timeout_s}s")
+            return primary.result()
+
+        with self._lock:
+            self.stats["extra_input_tokens"] += prompt_tokens
+        hedge = self._executor.submit(fn)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            remaining = timeout_s - (time.time() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                if future is hedge:
+                    with self._lock:
+                        self.stats["hedge_wins"] += 1
+                return future.result()
+        if error is not None and not pending:
+            raise error
+        raise timeout_exception(f"LLM call exceeded {timeout_s}s")
+
+    def report(self) -> dict:
+        with self._lock:
+            return dict(self.stats)
+
+_hedger = None
+
+def get_llm_hedger() -> Optional[LLMHedger]:
+    """Process-wide hedger built from settings, or None when hedging is disabled."""
+    global _hedger
+    if not LLM_HEDGING_ENABLED:
+        return None
+    if _hedger is None:
+        _hedger = LLMHedger(LLM_HEDGE_BUDGET_PER_MINUTE, LLM_HEDGE_MIN_DELAY_S)
+    return _hedger
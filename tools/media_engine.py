@@ -0,0 +1,149 @@
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+from tools.media_store import MediaStore
+from tools.stage_gate import check_stage
+from utils import atomic_output, log_debug
+
+MANIFEST_FILENAME = ".media_manifest.json"
+
+def prompt_hash(prompt: str, provider: str) -> str:
+    """Stable hash identifying the prompt an image was generated from."""
+    return hashlib.sha256(f"{provider}\n{prompt}".encode("utf-8")).hexdigest()[:16]
+
+class RateLimiter:
+    """Spaces calls to one provider at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second and rate_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+class MediaEngine:
+    """Run image generation calls concurrently and resume interrupted runs.
+
+    Up to `concurrency` provider calls are in flight at once, each provider is
+    throttled by its own rate limit, and a manifest in the media directory records
+    the prompt hash and latency of every finished image. Images whose file exists
+    with a matching prompt hash are skipped on the next run. With a MediaStore,
+    images already generated for another project are linked in instead of
+    calling the provider, and new images are added to the store. generate_fn must
+    replace its output file (utils.atomic_output) rather than write into it, since
+    the existing file may be linked from the store.
+    """
+
+    def __init__(self, media_dir: str, generate_fn: Callable[[dict, str], None], concurrency: int = 4,
+                 rate_limits: Optional[Dict[str, float]] = None, default_provider: str = "media_llm",
+                 store: Optional[MediaStore] = None, generation_params: Optional[dict] = None):
+        self.media_dir = media_dir
+        self.generate_fn = generate_fn
+        self.concurrency = max(1, concurrency)
+        self.default_provider = default_provider
+        self.store = store
+        self.generation_params = generation_params or {}
+        self._limiters = {name: RateLimiter(rate) for name, rate in (rate_limits or {}).items()}
+        self._manifest_path = os.path.join(media_dir, MANIFEST_FILENAME)
+        self._manifest_lock = threading.Lock()
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        try:
+            with open(self._manifest_path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _record(self, image_id: str, entry: dict):
+        # Written after every image so an interrupted run keeps its progress
+        with self._manifest_lock:
+            self.manifest[image_id] = entry
+            with atomic_output(self._manifest_path) as f:
+                json.dump(self.manifest, f, indent=2)
+
+    def _limiter(self, provider: str) -> RateLimiter:
+        if provider not in self._limiters:
+            self._limiters[provider] = RateLimiter(0)
+        return self._limiters[provider]
+
+    def is_current(self, image_id: str, digest: str) -> bool:
+        entry = self.manifest.get(image_id)
+        output_path = os.path.join(self.media_dir, f"{image_id}.png")
+        return (bool(entry) and entry.get("status") == "generated" and entry.get("prompt_hash") == digest
+                and os.path.exists(output_path))
+
+    def _generate_one(self, req: dict, provider: str, digest: str) -> tuple:
+        # An abandoned media stage stops before its next provider call
+        check_stage()
+        image_id = req["image_id"]
+        output_path = os.path.join(self.media_dir, f"{image_id}.png")
+        started = time.perf_counter()
+        store_key = None
+        if self.store:
+            store_key = self.store.key(req.get("prompt", ""), {"provider": provider, **self.generation_params})
+        if store_key and self.store.fetch(store_key, output_path):
+            outcome, status = "reused", "generated"
+        else:
+            self._limiter(provider).acquire()
+            started = time.perf_counter()
+            try:
+                self.generate_fn(req, output_path)
+                outcome = status = "generated"
+                if store_key:
+                    self.store.put(store_key, output_path)
+            except Exception as e:
+                log_debug(f"Failed to generate image for {image_id}: {e}")
+                outcome = status = "failed"
+        entry = {"prompt_hash": digest, "provider": provider, "status": status,
+                 "latency_s": round(time.perf_counter() - started, 3)}
+        self._record(image_id, entry)
+        return outcome, entry
+
+    def run(self, requirements: List[dict]) -> Dict[str, List[str]]:
+        """Generate every missing or stale image and return image ids grouped by outcome."""
+        results = {"generated": [], "reused": [], "skipped": [], "failed": []}
+        pending = []
+        for req in requirements:
+            provider = req.get("provider", self.default_provider)
+            digest = prompt_hash(req.get("prompt", ""), provider)
+            if self.is_current(req["image_id"], digest):
+                results["skipped"].append(req["image_id"])
+            else:
+                pending.append((req, provider, digest))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            # Each worker runs in a copy of the caller's context so it sees the stage's gate
+            futures = {}
+            for req, provider, digest in pending:
+                future = executor.submit(contextvars.copy_context().run, self._generate_one, req, provider, digest)
+                futures[future] = req["image_id"]
+            for future in as_completed(futures):
+                image_id = futures[future]
+                outcome, entry = future.result()
+                results[outcome].append(image_id)
+                log_debug(f"Image {image_id} {outcome} in {entry['latency_s']}s")
+        if self.store:
+            self.store.flush()
+
+        log_debug(
+            f"Media engine: {len(results['generated'])} generated, {len(results['reused'])} reused from store, "
+            f"{len(results['skipped'])} skipped, "
+            f"{len(results['failed'])} failed in {time.perf_counter() - started:.2f}s "
+            f"(concurrency {self.concurrency})"
+        )
+        return results
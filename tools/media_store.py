@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from utils import atomic_path, log_debug
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+INDEX_FILENAME = "index.json"
+INDEX_SAVE_INTERVAL = 30.0  # seconds between persisting LRU timestamps updated by cache hits
+
+def normalize_prompt(prompt: str) -> str:
+    """Case- and whitespace-insensitive form of a prompt used for cache keys."""
+    return " ".join(str(prompt).lower().split())
+
+def _link_or_copy(source: str, dest: str):
+    """Hardlink source to dest, copying when the two paths are on different filesystems."""
+    with atomic_path(dest) as tmp_path:
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copy2(source, tmp_path)
+
+class MediaStore:
+    """Global store of generated images shared by every project.
+
+    Images are keyed by the normalized prompt plus the generation parameters, so
+    the same branding or day image requested by two journals is generated once.
+    Projects receive a hardlink to the stored file; writers must replace rather
+    than truncate media files (remove, then write) so a project never modifies
+    the shared copy. Least recently used entries are evicted once the store
+    exceeds its disk quota. Cache hits only touch the in-memory LRU timestamps;
+    they reach index.json at most every INDEX_SAVE_INTERVAL seconds, whenever the
+    store is added to or evicted from, and on flush(). Several processes may share
+    one store: each save merges with index.json under a file lock, so entries
+    added by another run are kept rather than overwritten.
+    """
+
+    def __init__(self, store_dir: str, quota_bytes: int):
+        self.store_dir = store_dir
+        self.quota_bytes = quota_bytes
+        self._index_path = os.path.join(store_dir, INDEX_FILENAME)
+        self._lock_path = os.path.join(store_dir, ".lock")
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+        with self._file_lock():
+            self._index = self._load_index()
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def _load_index(self) -> Dict[str, dict]:
+        try:
+            with open(self._index_path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @contextmanager
+    def _file_lock(self):
+        """flock the store's lock file; a no-op where fcntl is unavailable."""
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _save_index(self, evict: bool = False):
+        """Merge this process's entries into index.json, optionally evict, and write it back."""
+        with self._file_lock():
+            merged = self._load_index()
+            for key, entry in self._index.items():
+                current = merged.get(key)
+                if current is not None:
+                    current["last_used"] = max(current["last_used"], entry["last_used"])
+                elif os.path.exists(self._blob_path(key)):
+                    # Added here since the last save; a missing blob means another run evicted it
+                    merged[key] = entry
+            self._index = merged
+            if evict:
+                self._evict()
+            tmp_path = f"{self._index_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._index, f, indent=2)
+            os.replace(tmp_path, self._index_path)
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def key(self, prompt: str, params: Optional[dict] = None) -> str:
+        payload = json.dumps({"prompt": normalize_prompt(prompt), "params": params or {}}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _blob_path(self, key: str) -> str:
+        return os.path.join(self.store_dir, key[:2], f"{key}.png")
+
+    def fetch(self, key: str, dest: str) -> bool:
+        """Link a stored image into dest; returns False on a cache miss."""
+        with self._lock:
+            entry = self._index.get(key)
+            blob_path = self._blob_path(key)
+            if not os.path.exists(blob_path):
+                return False
+            if not entry:
+                # Stored by another process since this index was loaded
+                entry = self._index[key] = {"size": os.path.getsize(blob_path), "last_used": 0.0}
+            try:
+                _link_or_copy(blob_path, dest)
+            except FileNotFoundError:
+                return False  # evicted by another process in the meantime
+            entry["last_used"] = time.time()
+            self._dirty = True
+            if time.monotonic() - self._last_save >= INDEX_SAVE_INTERVAL:
+                self._save_index()
+        log_debug(f"Reused stored image {key[:12]} for {dest}")
+        return True
+
+    def put(self, key: str, source: str):
+        """Add a freshly generated image to the store and evict to stay within quota."""
+        with self._lock:
+            if key in self._index and os.path.exists(self._blob_path(key)):
+                return
+            blob_path = self._blob_path(key)
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            _link_or_copy(source, blob_path)
+            self._index[key] = {"size": os.path.getsize(blob_path), "last_used": time.time()}
+            self._save_index(evict=True)
+
+    def flush(self):
+        """Persist LRU timestamps updated by cache hits since the last save."""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._index.values())
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.quota_bytes:
+                break
+            try:
+                os.remove(self._blob_path(key))
+            except FileNotFoundError:
+                pass
+            total -= entry["size"]
+            del self._index[key]
+            log_debug(f"Evicted stored image {key[:12]} ({entry['size']} bytes)")
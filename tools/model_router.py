@@ -0,0 +1,157 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+from config.settings import (
+    MODEL_ROUTING_ENABLED, MODEL_ROUTING_POLICY, MODEL_ROUTING_STATS_PATH,
+    MODEL_ROUTING_MAX_FAILURE_RATE, MODEL_ROUTING_RETRY_AFTER_S,
+)
+
+# parse_llm_json output filenames mapped to pipeline sections; the first match wins
+SECTION_PATTERNS = [
+    (re.compile(r"days|dedupe|derived"), "days"),
+    (re.compile(r"research"), "research"),
+    (re.compile(r"cover"), "cover"),
+    (re.compile(r"title"), "titles"),
+    (re.compile(r"author"), "author_styles"),
+    (re.compile(r"intro"), "intro"),
+    (re.compile(r"commitment"), "commitment"),
+    (re.compile(r"certificate"), "certificate"),
+]
+DEFAULT_CANDIDATE = {"model": None, "max_tokens": None}
+_SMOOTHING = 0.2
+_MIN_CALLS = 3
+_MAX_SAMPLES = 50
+
+def section_for(filename: str) -> Optional[str]:
+    name = os.path.basename(filename).lower()
+    for pattern, section in SECTION_PATTERNS:
+        if pattern.search(name):
+            return section
+    return None
+
+class ModelRouter:
+    """Chooses a model and max_tokens per pipeline section from a policy table.
+
+    Candidates are listed cheapest first. Every call's latency and outcome are
+    folded into an exponentially weighted average per (section, model) and kept
+    on disk, so later runs benefit too. A candidate that fails too often or is
+    slower than its max_latency_s is skipped until retry_after_s has passed.
+    Retries within one request escalate to the next candidate and end on the
+    main LLM, so long-form sections never get worse than before.
+    """
+
+    def __init__(self, policy: Dict[str, List[dict]], stats_path: Optional[str] = None,
+                 max_failure_rate: float = 0.3, retry_after_s: float = 900):
+        self.policy = policy
+        self.stats_path = stats_path
+        self.max_failure_rate = max_failure_rate
+        self.retry_after_s = retry_after_s
+        self._lock = threading.Lock()
+        self._llms = {}
+        self.stats = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        if not self.stats_path or not os.path.exists(self.stats_path):
+            return {}
+        try:
+            with open(self.stats_path, "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save(self):
+        if not self.stats_path:
+            return
+        os.makedirs(os.path.dirname(self.stats_path) or ".", exist_ok=True)
+        tmp_path = f"{self.stats_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.stats, f, indent=2)
+        os.replace(tmp_path, self.stats_path)
+
+    @staticmethod
+    def _key(section: Optional[str], model: Optional[str]) -> str:
+        return f"{section or 'other'}|{model or 'default'}"
+
+    def _usable(self, section: str, candidate: dict, now: float) -> bool:
+        stats = self.stats.get(self._key(section, candidate.get("model")))
+        if not stats or stats["calls"] < _MIN_CALLS:
+            return True
+        too_slow = candidate.get("max_latency_s") and stats["latency_s"] > candidate["max_latency_s"]
+        if stats["failure_rate"] <= self.max_failure_rate and not too_slow:
+            return True
+        return now - stats["updated"] >= self.retry_after_s
+
+    def candidates(self, section: Optional[str]) -> List[dict]:
+        """Usable candidates for section in preference order, always ending with the main LLM."""
+        now = time.time()
+        usable = [c for c in self.policy.get(section, []) if self._usable(section, c, now)]
+        if not any(c.get("model") is None for c in usable):
+            usable.append(DEFAULT_CANDIDATE)
+        return usable
+
+    def route(self, section: Optional[str], attempt: int = 0) -> dict:
+        """Candidate for the given attempt; each retry moves one step toward the main LLM."""
+        candidates = self.candidates(section)
+        return candidates[min(attempt, len(candidates) - 1)]
+
+    def llm_for(self, llm, candidate: dict):
+        """Return an LLM configured for candidate, built from the main LLM's settings and cached."""
+        if candidate.get("model") is None and candidate.get("max_tokens") is None:
+            return llm
+        model = candidate.get("model") or getattr(llm, "model", None)
+        key = (id(llm), model, candidate.get("max_tokens"))
+        with self._lock:
+            if key not in self._llms:
+                self._llms[key] = type(llm)(
+                    model=model,
+                    api_key=getattr(llm, "api_key", None),
+                    temperature=getattr(llm, "temperature", None),
+                    max_tokens=candidate.get("max_tokens"),
+                )
+            return self._llms[key]
+
+    def latency_percentile(self, section: Optional[str], candidate: dict, q: float, min_samples: int = 10) -> Optional[float]:
+        """Latency at quantile q of recent successful calls, or None with too few samples."""
+        stats = self.stats.get(self._key(section, candidate.get("model")), {})
+        samples = sorted(stats.get("samples", []))
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def record(self, section: Optional[str], candidate: dict, latency_s: float, ok: bool):
+        """Fold one call's latency and outcome into the stats for its section and model."""
+        with self._lock:
+            key = self._key(section, candidate.get("model"))
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = {"calls": 0, "failures": 0, "latency_s": latency_s, "failure_rate": 0.0 if ok else 1.0}
+            else:
+                stats["latency_s"] += _SMOOTHING * (latency_s - stats["latency_s"])
+                stats["failure_rate"] += _SMOOTHING * ((0.0 if ok else 1.0) - stats["failure_rate"])
+            stats["calls"] += 1
+            stats["failures"] += 0 if ok else 1
+            if ok:
+                stats["samples"] = (stats.get("samples", []) + [round(latency_s, 3)])[-_MAX_SAMPLES:]
+            stats["latency_s"] = round(stats["latency_s"], 3)
+            stats["failure_rate"] = round(stats["failure_rate"], 4)
+            stats["updated"] = time.time()
+            self.stats[key] = stats
+            try:
+                self._save()
+            except OSError:
+                pass
+
+_router = None
+
+def get_model_router() -> Optional[ModelRouter]:
+    """Process-wide router built from settings, or None when routing is disabled."""
+    global _router
+    if not MODEL_ROUTING_ENABLED:
+        return None
+    if _router is None:
+        _router = ModelRouter(MODEL_ROUTING_POLICY, MODEL_ROUTING_STATS_PATH,
+                              MODEL_ROUTING_MAX_FAILURE_RATE, MODEL_ROUTING_RETRY_AFTER_S)
+    return _router
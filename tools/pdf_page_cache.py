@@ -0,0 +1,63 @@
+import hashlib
+import json
+import os
+from typing import Iterable, List, Optional
+from pypdf import PdfWriter
+from utils import atomic_output, log_debug
+
+class PageCache:
+    """On-disk cache of rendered PDF page groups keyed by a hash of their inputs.
+
+    Each entry is a small standalone PDF holding the pages for one section of a
+    document (front matter, one day spread, certificate). Re-rendering a document
+    only renders sections whose inputs changed and merges the rest from disk.
+    """
+
+    def __init__(self, cache_dir: str, template_version: int):
+        self.cache_dir = cache_dir
+        self.template_version = template_version
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, section: str, inputs, image_paths: Iterable[Optional[str]] = ()) -> str:
+        """Hash the section's text inputs, template version and referenced image files."""
+        image_stamps = []
+        for path in image_paths:
+            if path and os.path.exists(path):
+                stat = os.stat(path)
+                image_stamps.append([path, stat.st_size, stat.st_mtime_ns])
+            else:
+                image_stamps.append([path, None, None])
+        payload = json.dumps(
+            {"section": section, "template": self.template_version, "inputs": inputs, "images": image_stamps},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.path_for(key)
+        return path if os.path.exists(path) else None
+
+    def prune(self, keep_keys: Iterable[str]):
+        """Remove cached sections that are no longer part of the document."""
+        keep = {f"{k}.pdf" for k in keep_keys}
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".pdf") and name not in keep:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError as e:
+                    log_debug(f"Could not prune PDF cache entry {name}: {e}")
+
+def assemble_pdf(section_paths: List[str], output_path: str) -> str:
+    """Concatenate cached section PDFs into the final document."""
+    writer = PdfWriter()
+    for path in section_paths:
+        writer.append(path)
+    # Sections embed their own font subsets; collapse any that came out identical
+    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+    with atomic_output(output_path, "wb") as f:
+        writer.write(f)
+    writer.close()
+    return output_path
@@ -0,0 +1,59 @@
+import math
+import re
+from typing import List
+
+_SPACE = re.compile(r"\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) used for budgeting prompts."""
+    return math.ceil(len(text) / 4)
+
+def _clip(text: str, max_words: int) -> str:
+    """Shorten text to max_words, ending on a sentence boundary when one is close enough."""
+    words = text.split(" ")
+    if len(words) <= max_words:
+        return text
+    clipped = " ".join(words[:max_words])
+    ends = [m.start() for m in _SENTENCE_END.finditer(clipped + " ")]
+    # Prefer a whole sentence unless it would throw away more than half the allowance
+    if ends and len(clipped[:ends[-1]].split(" ")) >= max_words // 2:
+        return clipped[:ends[-1]]
+    return clipped.rstrip(",;:") + "..."
+
+def build_research_digest(insights: List[dict], token_budget: int = 1200, min_words: int = 12) -> str:
+    """Compress research insights into a numbered technique list within a token budget.
+
+    Each line is "N. Technique: description", with descriptions trimmed evenly so
+    the whole digest fits token_budget. The output depends only on the insights,
+    so every prompt built from it shares an identical prefix.
+    """
+    entries = []
+    for insight in insights:
+        if not isinstance(insight, dict):
+            continue
+        technique = _SPACE.sub(" ", str(insight.get("technique", ""))).strip()
+        description = _SPACE.sub(" ", str(insight.get("description", ""))).strip()
+        if technique or description:
+            entries.append((technique or f"Insight {len(entries) + 1}", description))
+    if not entries:
+        return ""
+
+    # Start from roughly 0.75 words per token, then tighten until the estimate fits the budget
+    words_per_entry = int(token_budget * 0.75 / len(entries))
+    while True:
+        digest = "\n".join(_digest_line(number, technique, description, max(min_words, words_per_entry - len(technique.split())))
+                           for number, (technique, description) in enumerate(entries, 1))
+        if estimate_tokens(digest) <= token_budget or words_per_entry <= min_words:
+            return digest
+        words_per_entry = int(words_per_entry * 0.9)
+
+def _digest_line(number: int, technique: str, description: str, max_words: int) -> str:
+    line = f"{number}. {technique}"
+    return f"{line}: {_clip(description, max_words)}" if description else line
+
+def with_digest(digest: str, instructions: str) -> str:
+    """Prefix a prompt with the research digest so curation prompts share one stable prefix."""
+    if not digest:
+        return instructions
+    return f"Research digest (numbered journaling techniques):\n{digest}\n\n{instructions}"
@@ -0,0 +1,135 @@
+import glob
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from config.settings import JSON_SUBDIR, LLM_SUBDIR
+from utils import log_debug
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "with", "your", "you", "is", "are",
+    "by", "as", "at", "be", "it", "this", "that", "journaling", "journal",
+}
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(str(text).lower()) if token not in _STOPWORDS]
+
+def _strip_fences(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```json") and text.endswith("```"):
+        return text[7:-3].strip()
+    if text.startswith("```") and text.endswith("```"):
+        return text[3:-3].strip()
+    return text
+
+def _as_insight_list(data) -> List[dict]:
+    """Normalize the shapes research_content accepts into a list of insight dicts."""
+    if isinstance(data, dict):
+        data = data.get("insights", list(data.values()))
+    return [item for item in data if isinstance(item, dict)] if isinstance(data, list) else []
+
+class ResearchStore:
+    """TF-IDF index over the research saved by earlier runs.
+
+    Each past run directory becomes one document made of its theme and its
+    insights. A new theme is matched against the corpus by cosine similarity
+    so the research stage can reuse, or only top up, insights gathered before.
+    Runs entirely offline.
+    """
+
+    def __init__(self, roots: Iterable[str]):
+        self.roots = [root for root in roots if root and os.path.isdir(root)]
+        self.documents: List[dict] = []
+        self._idf: Dict[str, float] = {}
+        self._theme_vectors: List[Dict[str, float]] = []
+        self._content_vectors: List[Dict[str, float]] = []
+        self._build()
+
+    def _load_run(self, run_dir: str) -> Optional[dict]:
+        theme = None
+        insights: List[dict] = []
+        for path in glob.glob(os.path.join(run_dir, JSON_SUBDIR, "research_data_*.json")):
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            theme = theme or data.get("theme")
+            insights = insights or _as_insight_list(data.get("research"))
+        if not insights:
+            # research_data can be empty when parsing failed; the raw LLM output is still on disk
+            for path in sorted(glob.glob(os.path.join(run_dir, LLM_SUBDIR, "research_output_*.txt")), reverse=True):
+                try:
+                    with open(path, "r") as f:
+                        insights = _as_insight_list(json.loads(_strip_fences(f.read())))
+                except (OSError, json.JSONDecodeError):
+                    continue
+                if insights:
+                    break
+        if not insights:
+            return None
+        return {"run_dir": run_dir, "theme": theme or os.path.basename(run_dir).replace("_", " "), "insights": insights}
+
+    def _build(self):
+        for root in self.roots:
+            for entry in sorted(os.listdir(root)):
+                run_dir = os.path.join(root, entry)
+                if os.path.isdir(run_dir) and not entry.startswith("."):
+                    document = self._load_run(run_dir)
+                    if document:
+                        self.documents.append(document)
+
+        theme_counts = []
+        content_counts = []
+        for document in self.documents:
+            theme_counts.append(Counter(tokenize(document["theme"])))
+            tokens = []
+            for insight in document["insights"]:
+                tokens += tokenize(f"{insight.get('technique', '')} {insight.get('description', '')}")
+            content_counts.append(Counter(tokens))
+
+        doc_freq = Counter(term for theme, content in zip(theme_counts, content_counts) for term in set(theme) | set(content))
+        total = len(self.documents)
+        self._idf = {term: math.log((1 + total) / (1 + df)) + 1 for term, df in doc_freq.items()}
+        self._theme_vectors = [self._weigh(counts) for counts in theme_counts]
+        self._content_vectors = [self._weigh(counts) for counts in content_counts]
+        log_debug(f"Research store indexed {total} past runs from {self.roots}")
+
+    def _weigh(self, counts: Counter) -> Dict[str, float]:
+        vector = {term: (1 + math.log(tf)) * self._idf.get(term, 0.0) for term, tf in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+    def search(self, theme: str, top_k: int = 3, exclude_run_dir: str = None) -> List[dict]:
+        """Return past runs ranked by similarity to theme, each with a 0-1 'score'.
+
+        The score blends theme-to-theme similarity (80%) with how well the
+        theme's terms are covered by the run's insight text (20%).
+        """
+        query = self._weigh(Counter(tokenize(theme)))
+        matches = []
+        for document, theme_vector, content_vector in zip(self.documents, self._theme_vectors, self._content_vectors):
+            if exclude_run_dir and os.path.abspath(document["run_dir"]) == os.path.abspath(exclude_run_dir):
+                continue
+            theme_score = sum(weight * theme_vector.get(term, 0.0) for term, weight in query.items())
+            content_score = sum(weight * content_vector.get(term, 0.0) for term, weight in query.items())
+            score = 0.8 * theme_score + 0.2 * content_score
+            if score > 0:
+                matches.append({**document, "score": round(score, 4)})
+        matches.sort(key=lambda match: match["score"], reverse=True)
+        return matches[:top_k]
+
+def merge_insights(*insight_lists: List[dict]) -> List[dict]:
+    """Concatenate insight lists, dropping repeats of the same description."""
+    seen = set()
+    merged = []
+    for insights in insight_lists:
+        for insight in insights:
+            key = " ".join(tokenize(insight.get("description", "")))
+            if key and key not in seen:
+                seen.add(key)
+                merged.append(insight)
+    return merged
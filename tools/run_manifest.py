@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+from utils import atomic_output, log_debug
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+FINAL_STAGE = "pdf"
+_HASH_CHUNK = 1024 * 1024
+_lock = threading.Lock()
+
+def manifest_path(run_dir: str) -> str:
+    return os.path.join(run_dir, MANIFEST_FILENAME)
+
+def load_manifest(run_dir: str) -> dict:
+    """Return the run's manifest, or an empty one when the run has none yet."""
+    try:
+        with open(manifest_path(run_dir), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"version": MANIFEST_VERSION, "stages": {}, "artifacts": {}}
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _run_status(stages: Dict[str, dict]) -> str:
+    if any(stage["status"] == "failed" for stage in stages.values()):
+        return "failed"
+    if stages.get(FINAL_STAGE, {}).get("status") == "completed":
+        return "completed"
+    return "in_progress"
+
+def record_stage(run_dir: str, stage: str, status: str = "completed",
+                 artifacts: Optional[Dict[str, Union[str, List[str]]]] = None, **fields):
+    """Merge one stage's outcome into the run's manifest.json and replace it atomically.
+
+    artifacts maps a kind (config, discovery, research, journal, lead_magnet,
+    image_requirements, media, pdf, epub) to one path or a list of paths. Each is
+    stored relative to run_dir with its size and sha256. Other keyword fields
+    (title, theme, author_style, user_id, ...) are copied to the top level when
+    not None. Readers can then load this one file instead of walking the run.
+    A failure to write is logged and never stops the pipeline.
+    """
+    try:
+        with _lock:
+            manifest = load_manifest(run_dir)
+            now = datetime.now().isoformat()
+            manifest.setdefault("created_at", now)
+            manifest.update({key: value for key, value in fields.items() if value is not None})
+            manifest["stages"][stage] = {"status": status, "updated_at": now}
+
+            # Drop artifacts that have since been removed, then add this stage's
+            manifest["artifacts"] = {
+                rel_path: entry for rel_path, entry in manifest["artifacts"].items()
+                if os.path.isfile(os.path.join(run_dir, rel_path))
+            }
+            for kind, paths in (artifacts or {}).items():
+                for path in [paths] if isinstance(paths, str) else paths:
+                    if not path or not os.path.isfile(path):
+                        continue
+                    manifest["artifacts"][os.path.relpath(path, run_dir).replace(os.sep, "/")] = {
+                        "kind": kind,
+                        "stage": stage,
+                        "size": os.path.getsize(path),
+                        "sha256": _file_digest(path),
+                    }
+
+            manifest["status"] = _run_status(manifest["stages"])
+            manifest["updated_at"] = now
+            with atomic_output(manifest_path(run_dir)) as f:
+                json.dump(manifest, f, indent=2)
+    except Exception as e:
+        log_debug(f"Could not update manifest for {run_dir} ({stage}): {e}")
@@ -0,0 +1,80 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+NEUTRAL_SCORES = {"neg": 0.0, "neu": 1.0, "pos": 0.0, "compound": 0.0}
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+def split_sentences(text: str) -> List[str]:
+    """Split text on sentence-ending punctuation without needing NLTK's punkt data."""
+    return [sentence.strip() for sentence in _SENTENCE_BOUNDARY.split(text or "") if sentence.strip()]
+
+class SentimentEngine:
+    """Process-wide VADER scorer with batch scoring and a memo keyed by text hash.
+
+    The VADER lexicon is parsed once, on first use, instead of on every call.
+    Depends only on NLTK so the web backend can share it with the agents.
+    """
+
+    def __init__(self, memo_size: int = 4096):
+        self.memo_size = memo_size
+        self._analyzer = None
+        self._memo: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_analyzer(self):
+        if self._analyzer is None:
+            with self._lock:
+                if self._analyzer is None:
+                    import nltk
+                    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+                    try:
+                        nltk.data.find('sentiment/vader_lexicon.zip')
+                    except LookupError:
+                        nltk.download('vader_lexicon', quiet=True)
+                    self._analyzer = SentimentIntensityAnalyzer()
+        return self._analyzer
+
+    def score(self, text: str) -> Dict[str, float]:
+        """Return VADER polarity scores for one text, memoized by its hash."""
+        if not text or not str(text).strip():
+            return dict(NEUTRAL_SCORES)
+        key = hashlib.sha1(str(text).encode("utf-8")).hexdigest()
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                return dict(cached)
+        scores = self._get_analyzer().polarity_scores(str(text))
+        with self._lock:
+            self._memo[key] = scores
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return dict(scores)
+
+    def score_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Score many texts with a single analyzer; duplicates are scored once."""
+        return [self.score(text) for text in texts]
+
+    def score_sentences(self, text: str) -> List[Dict[str, object]]:
+        """Score each sentence separately so weak spots in a passage can be located."""
+        return [{"sentence": sentence, **self.score(sentence)} for sentence in split_sentences(text)]
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+
+_engine: Optional[SentimentEngine] = None
+_engine_lock = threading.Lock()
+
+def get_sentiment_engine() -> SentimentEngine:
+    """Return the process-wide engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = SentimentEngine()
+    return _engine
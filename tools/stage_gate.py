@@ -0,0 +1,72 @@
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+class StageCancelled(Exception):
+    """Raised inside a stage once the workflow has abandoned it."""
+
+class StageGate:
+    """Cooperative cancellation for a pipeline stage running in worker threads.
+
+    A workflow that gives up on a stage (its deadline budget ran out) stops the
+    stage's gate. Every write into the run directory goes through commit(), which
+    takes the gate's lock and refuses once the gate is stopped, so after stop()
+    returns nothing from the abandoned stage can land in the run, even though its
+    threads may still be finishing a provider call. Long loops call check() to
+    give up early. Standard library only so the web backend can create gates.
+    """
+
+    def __init__(self, stage: str = ""):
+        self.stage = stage
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped
+
+    def stop(self):
+        """Refuse all further commits; waits for a commit in progress to finish."""
+        with self._lock:
+            self._stopped = True
+
+    def check(self):
+        if self._stopped:
+            raise StageCancelled(f"Stage {self.stage or 'run'} was abandoned")
+
+    @contextmanager
+    def commit(self):
+        """Hold the gate while publishing a write; raises StageCancelled once stopped."""
+        with self._lock:
+            self.check()
+            yield
+
+# The gate of the stage the current task or thread is working for. asyncio.to_thread
+# copies the context, so a gate set around a stage coroutine reaches its worker threads.
+_current_gate: contextvars.ContextVar = contextvars.ContextVar("stage_gate", default=None)
+
+def current_gate() -> Optional[StageGate]:
+    return _current_gate.get()
+
+def set_current_gate(gate: Optional[StageGate]) -> contextvars.Token:
+    return _current_gate.set(gate)
+
+def reset_current_gate(token: contextvars.Token):
+    _current_gate.reset(token)
+
+def check_stage():
+    """Raise StageCancelled if the current stage has been abandoned."""
+    gate = current_gate()
+    if gate:
+        gate.check()
+
+@contextmanager
+def gated_commit():
+    """Publish a write under the current stage's gate, if there is one."""
+    gate = current_gate()
+    if gate is None:
+        yield
+    else:
+        with gate.commit():
+            yield
@@ -1,13 +1,20 @@
 from crewai.tools import BaseTool
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import nltk
-from typing import Dict
+from typing import Dict, List
+from config.settings import KNOWLEDGE_DIRS, KNOWLEDGE_INDEX_DIR, RESEARCH_STORE_DIRS
+from tools.knowledge_index import open_knowledge_index
+from tools.sentiment_engine import NEUTRAL_SCORES, get_sentiment_engine
 from utils import log_debug
 
-try:
-    nltk.data.find('vader_lexicon')
-except LookupError:
-    nltk.download('vader_lexicon')
+def search_knowledge(query: str, top_k: int = 5) -> List[dict]:
+    """Search the local BM25 index of knowledge files and past runs."""
+    try:
+        index = open_knowledge_index(KNOWLEDGE_INDEX_DIR, KNOWLEDGE_DIRS, RESEARCH_STORE_DIRS)
+        results = index.search(query, top_k)
+        log_debug(f"Knowledge index returned {len(results)} passages for: {query}")
+        return results
+    except Exception as e:
+        log_debug(f"Error in search_knowledge: {e}")
+        return []
 
 def duckdb_tool(query: str) -> str:
     """Execute a DuckDB query (placeholder implementation)."""
@@ -18,13 +25,22 @@ def duckdb_tool(query: str) -> str:
 def analyze_sentiment(text: str) -> Dict[str, float]:
     """Analyze sentiment of text using NLTK VADER."""
     try:
-        sid = SentimentIntensityAnalyzer()
-        result = sid.polarity_scores(text)
+        result = get_sentiment_engine().score(text)
         log_debug(f"Sentiment analyzed for text: {text[:50]}..., result: {result}")
         return result
     except Exception as e:
         log_debug(f"Error in analyze_sentiment: {e}")
-        return {"neg": 0.0, "neu": 1.0, "pos": 0.0, "compound": 0.0}
+        return dict(NEUTRAL_SCORES)
+
+def analyze_sentiment_batch(texts: List[str]) -> List[Dict[str, float]]:
+    """Analyze sentiment of many texts with the shared VADER analyzer."""
+    try:
+        results = get_sentiment_engine().score_batch(texts)
+        log_debug(f"Sentiment analyzed for {len(texts)} texts")
+        return results
+    except Exception as e:
+        log_debug(f"Error in analyze_sentiment_batch: {e}")
+        return [dict(NEUTRAL_SCORES) for _ in texts]
 
 class DuckDBTool(BaseTool):
     name: str = "duckdb_tool"
@@ -95,10 +111,16 @@ class BlogSummarySearchTool(BaseTool):
             ]
         }
 
-        # Create comprehensive summary
-        summary_parts = [
-            f"Comprehensive Research: {query}",
-            "",
+        # Create comprehensive summary, grounded in indexed passages when there are any
+        summary_parts = [f"Comprehensive Research: {query}", ""]
+        passages = search_knowledge(query, top_k=5)
+        if passages:
+            summary_parts += [
+                "FROM THE KNOWLEDGE BASE:",
+                "\n".join(f"• {p['title']}: {p['content'][:300]}" for p in passages),
+                ""
+            ]
+        summary_parts += [
             "KEY INSIGHTS:",
             "\n".join(f"• {insight}" for insight in research_data["key_insights"][:3]),
             "",
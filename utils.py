@@ -1,9 +1,14 @@
 import json
 import os
+import threading
 import time
+from contextlib import contextmanager
 from datetime import datetime
 from timeout_decorator import timeout, TimeoutError
-from config.settings import DEBUG
+from config.settings import DEBUG, LLM_HEDGE_PERCENTILE
+from tools.model_router import get_model_router, section_for
+from tools.llm_hedge import get_llm_hedger
+from tools.stage_gate import gated_commit
 
 def log_debug(message):
     """Log debug messages to app.txt if DEBUG is True."""
@@ -11,11 +16,56 @@ def log_debug(message):
         with open("app.txt", "a") as f:
             f.write(f"{datetime.now()}: {message}\n")
 
+@contextmanager
+def atomic_path(filepath):
+    """Yield a temporary path next to filepath and move it over filepath once the block succeeds.
+
+    Run artifacts can be hardlinks into the shared blob and media stores, whose
+    files are read-only and shared between runs: writing one in place would fail
+    or rewrite every run linked to it, while replacing the directory entry leaves
+    the shared copy alone. Readers never see a half-written file either. The
+    temporary file is hidden so blob ingestion and the library watcher skip it.
+    The move is refused once the current stage has been abandoned (see
+    tools.stage_gate), so a timed-out stage cannot publish output afterwards.
+    """
+    directory, name = os.path.split(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        yield tmp_path
+        with gated_commit():
+            os.replace(tmp_path, filepath)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+@contextmanager
+def atomic_output(filepath, mode="w", **kwargs):
+    """Open a file for writing that replaces filepath atomically when closed (see atomic_path)."""
+    with atomic_path(filepath) as tmp_path:
+        with open(tmp_path, mode, **kwargs) as f:
+            yield f
+
+def append_text(filepath, text):
+    """Append to a run log; a copy shared through the blob store is replaced instead of modified."""
+    try:
+        shared = os.stat(filepath).st_nlink > 1 or not os.access(filepath, os.W_OK)
+    except FileNotFoundError:
+        shared = False
+    if not shared:
+        with gated_commit(), open(filepath, "a") as f:
+            f.write(text)
+        return
+    with open(filepath, "r") as f:
+        existing = f.read()
+    with atomic_output(filepath) as f:
+        f.write(existing + text)
+
 def save_json(data, filepath):
     """Save data to a JSON file, creating directories if needed."""
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
     try:
-        with open(filepath, "w") as f:
+        with atomic_output(filepath) as f:
             json.dump(data, f, indent=2)
         log_debug(f"JSON saved to {filepath}")
     except Exception as e:
@@ -43,8 +93,15 @@ def flatten_json(data):
     flatten(data)
     return flat
 
-def parse_llm_json(llm, prompt, output_dir, filename, expected_keys=None, retries=3, flatten=True):
-    """Parse LLM JSON output with optional flattening and error handling."""
+def parse_llm_json(llm, prompt, output_dir, filename, expected_keys=None, retries=3, flatten=True, section=None):
+    """Parse LLM JSON output with optional flattening and error handling.
+
+    When model routing is enabled the call goes to the model the routing policy
+    picks for its section (derived from filename unless given), and each
+    attempt's latency and outcome are fed back into the router. With hedging
+    enabled, a call slower than the section's usual tail latency is raced
+    against a duplicate request.
+    """
     @timeout(120, timeout_exception=TimeoutError)
     def llm_with_timeout(llm, prompt):
         log_debug("Starting LLM call with timeout")
@@ -54,18 +111,48 @@ def parse_llm_json(llm, prompt, output_dir, filename, expected_keys=None, retrie
     
     os.makedirs(output_dir, exist_ok=True)
     filepath = os.path.join(output_dir, filename)
+    router = get_model_router()
+    hedger = get_llm_hedger() if router else None
+    section = section or section_for(filename)
     
     for attempt in range(retries):
+        call_llm, route = llm, None
+        if router:
+            route = router.route(section, attempt)
+            try:
+                call_llm = router.llm_for(llm, route)
+            except Exception as e:
+                log_debug(f"Could not build routed LLM {route} for {filename}, using main LLM: {e}")
+                router.record(section, route, 0.0, ok=False)
+                call_llm, route = llm, None
+            if route:
+                log_debug(f"Routing {filename} (section {section}) to {route.get('model') or 'main LLM'}")
+        started = time.time()
         try:
             log_debug(f"Attempt {attempt + 1} for {filename}")
-            raw_response = llm_with_timeout(llm, prompt)
+            try:
+                hedge_delay = hedger.delay_for(router.latency_percentile(section, route, LLM_HEDGE_PERCENTILE)) if hedger and route else None
+                if hedge_delay:
+                    raw_response = hedger.call(lambda: call_llm.call(prompt), hedge_delay, 120,
+                                               prompt_tokens=len(prompt) // 4, timeout_exception=TimeoutError)
+                else:
+                    raw_response = llm_with_timeout(call_llm, prompt)
+            except Exception as e:
+                # A routed model that errors out is recorded and the next attempt escalates
+                if isinstance(e, TimeoutError) or not route or route.get("model") is None or attempt == retries - 1:
+                    raise
+                router.record(section, route, time.time() - started, ok=False)
+                log_debug(f"Routed model {route.get('model')} failed for {filename}: {e}")
+                continue
             log_debug(f"Raw LLM response for {filename}: '{raw_response}'")
-            with open(filepath, "w") as f:
+            with atomic_output(filepath) as f:
                 f.write(raw_response)
             
             stripped_response = raw_response.strip()
             if not stripped_response:
                 log_debug(f"LLM returned empty response for {filename}")
+                if route:
+                    router.record(section, route, time.time() - started, ok=False)
                 continue
             
             # Strip markdown
@@ -81,9 +168,13 @@ def parse_llm_json(llm, prompt, output_dir, filename, expected_keys=None, retrie
                 if not all(k in processed_result for k in expected_keys):
                     raise ValueError(f"Flattened JSON missing expected keys: {expected_keys}")
             log_debug(f"Parsed JSON result for {filename}: {processed_result}")
+            if route:
+                router.record(section, route, time.time() - started, ok=True)
             return processed_result
         except (json.JSONDecodeError, TimeoutError, ValueError) as e:
             log_debug(f"Error on attempt {attempt + 1} for {filename}: {str(e)}")
+            if route:
+                router.record(section, route, time.time() - started, ok=False)
             if attempt < retries - 1:
                 time.sleep(1)
                 continue